@@ -0,0 +1,184 @@
+"""
+AUDIO FEATURES - Tempo, energy and brightness from decoded PCM
+Audio is decoded in fixed-size chunks (WAV natively, anything else
+through ffmpeg when it is installed) and analyzed with NumPy chunk by
+chunk, so memory stays flat however long the track is. The features
+map to the same moods as the lyric analyzer and can be blended with
+its scores.
+"""
+import os
+import shutil
+import subprocess
+import wave
+
+import mood_engine
+
+SAMPLE_RATE = 22050      # ffmpeg decodes to this rate
+CHUNK_SAMPLES = 65536    # Samples decoded and analyzed at a time (~3 s)
+FRAME = 2048             # FFT frame
+HOP = 1024               # Frame step
+MAX_ENVELOPE = 4096      # Onset frames kept for tempo (~3 min at 22 kHz)
+
+# Weight of the audio scores when blended with lyric scores
+AUDIO_WEIGHT = 0.3
+
+# Mean RMS below which a track is silent (about -60 dBFS): it says nothing about mood
+SILENCE_RMS = 0.001
+
+
+def iter_pcm(path, chunk=CHUNK_SAMPLES):
+    """Yield (sample_rate, mono float32 chunk) pairs for an audio file"""
+    np = mood_engine.np
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            dtype, scale, offset = {1: (np.uint8, 128.0, 128.0),
+                                    2: (np.int16, 32768.0, 0.0),
+                                    4: (np.int32, 2147483648.0, 0.0)}[width]
+            while True:
+                data = wav.readframes(chunk)
+                if not data:
+                    break
+                samples = (np.frombuffer(data, dtype=dtype).astype(np.float32) - offset) / scale
+                yield rate, samples.reshape(-1, channels).mean(axis=1)
+        return
+
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise ValueError(f"Cannot decode {os.path.basename(path)} without ffmpeg")
+    process = subprocess.Popen([ffmpeg, '-v', 'quiet', '-i', path, '-f', 's16le',
+                                '-ac', '1', '-ar', str(SAMPLE_RATE), '-'],
+                               stdout=subprocess.PIPE, stdin=subprocess.DEVNULL)
+    try:
+        while True:
+            data = process.stdout.read(chunk * 2)
+            if not data:
+                break
+            data = data[:len(data) - len(data) % 2]
+            yield SAMPLE_RATE, np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+
+def estimate_tempo(envelope, frames_per_second):
+    """BPM (60-180) from the autocorrelation of an onset envelope"""
+    np = mood_engine.np
+    if len(envelope) < 8:
+        return 0.0
+    env = np.asarray(envelope, dtype=np.float32)
+    env = env - env.mean()
+    corr = np.correlate(env, env, mode='full')[len(env) - 1:]
+    lags = np.arange(len(corr))
+    with np.errstate(divide='ignore'):
+        bpm = 60.0 * frames_per_second / lags
+    valid = (bpm >= 60) & (bpm <= 180)
+    if not valid.any():
+        return 0.0
+    best = lags[valid][np.argmax(corr[valid])]
+    return float(60.0 * frames_per_second / best)
+
+
+def audio_features(path):
+    """{'tempo', 'energy', 'brightness'} for a file, or None if it cannot be read
+
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    if not mood_engine.load_numpy():
+        return None
+    np = mood_engine.np
+    window = np.hanning(FRAME).astype(np.float32)
+
+    rate = SAMPLE_RATE
+    carry = np.zeros(0, dtype=np.float32)
+    previous = None
+    envelope = []
+    rms_sum = centroid_sum = 0.0
+    frames = 0
+
+    try:
+        for rate, samples in iter_pcm(path):
+            buffer = np.concatenate((carry, samples))
+            if len(buffer) < FRAME:
+                carry = buffer
+                continue
+            count = (len(buffer) - FRAME) // HOP + 1
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, FRAME)[::HOP][:count]
+            carry = buffer[count * HOP:]
+
+            rms_sum += float(np.sqrt((windows * windows).mean(axis=1)).sum())
+            spectrum = np.abs(np.fft.rfft(windows * window, axis=1))
+            freqs = np.fft.rfftfreq(FRAME, 1.0 / rate)
+            power = spectrum.sum(axis=1)
+            centroid = (spectrum @ freqs) / np.maximum(power, 1e-9)
+            centroid_sum += float((centroid / (rate / 2.0)).sum())
+
+            # Spectral flux: how much energy appeared since the previous frame
+            stacked = spectrum if previous is None else np.vstack((previous, spectrum))
+            flux = np.maximum(np.diff(stacked, axis=0), 0).sum(axis=1)
+            if previous is None:
+                flux = np.concatenate(([0.0], flux))
+            previous = spectrum[-1:]
+            if len(envelope) < MAX_ENVELOPE:
+                envelope.extend(flux[:MAX_ENVELOPE - len(envelope)].tolist())
+            frames += count
+    except Exception as e:
+        print(f"Audio analysis error for {path}: {e}")
+        return None
+
+    if frames == 0:
+        return None
+    return {
+        'tempo': estimate_tempo(envelope, rate / HOP),
+        'energy': rms_sum / frames,
+        'brightness': centroid_sum / frames,
+    }
+
+
+def clamp(value):
+    return max(0.0, min(1.0, value))
+
+
+def audio_mood_scores(features, moods=tuple(mood_engine.MOOD_KEYWORDS)):
+    """Rough mood shares (summing to 1) from tempo, energy and brightness
+
+    None when the audio gives nothing to go on: a silent track, or moods
+    that have no audio profile.
+    """
+    if features['energy'] < SILENCE_RMS:
+        return None
+    fast = clamp((features['tempo'] - 60.0) / 120.0)
+    loud = clamp(features['energy'] / 0.25)
+    bright = clamp((features['brightness'] - 0.05) / 0.25)
+    raw = {
+        'happy': bright * fast,
+        'sad': (1 - bright) * (1 - fast),
+        'romantic': (1 - loud) * (1 - clamp(abs(fast - 0.4) * 2)),
+        'energetic': loud * fast,
+        'calm': (1 - loud) * (1 - fast),
+        'angry': loud * (1 - bright),
+    }
+    scores = {mood: raw.get(mood, 0.0) for mood in moods}
+    total = sum(scores.values())
+    if not total:
+        return None
+    return {mood: score / total for mood, score in scores.items()}
+
+
+def blend_scores(lyric_scores, audio_scores, weight=AUDIO_WEIGHT):
+    """Mix lyric keyword counts with audio mood shares
+
+    Either side may be None. Lyric counts are turned into shares first,
+    so the result is a share per mood. Audio scores that are all zero
+    are ignored rather than outvoting the lyrics.
+    """
+    if not audio_scores or not any(audio_scores.values()):
+        return lyric_scores
+    total = sum(lyric_scores.values()) if lyric_scores else 0
+    if not total:
+        return dict(audio_scores)
+    return {mood: (1 - weight) * count / total + weight * audio_scores.get(mood, 0.0)
+            for mood, count in lyric_scores.items()}
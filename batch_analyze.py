@@ -0,0 +1,178 @@
+"""
+BATCH ANALYZE - Headless mood analysis for large lyric catalogs
+Reads lyrics from a directory of .txt files, a JSONL file or stdin and
+writes one JSON line per song with its mood, scores and keywords. Work
+is spread over several processes in chunks; no Tk or display needed.
+
+    python -m moodify analyze lyrics/ > moods.jsonl
+    python -m moodify analyze catalog.jsonl -o moods.jsonl --workers 8
+    cat catalog.jsonl | python -m moodify analyze -
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mood_engine
+
+# Compiled lexicon files opened by path, per process
+_opened = {}
+
+# Records sent to a worker process at a time
+CHUNK_SIZE = 256
+
+# Lyric files picked up when the input is a directory
+TEXT_EXTENSIONS = ('.txt', '.lrc')
+
+
+def read_directory(root):
+    """Yield a record per lyrics file under a directory ("Artist - Title.txt")"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in TEXT_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, encoding='utf-8', errors='replace') as f:
+                lyrics = f.read()
+            record = {'id': os.path.relpath(path, root), 'lyrics': lyrics}
+            if ' - ' in stem:
+                record['artist'], record['title'] = (s.strip() for s in stem.split(' - ', 1))
+            yield record
+
+
+def read_jsonl(lines, source="<stdin>"):
+    """Yield records from JSON lines with a "lyrics" (or "text") field"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"{source}:{number}: skipped, invalid JSON ({e})", file=sys.stderr)
+            continue
+        if not isinstance(record, dict):
+            print(f"{source}:{number}: skipped, not an object", file=sys.stderr)
+            continue
+        record.setdefault('id', number)
+        yield record
+
+
+def read_records(source):
+    """Records from a directory, a JSONL file, or stdin for "-" """
+    if source == '-':
+        yield from read_jsonl(sys.stdin)
+    elif os.path.isdir(source):
+        yield from read_directory(source)
+    else:
+        with open(source, encoding='utf-8') as f:
+            yield from read_jsonl(f, source)
+
+
+def get_lexicon(name):
+    """A built-in lexicon by name, or a compiled .mlex file by path"""
+    if name == 'default':
+        return mood_engine.DEFAULT_LEXICON
+    if name in mood_engine.BUILTIN_LEXICONS:
+        return mood_engine.BUILTIN_LEXICONS[name]
+    if name not in _opened:
+        _opened[name] = mood_engine.MoodLexicon(path=name)
+    return _opened[name]
+
+
+def analyze_chunk(records, lexicon_name, limit):
+    """Analyze a chunk of records in a worker process; returns JSON lines"""
+    texts = []
+    for record in records:
+        lyrics = record.pop('lyrics', None)
+        if lyrics is None:
+            lyrics = record.pop('text', '')
+        texts.append(lyrics or '')
+
+    lines = []
+    results = get_lexicon(lexicon_name).score_batch(texts, limit)
+    for record, (mood, keywords, scores) in zip(records, results):
+        record['mood'] = mood
+        record['scores'] = scores
+        record['keywords'] = keywords
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def chunked(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_stream(records, lexicon='default', limit=5, workers=None, chunk_size=CHUNK_SIZE):
+    """Yield JSON result lines in input order, analyzing chunks in parallel
+
+    Only a few chunks per worker are in flight, so memory stays bounded
+    however large the input is.
+    """
+    chunks = chunked(records, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield from analyze_chunk(chunk, lexicon, limit)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        max_in_flight = 2 * workers
+        for chunk in chunks:
+            in_flight.append(pool.submit(analyze_chunk, chunk, lexicon, limit))
+            if len(in_flight) >= max_in_flight:
+                yield from in_flight.pop(0).result()
+        for future in in_flight:
+            yield from future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="moodify analyze",
+                                     description="Classify the mood of many lyrics at once")
+    parser.add_argument("source", help="directory of .txt lyrics, JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default stdout)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--lexicon", default="default",
+                        help="default, minimal, simple, or a compiled .mlex file")
+    parser.add_argument("--keywords", type=int, default=5, help="keywords per song")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.source != '-' and not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+    try:
+        get_lexicon(args.lexicon).compiled
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot load lexicon {args.lexicon}: {e}")
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    started = time.perf_counter()
+    count = 0
+    try:
+        for line in analyze_stream(read_records(args.source), args.lexicon, args.keywords,
+                                   args.workers, max(1, args.chunk_size)):
+            out.write(line + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"Analyzed {count} songs in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
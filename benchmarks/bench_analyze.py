@@ -0,0 +1,40 @@
+"""
+BENCH ANALYZE - analyze_mood on short and very long lyrics
+Run from the repo root: python benchmarks/bench_analyze.py [repeat]
+"""
+import json
+import random
+import sys
+
+from harness import summarize, time_calls
+
+import mood_engine
+
+SHORT = """I'm happy today, the sun is shining
+Love is in the air, everything's fine
+Smiling all day, feeling so good
+This joy in my heart, understood"""
+
+
+def long_lyrics(words=50000, seed=3):
+    """A very long text (an album's worth of lyrics) with ~8% keywords"""
+    rng = random.Random(seed)
+    keywords = [w for words in mood_engine.MOOD_KEYWORDS.values() for w in words]
+    filler = SHORT.lower().replace(",", "").split()
+    return " ".join(rng.choice(keywords) if rng.random() < 0.08 else rng.choice(filler)
+                    for _ in range(words))
+
+
+def run(repeat=200):
+    rows = []
+    for case, text, count in (("short", SHORT, repeat * 10), ("long", long_lyrics(), repeat // 10)):
+        row = summarize(time_calls(lambda: mood_engine.analyze_mood(text), max(5, count)))
+        row.update(bench="analyze_mood", case=case, chars=len(text))
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for row in run(repeat):
+        print(json.dumps(row))
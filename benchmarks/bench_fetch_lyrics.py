@@ -0,0 +1,49 @@
+"""
+BENCH FETCH LYRICS - MoodifyPlayer.fetch_lyrics cold vs. cached, offline
+Run from the repo root: python benchmarks/bench_fetch_lyrics.py [songs] [latency]
+Cold lookups go to a local stub server; "memory" hits the in-process
+LRU and "disk" re-opens the SQLite cache the way a restart would.
+"""
+import argparse
+import json
+
+import harness
+from harness import summarize, time_calls
+
+from lyrics_cache import LyricsCache
+from lyrics_client import LyricsClient
+from lyrics_stub_server import StubLyricsServer
+
+
+def run(count=200, latency=0.0):
+    songs = [(f"Song {i}", f"Artist {i % 17}") for i in range(count)]
+    app, root = harness.make_app()
+    rows = []
+    try:
+        with StubLyricsServer(latency=latency) as server:
+            app._lyrics_client = LyricsClient(base_url=server.url)
+
+            for case in ("cold", "memory", "disk"):
+                if case == "disk":
+                    app.lyrics_cache.close()
+                    app.lyrics_cache = LyricsCache()
+                before = server.requests
+                queue = iter(songs)
+                row = summarize(time_calls(lambda: app.fetch_lyrics(*next(queue)), count))
+                row.update(bench="fetch_lyrics", case=case, latency_s=latency,
+                           http_requests=server.requests - before)
+                rows.append(row)
+    finally:
+        harness.close_app(app)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    harness.add_tk_argument(parser)
+    parser.add_argument("songs", nargs="?", type=int, default=200)
+    parser.add_argument("latency", nargs="?", type=float, default=0.0)
+    args = parser.parse_args()
+    harness.setup_tk(args.tk)
+    for row in run(args.songs, args.latency):
+        print(json.dumps(row))
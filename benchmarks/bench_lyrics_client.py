@@ -0,0 +1,59 @@
+"""
+BENCH LYRICS CLIENT - Pooled session vs one-off requests.get, offline
+Run from the repo root: python benchmarks/bench_lyrics_client.py [requests] [latency]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from lyrics_client import LyricsClient
+from lyrics_stub_server import StubLyricsServer
+
+
+def measure(fetch, count):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        fetch("Artist", f"Song {i}")
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "req_per_s": round(count / total, 1),
+    }
+
+
+def run(count=500, latency=0.0):
+    results = []
+    with StubLyricsServer(latency=latency) as server:
+        client = LyricsClient(base_url=server.url)
+        before = server.connections
+        row = measure(client.get, count)
+        row.update(bench="lyrics_client", mode="pooled", requests=count,
+                   connections=server.connections - before)
+        results.append(row)
+        client.close()
+
+        before = server.connections
+        row = measure(lambda artist, title: requests.get(
+            LyricsClient(base_url=server.url).url(artist, title), timeout=5), count)
+        row.update(bench="lyrics_client", mode="requests.get", requests=count,
+                   connections=server.connections - before)
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    for row in run(count, latency):
+        print(json.dumps(row))
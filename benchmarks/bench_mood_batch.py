@@ -0,0 +1,56 @@
+"""
+BENCH MOOD BATCH - analyze_mood loop vs analyze_mood_batch
+Run from the repo root: python benchmarks/bench_mood_batch.py [sizes...]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mood_engine
+
+FILLER = ("the night is young and we are here again with the city lights "
+          "walking down the road i can feel it in my bones tonight").split()
+
+
+def make_lyrics(count, seed=42):
+    """Synthetic lyrics mixing filler words with lexicon keywords"""
+    rng = random.Random(seed)
+    keywords = [w for words in mood_engine.MOOD_KEYWORDS.values() for w in words]
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(keywords) if rng.random() < 0.08 else rng.choice(FILLER)
+                 for _ in range(rng.randint(80, 300))]
+        texts.append(" ".join(words))
+    return texts
+
+
+def run(size):
+    texts = make_lyrics(size)
+
+    start = time.perf_counter()
+    looped = [mood_engine.analyze_mood(text) for text in texts]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = mood_engine.analyze_mood_batch(texts)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "bench": "analyze_mood_batch",
+        "songs": size,
+        "numpy": mood_engine.load_numpy(),
+        "loop_s": round(loop_time, 4),
+        "batch_s": round(batch_time, 4),
+        "speedup": round(loop_time / batch_time, 2) if batch_time else None,
+        "identical": looped == batched,
+    }
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        print(json.dumps(run(size)))
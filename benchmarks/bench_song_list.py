@@ -0,0 +1,53 @@
+"""
+BENCH SONG LIST - filter_songs and update_song_listbox at 1k/10k/100k songs
+Run from the repo root: python benchmarks/bench_song_list.py [--tk real] [sizes...]
+Uses a stand-in tkinter by default, so this measures the player's own
+work (search, row rendering) rather than the Tk server.
+"""
+import argparse
+import json
+
+import harness
+from harness import summarize, time_calls
+
+# Typed one key at a time, like a user narrowing the list
+QUERIES = ["l", "lo", "lov", "love", "love n", "night", "ci", "city", "zzz", ""]
+
+
+def run(sizes=(1000, 10000, 100000), repeat=20):
+    from search import SongSearchIndex
+    from tracks import TrackList
+
+    app, root = harness.make_app()
+    rows = []
+    try:
+        for size in sizes:
+            songs = TrackList(harness.synthetic_tracks(size))
+            app.song_list = songs
+            app.search_index = SongSearchIndex(songs)
+
+            row = summarize(time_calls(app.update_song_listbox, repeat))
+            row.update(bench="update_song_listbox", songs=size)
+            rows.append(row)
+
+            def type_queries():
+                for query in QUERIES:
+                    app.search_var.set(query)
+                    app.filter_songs()
+
+            row = summarize(time_calls(type_queries, repeat))
+            row.update(bench="filter_songs", songs=size, queries=len(QUERIES))
+            rows.append(row)
+    finally:
+        harness.close_app(app)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    harness.add_tk_argument(parser)
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    harness.setup_tk(args.tk)
+    for row in run(args.sizes):
+        print(json.dumps(row))
@@ -0,0 +1,71 @@
+"""
+BENCH STARTUP - Cold start of the player in a fresh interpreter
+Run from the repo root: python benchmarks/bench_startup.py [--tk real] [runs]
+With the stand-in tkinter this times interpreter start, imports and
+building the window; with --tk real (needs a display, e.g. xvfb-run) it
+runs `moodify.py --startup-time`, which waits for the first real frame.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import harness
+from harness import summarize
+
+FAKE_START = """
+import sys
+sys.path.insert(0, {bench!r})
+import harness
+harness.install_fake_tk()
+app, root = harness.make_app()
+app.first_frame()
+import json
+print(json.dumps({{"startup_s": app.startup_time}}))
+harness.close_app(app)
+"""
+
+
+def start_once(mode):
+    """(wall seconds for the whole process, import -> first frame seconds)"""
+    if mode == "fake":
+        script = FAKE_START.format(bench=os.path.join(harness.ROOT, "benchmarks"))
+        command = [sys.executable, "-c", script]
+    else:
+        command = [sys.executable, os.path.join(harness.ROOT, "moodify.py"), "--startup-time"]
+    env = dict(os.environ, PYTHONPATH=harness.ROOT, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=tempfile.mkdtemp(prefix="moodify-bench-"), env=env,
+                             capture_output=True, text=True, check=False)
+    wall = time.perf_counter() - start
+    reports = [line for line in process.stdout.splitlines() if line.startswith("{")]
+    if not reports:
+        raise RuntimeError(f"Startup run failed:\n{process.stderr}")
+    report = json.loads(reports[-1])
+    return wall, report["startup_s"]
+
+
+def run(runs=5, mode="fake"):
+    walls, firsts = [], []
+    for _ in range(runs):
+        wall, first = start_once(mode)
+        walls.append(wall)
+        firsts.append(first)
+    rows = []
+    for case, latencies in (("process", walls), ("import_to_first_frame", firsts)):
+        row = summarize(latencies)
+        row.update(bench="startup", case=case, tk=mode)
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    harness.add_tk_argument(parser)
+    parser.add_argument("runs", nargs="?", type=int, default=5)
+    args = parser.parse_args()
+    for row in run(args.runs, args.tk):
+        print(json.dumps(row))
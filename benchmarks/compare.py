@@ -0,0 +1,53 @@
+"""
+COMPARE - Side-by-side p50s of two run_all.py results files
+Run from the repo root: python benchmarks/compare.py old.jsonl new.jsonl [threshold]
+Exits non-zero if any benchmark got slower by more than the threshold
+(default 0.2 = 20%).
+"""
+import json
+import sys
+
+# Fields that identify a row; everything else is a measurement
+KEY_FIELDS = ("bench", "case", "mode", "songs", "queries", "chars", "tk", "latency_s")
+
+# Timing fields compared, in order of preference
+TIME_FIELDS = ("p50_ms", "batch_s")
+
+
+def load(path):
+    rows = {}
+    with open(path) as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("bench") == "environment":
+                continue
+            key = tuple((field, row[field]) for field in KEY_FIELDS if field in row)
+            rows[key] = row
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    old, new = load(argv[0]), load(argv[1])
+    threshold = float(argv[2]) if len(argv) > 2 else 0.2
+
+    regressions = 0
+    for key, row in new.items():
+        before = old.get(key)
+        field = next((f for f in TIME_FIELDS if f in row), None)
+        if before is None or field is None or not before.get(field):
+            continue
+        ratio = row[field] / before[field]
+        name = " ".join(str(value) for _, value in key)
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<50} {before[field]:>12.4f} {row[field]:>12.4f} {ratio:>6.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
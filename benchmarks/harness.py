@@ -0,0 +1,173 @@
+"""
+HARNESS - Shared helpers for the benchmark suite
+Timing summaries, synthetic songs, and a stand-in tkinter so the
+player's Python-side work (filtering, row rendering) can be measured
+without a display. Use real Tk under Xvfb by passing --tk real.
+"""
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = ("love night fire heart dance rain summer blue gold dream road city "
+         "light shadow river wild sweet lonely electric midnight ocean star").split()
+
+
+def summarize(latencies):
+    """p50/p99/min/mean in milliseconds for a list of durations in seconds"""
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 4),
+        "p99_ms": round(ordered[math.ceil(len(ordered) * 0.99) - 1] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+    }
+
+
+def time_calls(func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def synthetic_tracks(count, seed=7):
+    """Tracks with plausible two/three word titles across ~count/10 artists"""
+    from tracks import Track
+    rng = random.Random(seed)
+    artists = [f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+               for _ in range(max(1, count // 10))]
+    return [Track(i + 1, " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 3))),
+                  rng.choice(artists))
+            for i in range(count)]
+
+
+class FakeWidget:
+    """Accepts any widget call; enough of Tk for MoodifyPlayer to build its window"""
+
+    def __init__(self, master=None, *args, **options):
+        self.master = master
+        self.options = options
+        self.value = options.get("value", "")
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def cget(self, key):
+        return self.options.get(key, "")
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def curselection(self):
+        return ()
+
+    # StringVar
+    def get(self, *args):
+        return self.value if not args else ""
+
+    def set(self, *args):
+        self.value = args[0] if len(args) == 1 else self.value
+
+
+class FakeTk(FakeWidget):
+    """Root window whose after() callbacks only run when asked"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, func=None, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (func, args)
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def run_pending(self):
+        """Run the queued after() callbacks once (they may queue more)"""
+        jobs, self.pending = self.pending, {}
+        for func, args in jobs.values():
+            if func is not None:
+                func(*args)
+
+
+class FakeFont:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def metrics(self, *args):
+        return 15
+
+
+def install_fake_tk():
+    """Replace tkinter in sys.modules; call before importing moodify"""
+    tk = types.ModuleType("tkinter")
+    tk.Tk = FakeTk
+    for name in ("Frame", "Label", "Button", "Entry", "Listbox", "Scrollbar",
+                 "Canvas", "StringVar", "BooleanVar", "OptionMenu", "Text", "Toplevel",
+                 "Checkbutton"):
+        setattr(tk, name, FakeWidget)
+    for name in ("END", "BOTH", "LEFT", "RIGHT", "TOP", "BOTTOM", "X", "Y", "W", "E",
+                 "N", "S", "SINGLE", "RAISED", "SUNKEN", "WORD", "NORMAL", "DISABLED"):
+        setattr(tk, name, name.lower())
+
+    scrolledtext = types.ModuleType("tkinter.scrolledtext")
+    scrolledtext.ScrolledText = FakeWidget
+    messagebox = types.ModuleType("tkinter.messagebox")
+    for name in ("showinfo", "showerror", "showwarning", "askyesno"):
+        setattr(messagebox, name, lambda *args, **kwargs: None)
+    font = types.ModuleType("tkinter.font")
+    font.Font = FakeFont
+
+    tk.scrolledtext, tk.messagebox, tk.font = scrolledtext, messagebox, font
+    sys.modules.update({"tkinter": tk, "tkinter.scrolledtext": scrolledtext,
+                        "tkinter.messagebox": messagebox, "tkinter.font": font})
+
+
+def setup_tk(mode):
+    """'fake' installs the stand-in tkinter; 'real' needs a display (e.g. Xvfb)"""
+    if mode == "fake":
+        tk = sys.modules.get("tkinter")
+        if "moodify" in sys.modules and getattr(tk, "Tk", None) is not FakeTk:
+            raise RuntimeError("moodify was imported before the fake tkinter was installed")
+        install_fake_tk()
+
+
+def make_app():
+    """A MoodifyPlayer with its data files in a fresh temp directory
+
+    Returns (app, root). Background work only reaches the app through
+    root.after, so with the fake Tk nothing changes behind the benchmark.
+    """
+    os.chdir(tempfile.mkdtemp(prefix="moodify-bench-"))
+    os.makedirs("songs", exist_ok=True)
+    import tkinter as tk
+    import moodify
+    root = tk.Tk()
+    app = moodify.MoodifyPlayer(root)
+    return app, root
+
+
+def close_app(app):
+    app.on_close()
+    os.chdir(ROOT)
+
+
+def add_tk_argument(parser):
+    parser.add_argument("--tk", choices=("fake", "real"), default="fake",
+                        help="stand-in tkinter (default) or real Tk, e.g. under xvfb-run")
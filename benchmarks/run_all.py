@@ -0,0 +1,74 @@
+"""
+RUN ALL - The whole benchmark suite as JSON lines, headless
+Run from the repo root:
+    python benchmarks/run_all.py -o bench-$(git rev-parse --short HEAD).jsonl
+    xvfb-run python benchmarks/run_all.py --tk real
+Compare two runs with benchmarks/compare.py.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import harness
+
+
+def environment():
+    """First line of every results file: what was measured, and where"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=harness.ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import mood_engine
+    return {
+        "bench": "environment",
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": mood_engine.load_numpy(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every Moodify benchmark")
+    harness.add_tk_argument(parser)
+    parser.add_argument("-o", "--output", default="-", help="JSONL file (default stdout)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, fewer repeats")
+    args = parser.parse_args(argv)
+    harness.setup_tk(args.tk)
+
+    import bench_analyze
+    import bench_fetch_lyrics
+    import bench_lyrics_client
+    import bench_mood_batch
+    import bench_song_list
+    import bench_startup
+
+    sizes = (1000, 10000) if args.quick else (1000, 10000, 100000)
+    suites = [
+        lambda: bench_analyze.run(50 if args.quick else 200),
+        lambda: [bench_mood_batch.run(2000 if args.quick else 10000)],
+        lambda: bench_song_list.run(sizes),
+        lambda: bench_fetch_lyrics.run(50 if args.quick else 200),
+        lambda: bench_lyrics_client.run(100 if args.quick else 500),
+        lambda: bench_startup.run(2 if args.quick else 5, args.tk),
+    ]
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        out.write(json.dumps(environment()) + "\n")
+        for suite in suites:
+            for row in suite():
+                out.write(json.dumps(row) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+COVER ART - Album art thumbnails without blocking the window
+Art comes from the audio file's tags (or a cover.jpg next to it). It is
+decoded and downscaled in a worker pool and stored as a small PNG in
+lyrics_data/covers/, so each file is decoded once. The Tk thread only
+turns thumbnails into PhotoImages and keeps the most recent ones in a
+bounded LRU, so showing art seen before is a dict lookup.
+"""
+import base64
+import hashlib
+import io
+import os
+import tkinter as tk
+
+import library
+import storage
+from workers import BackgroundWorker
+
+COVER_DIR = os.path.join("lyrics_data", "covers")
+
+# Thumbnail edge in pixels
+THUMB_SIZE = 96
+
+# Image files in a song's folder used when its tags have no art
+FOLDER_IMAGES = ("cover.jpg", "cover.png", "folder.jpg", "front.jpg", "album.jpg")
+
+# Pillow is imported by the first thumbnail, not at startup
+Image = None
+
+
+def load_pillow():
+    """Import Pillow on demand; False if it is not installed"""
+    global Image
+    if Image is None:
+        try:
+            from PIL import Image as module
+        except ImportError:  # No art, everything else works
+            return False
+        Image = module
+    return True
+
+
+def embedded_art(path):
+    """Image bytes from an audio file's tags (front cover first), or None"""
+    if not library.load_mutagen():
+        return None
+    try:
+        audio = library.mutagen.File(path)
+    except Exception:
+        return None
+    if audio is None:
+        return None
+
+    pictures = getattr(audio, "pictures", None)  # FLAC
+    if pictures:
+        return pictures[0].data
+    tags = audio.tags
+    if tags is None:
+        return None
+    if hasattr(tags, "getall"):  # ID3 (MP3)
+        frames = sorted(tags.getall("APIC"), key=lambda frame: frame.type != 3)
+        return frames[0].data if frames else None
+    covers = tags.get("covr")  # MP4
+    if covers:
+        return bytes(covers[0])
+    blocks = tags.get("metadata_block_picture")  # Ogg Vorbis/Opus
+    if blocks:
+        from mutagen.flac import Picture
+        try:
+            return Picture(base64.b64decode(blocks[0])).data
+        except Exception:
+            return None
+    return None
+
+
+def folder_art(path):
+    """Bytes of a cover image next to an audio file, or None"""
+    folder = os.path.dirname(path)
+    for name in FOLDER_IMAGES:
+        try:
+            with open(os.path.join(folder, name), "rb") as f:
+                return f.read()
+        except OSError:
+            continue
+    return None
+
+
+def make_thumbnail(data, size=THUMB_SIZE):
+    """PNG bytes of an image scaled to fit size x size"""
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (size, size))  # JPEGs decode at reduced scale: far less work
+    image = image.convert("RGB")
+    image.thumbnail((size, size), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, "PNG")
+    return out.getvalue()
+
+
+class CoverArt:
+    """Thumbnails by audio file path, loaded in the background
+
+    get() answers from memory when it can and otherwise calls back on
+    the Tk thread once the thumbnail is ready (None: the file has no art).
+    """
+
+    def __init__(self, root, directory=COVER_DIR, size=THUMB_SIZE, memory_entries=128):
+        self.directory = directory
+        self.size = size
+        self.images = storage.LRUCache(memory_entries)  # path -> PhotoImage, or None for no art
+        self.waiting = {}            # path -> (future, [callbacks])
+        self.worker = BackgroundWorker(root, max_workers=2)
+        # Separate pool so warming the visible rows never delays the playing song
+        self.background = BackgroundWorker(root, max_workers=1)
+
+    def get(self, path, callback=None, foreground=True):
+        """The PhotoImage for a file if it is in memory; else load it and call back"""
+        if path in self.images:
+            image = self.images.get(path)
+            if callback:
+                callback(image)
+            return image
+
+        future, callbacks = self.waiting.get(path, (None, []))
+        if callback:
+            callbacks.append(callback)
+        if future is not None and not (foreground and future.cancel()):
+            return None
+        worker = self.worker if foreground else self.background
+        future = worker.submit(self.load_thumbnail, path,
+                               on_done=lambda png: self._loaded(path, png),
+                               on_error=lambda error: self._loaded(path, None))
+        self.waiting[path] = (future, callbacks)
+        return None
+
+    def prefetch(self, paths):
+        """Warm thumbnails for files that may be shown soon (e.g. visible rows)"""
+        for path in paths:
+            if path not in self.images and path not in self.waiting:
+                self.get(path, foreground=False)
+
+    def cache_path(self, path):
+        """Thumbnail file of an audio file's current version"""
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def load_thumbnail(self, path):
+        """PNG thumbnail bytes, b'' for no art (runs on a worker thread)"""
+        if not load_pillow():
+            return b""
+        base = self.cache_path(path)
+        try:
+            with open(base + ".png", "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+        if os.path.exists(base + ".none"):
+            return b""
+
+        data = embedded_art(path) or folder_art(path)
+        png = b""
+        if data:
+            try:
+                png = make_thumbnail(data, self.size)
+            except Exception as e:
+                print(f"Cover art error for {path}: {e}")
+        os.makedirs(self.directory, exist_ok=True)
+        target = base + (".png" if png else ".none")
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, target)
+        return png
+
+    def _loaded(self, path, png):
+        """Make the PhotoImage and answer everyone waiting (runs on the Tk thread)"""
+        future, callbacks = self.waiting.pop(path, (None, []))
+        image = tk.PhotoImage(data=base64.b64encode(png).decode("ascii")) if png else None
+        self.images.put(path, image)
+        for callback in callbacks:
+            callback(image)
+
+    def shutdown(self):
+        self.worker.shutdown()
+        self.background.shutdown()
@@ -0,0 +1,217 @@
+"""
+HISTORY - Append-only listening log with running mood statistics
+Every play, pause, resume, stop and detected mood is one tab-separated
+line in lyrics_data/history.log. Aggregates (listening time and plays
+per day and mood, moods per artist) are updated as events arrive and
+saved with the log offset they cover, so opening the history only
+replays lines written since the last save, and views never scan the log.
+"""
+import json
+import os
+import time
+
+HISTORY_PATH = os.path.join("lyrics_data", "history.log")
+STATS_PATH = os.path.join("lyrics_data", "history_stats.json")
+STATS_VERSION = 1
+
+# Events
+PLAY, PAUSE, RESUME, STOP, MOOD = "play", "pause", "resume", "stop", "mood"
+
+# Longest span counted as listening (covers a crash or a missed stop)
+MAX_SPAN_S = 30 * 60
+
+# Events between saves of the aggregates
+SAVE_EVERY = 20
+
+UNKNOWN = "unknown"
+
+
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def clean_field(text):
+    """A log field: no tabs or line breaks"""
+    return " ".join(str(text or "").split())
+
+
+class MoodStats:
+    """Running aggregates over history events"""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.days = data.get("days", {})        # day -> mood -> [plays, seconds]
+        self.artists = data.get("artists", {})  # artist -> mood -> plays
+        self.total_plays = data.get("total_plays", 0)
+        self.total_seconds = data.get("total_seconds", 0.0)
+        # The track being listened to: [artist, mood, span start or None, day]
+        self.current = data.get("current")
+
+    def to_dict(self):
+        return {"days": self.days, "artists": self.artists, "total_plays": self.total_plays,
+                "total_seconds": round(self.total_seconds, 3), "current": self.current}
+
+    def apply(self, timestamp, event, mood="", artist=""):
+        """Fold one event into the aggregates"""
+        current = self.current
+        if event == PLAY:
+            self._finish(timestamp)
+            self.current = [artist, mood or UNKNOWN, timestamp, day_of(timestamp)]
+        elif current is None:
+            return
+        elif event == MOOD:
+            current[1] = mood or UNKNOWN
+        elif event == PAUSE:
+            self._close_span(timestamp)
+        elif event == RESUME:
+            if current[2] is None:
+                current[2] = timestamp
+        elif event == STOP:
+            self._finish(timestamp)
+
+    def _close_span(self, timestamp):
+        """Count the listening time since the last play or resume"""
+        current = self.current
+        if current[2] is None:
+            return
+        seconds = min(max(0.0, timestamp - current[2]), MAX_SPAN_S)
+        current[2] = None
+        self._day(current[3], current[1])[1] += seconds
+        self.total_seconds += seconds
+
+    def _finish(self, timestamp):
+        """The current track is over: count the play under its final mood"""
+        if self.current is None:
+            return
+        self._close_span(timestamp)
+        artist, mood, _, day = self.current
+        self._day(day, mood)[0] += 1
+        moods = self.artists.setdefault(artist or UNKNOWN, {})
+        moods[mood] = moods.get(mood, 0) + 1
+        self.total_plays += 1
+        self.current = None
+
+    def _day(self, day, mood):
+        return self.days.setdefault(day, {}).setdefault(mood, [0, 0.0])
+
+    def recent_days(self, count=30):
+        """[(day, {mood: seconds})] for the last `count` days with listening"""
+        return [(day, {mood: value[1] for mood, value in self.days[day].items()})
+                for day in sorted(self.days)[-count:]]
+
+    def mood_totals(self):
+        """{mood: seconds} over all time"""
+        totals = {}
+        for moods in self.days.values():
+            for mood, (_, seconds) in moods.items():
+                totals[mood] = totals.get(mood, 0.0) + seconds
+        return totals
+
+    def top_artists(self, count=5):
+        """[(artist, plays, [(mood, plays), ...] strongest first)]"""
+        ranked = sorted(self.artists.items(), key=lambda item: -sum(item[1].values()))
+        return [(artist, sum(moods.values()),
+                 sorted(moods.items(), key=lambda item: -item[1]))
+                for artist, moods in ranked[:count]]
+
+    def report(self, artists=5):
+        """Text summary for the mood history view"""
+        hours, minutes = divmod(int(self.total_seconds // 60), 60)
+        lines = [f"Listened {hours}h {minutes:02d}m over {self.total_plays} plays", ""]
+        totals = self.mood_totals()
+        listened = sum(totals.values())
+        for mood, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+            if listened:
+                lines.append(f"{mood:<12}{seconds / listened:>6.0%}")
+        if self.artists:
+            lines += ["", "Top artists"]
+        for artist, plays, moods in self.top_artists(artists):
+            top = ", ".join(mood for mood, _ in moods[:2])
+            lines.append(f"{artist[:24]:<26}{plays:>5}  {top}")
+        return "\n".join(lines)
+
+
+class ListeningHistory:
+    """The history log plus aggregates kept in step with it"""
+
+    def __init__(self, path=HISTORY_PATH, stats_path=STATS_PATH):
+        self.path = path
+        self.stats_path = stats_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.stats, self.offset = self._load_stats()
+        self.unsaved = 0
+        self.catch_up()
+        self.log = open(path, "a", encoding="utf-8", newline="\n")
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == STATS_VERSION:
+                return MoodStats(data["stats"]), data["offset"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return MoodStats(), 0
+
+    def catch_up(self):
+        """Apply log lines written after the saved aggregates (all of them if the log was replaced)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self.offset:
+            self.stats, self.offset = MoodStats(), 0
+        if size == self.offset:
+            return
+        torn = False
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                self.offset += len(line)
+                self._apply_line(line.decode("utf-8", errors="replace"))
+        if torn:
+            # Half-written last line from a crash: drop it so appends start clean
+            with open(self.path, "r+b") as f:
+                f.truncate(self.offset)
+        self.save()
+
+    def _apply_line(self, line):
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) < 4:
+            return
+        try:
+            timestamp = float(fields[0])
+        except ValueError:
+            return
+        self.stats.apply(timestamp, fields[1], fields[2], fields[3])
+
+    def record(self, event, song=None, mood=None, timestamp=None):
+        """Append an event and update the aggregates"""
+        timestamp = time.time() if timestamp is None else timestamp
+        artist = song.artist if song is not None else ""
+        title = song.title if song is not None else ""
+        line = "\t".join((f"{timestamp:.3f}", event, clean_field(mood),
+                          clean_field(artist), clean_field(title))) + "\n"
+        self.log.write(line)
+        self.log.flush()
+        self.offset += len(line.encode("utf-8"))
+        self.stats.apply(round(timestamp, 3), event, clean_field(mood), clean_field(artist))
+        self.unsaved += 1
+        if self.unsaved >= SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        """Write the aggregates and the log offset they cover"""
+        data = {"version": STATS_VERSION, "offset": self.offset, "stats": self.stats.to_dict()}
+        tmp = f"{self.stats_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.stats_path)
+        self.unsaved = 0
+
+    def close(self):
+        self.log.close()
+        self.save()
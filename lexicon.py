@@ -0,0 +1,305 @@
+"""
+LEXICON - Compiled, memory-mapped mood lexicons
+A lexicon source lists weighted terms per mood: plain words, stems
+("happ*" matches happy, happiness...) and phrases ("broken heart").
+`build` compiles it into a .mlex file: a header, the mood names, an
+open-addressing hash table and the term entries. Opening one only
+reads the header, and each lookup touches a few bytes of the mapping,
+so startup and per-call cost do not grow with the number of terms.
+
+    python lexicon.py build my_lexicon.tsv lyrics_data/lexicons/research.mlex
+    python lexicon.py build-builtin [directory]
+    MOODIFY_LEXICON=lyrics_data/lexicons/research.mlex python moodify.py
+
+Sources are JSON ({mood: [term, ...]} or {mood: {term: weight}}) or
+TSV/CSV lines of "term, mood[, weight]" ('#' starts a comment).
+"""
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+
+MAGIC = b"MOODLEX1"
+FORMAT_VERSION = 1
+
+# magic, format, flags, moods, max phrase words, slots, terms,
+# stem length bitmask, moods offset, slots offset, data offset, digest
+HEADER = struct.Struct("<8sHHHHIIQIII20s")
+SLOT = struct.Struct("<II")        # crc32 of the key, offset of its entry (0 = empty)
+KEY_LENGTH = struct.Struct("<H")
+ENTRY = struct.Struct("<BB")       # flags, posting count
+POSTING = struct.Struct("<HIf")    # mood, rank within the mood, weight
+
+# Header flags
+INTEGRAL_WEIGHTS = 1               # Every weight is a whole number
+
+# Entry flags
+HAS_POSTINGS = 1
+STARTS_PHRASE = 2
+
+# A word is letters/digits with optional inner apostrophes ("don't", "i'm");
+# used both to compile terms and by mood_engine to tokenize lyrics
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+# Where the built-in lexicons are compiled to: next to this module, not
+# the current directory, so every app and the CLI share one copy
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lyrics_data", "lexicons")
+
+
+class LexiconError(ValueError):
+    """A lexicon source or compiled file that cannot be used"""
+
+
+def normalize_term(term):
+    """Canonical key of a source term: 'word', 'stem*' or 'two words'"""
+    term = term.strip().lower()
+    stem = term.endswith("*")
+    tokens = TOKEN_RE.findall(term[:-1] if stem else term)
+    if not tokens:
+        raise LexiconError(f"Term {term!r} has no words")
+    if stem:
+        if len(tokens) != 1:
+            raise LexiconError(f"Stem {term!r} must be a single word")
+        return tokens[0] + "*"
+    if len(tokens) > 255:
+        raise LexiconError(f"Phrase {term!r} is too long")
+    return " ".join(tokens)
+
+
+def read_source(path):
+    """(moods, [(term, mood, weight), ...]) from a JSON, TSV or CSV source"""
+    entries = []
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for mood, terms in data.items():
+            if isinstance(terms, dict):
+                entries.extend((term, mood, float(weight)) for term, weight in terms.items())
+            else:
+                entries.extend((term, mood, 1.0) for term in terms)
+        return list(data), entries
+
+    delimiter = "," if path.endswith(".csv") else "\t"
+    moods = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        for number, row in enumerate(csv.reader(f, delimiter=delimiter), 1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            if len(row) < 2:
+                raise LexiconError(f"{path}:{number}: expected term{delimiter}mood[{delimiter}weight]")
+            try:
+                weight = float(row[2]) if len(row) > 2 and row[2].strip() else 1.0
+            except ValueError:
+                raise LexiconError(f"{path}:{number}: bad weight {row[2]!r}") from None
+            mood = row[1].strip()
+            moods.setdefault(mood, None)
+            entries.append((row[0], mood, weight))
+    return list(moods), entries
+
+
+def source_digest(moods, entries):
+    """Identifies a lexicon source; stored in the compiled file as its version"""
+    canonical = json.dumps([list(moods), [list(entry) for entry in entries]],
+                           ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).digest()
+
+
+def compile_lexicon(moods, entries):
+    """Compile (moods, [(term, mood, weight)]) into .mlex bytes"""
+    moods = list(moods)
+    entries = [(term, mood, float(weight)) for term, mood, weight in entries]
+    column = {mood: i for i, mood in enumerate(moods)}
+    if len(moods) > 0xFFFF:
+        raise LexiconError("Too many moods")
+
+    # term -> {mood: weight}; a repeated term/mood keeps the larger weight
+    terms = {}
+    order = {}
+    for position, (term, mood, weight) in enumerate(entries):
+        if mood not in column:
+            raise LexiconError(f"Unknown mood {mood!r} for {term!r}")
+        if weight < 0:
+            raise LexiconError(f"Negative weight for {term!r}")
+        key = normalize_term(term)
+        weights = terms.setdefault(key, {})
+        weights[mood] = max(weight, weights.get(mood, 0.0))
+        order.setdefault((key, mood), position)
+
+    # Rank terms within each mood: strongest first, then source order
+    ranks = {}
+    for mood in moods:
+        members = [key for key, weights in terms.items() if mood in weights]
+        members.sort(key=lambda key: (-terms[key][mood], order[key, mood]))
+        for rank, key in enumerate(members):
+            ranks[key, mood] = rank
+
+    # Phrase heads get an entry (maybe without postings) so the scanner knows to look ahead
+    flags = {key: HAS_POSTINGS for key in terms}
+    max_phrase = 1
+    stem_lengths = 0
+    for key in terms:
+        if " " in key:
+            words = key.split(" ")
+            max_phrase = max(max_phrase, len(words))
+            flags[words[0]] = flags.get(words[0], 0) | STARTS_PHRASE
+        elif key.endswith("*"):
+            if len(key) - 1 >= 64:
+                raise LexiconError(f"Stem {key!r} is too long")
+            stem_lengths |= 1 << (len(key) - 1)
+
+    mood_bytes = bytearray()
+    for mood in moods:
+        encoded = mood.encode("utf-8")
+        mood_bytes += KEY_LENGTH.pack(len(encoded)) + encoded
+
+    slot_count = 8
+    while slot_count < 2 * len(flags):
+        slot_count *= 2
+    moods_offset = HEADER.size
+    slots_offset = moods_offset + len(mood_bytes)
+    data_offset = slots_offset + slot_count * SLOT.size
+
+    # Entries: key length, key, flags, posting count, postings
+    data = bytearray()
+    slots = [(0, 0)] * slot_count  # Offset 0 marks an empty slot
+    for key, key_flags in flags.items():
+        encoded = key.encode("utf-8")
+        crc = zlib.crc32(encoded)
+        i = crc & (slot_count - 1)
+        while slots[i][1]:
+            i = (i + 1) & (slot_count - 1)
+        slots[i] = (crc, data_offset + len(data))
+
+        postings = terms.get(key, {})
+        data += KEY_LENGTH.pack(len(encoded)) + encoded
+        data += ENTRY.pack(key_flags, len(postings))
+        for mood, weight in postings.items():
+            data += POSTING.pack(column[mood], ranks[key, mood], weight)
+
+    body = bytes(mood_bytes) + b"".join(SLOT.pack(*slot) for slot in slots) + bytes(data)
+    integral = all(float(w).is_integer() for weights in terms.values() for w in weights.values())
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, INTEGRAL_WEIGHTS if integral else 0,
+                         len(moods), max_phrase, slot_count, len(terms), stem_lengths,
+                         moods_offset, slots_offset, data_offset, source_digest(moods, entries))
+    return header + body
+
+
+def write_lexicon(data, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"  # Batch workers may compile at the same time
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class CompiledLexicon:
+    """Read-only view of a compiled lexicon (a mapped file or bytes)"""
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self.buffer = buffer
+        if len(buffer) < HEADER.size:
+            raise LexiconError(f"{path or 'lexicon'} is too short")
+        (magic, fmt, self.flags, mood_count, self.max_phrase_words, self.slot_count,
+         self.term_count, stem_mask, moods_offset, self.slots_offset, self.data_offset,
+         digest) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise LexiconError(f"{path or 'lexicon'} is not a version {FORMAT_VERSION} .mlex file")
+        self.digest = digest
+        self.version = digest.hex()[:16]
+        self.integral = bool(self.flags & INTEGRAL_WEIGHTS)
+        self.stem_lengths = [n for n in range(64, 0, -1) if stem_mask >> n & 1]  # Longest first
+        self.mask = self.slot_count - 1
+
+        self.moods = []
+        offset = moods_offset
+        for _ in range(mood_count):
+            (length,) = KEY_LENGTH.unpack_from(buffer, offset)
+            self.moods.append(bytes(buffer[offset + 2:offset + 2 + length]).decode("utf-8"))
+            offset += 2 + length
+        self.column = {mood: i for i, mood in enumerate(self.moods)}
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a .mlex file (pages are read on demand)"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, path)
+
+    def entry(self, key):
+        """(flags, ((mood index, rank, weight), ...)) for a key, or None"""
+        encoded = key.encode("utf-8")
+        crc = zlib.crc32(encoded)
+        buffer = self.buffer
+        i = crc & self.mask
+        while True:
+            slot_crc, offset = SLOT.unpack_from(buffer, self.slots_offset + i * SLOT.size)
+            if not offset:
+                return None
+            if slot_crc == crc:
+                (length,) = KEY_LENGTH.unpack_from(buffer, offset)
+                start = offset + 2
+                if buffer[start:start + length] == encoded:
+                    flags, count = ENTRY.unpack_from(buffer, start + length)
+                    start += length + ENTRY.size
+                    postings = tuple(POSTING.unpack_from(buffer, start + n * POSTING.size)
+                                     for n in range(count))
+                    return flags, postings
+            i = (i + 1) & self.mask
+
+    def items(self):
+        """Yield (key, flags, postings) for every entry, in file order"""
+        buffer = self.buffer
+        offset = self.data_offset
+        while offset < len(buffer):
+            (length,) = KEY_LENGTH.unpack_from(buffer, offset)
+            key = bytes(buffer[offset + 2:offset + 2 + length]).decode("utf-8")
+            offset += 2 + length
+            flags, count = ENTRY.unpack_from(buffer, offset)
+            offset += ENTRY.size
+            postings = tuple(POSTING.unpack_from(buffer, offset + n * POSTING.size)
+                             for n in range(count))
+            offset += count * POSTING.size
+            yield key, flags, postings
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def build_builtin(directory=LEXICON_DIR):
+    """Compile the apps' built-in lexicons; returns the written paths"""
+    import mood_engine
+    paths = []
+    for lexicon in mood_engine.BUILTIN_LEXICONS.values():
+        path = os.path.join(directory, os.path.basename(lexicon.path))
+        write_lexicon(lexicon.compile_source(), path)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["build"] and len(argv) == 3:
+        moods, entries = read_source(argv[1])
+        data = compile_lexicon(moods, entries)
+        write_lexicon(data, argv[2])
+        lexicon = CompiledLexicon(data)
+        print(f"{argv[2]}: {lexicon.term_count} terms, {len(lexicon.moods)} moods, "
+              f"{len(data) / 1024:.0f} KiB, version {lexicon.version}")
+        return 0
+    if argv[:1] == ["build-builtin"] and len(argv) <= 2:
+        for path in build_builtin(*argv[1:]):
+            print(path)
+        return 0
+    print(__doc__.strip().split("\n\n")[1], file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+LIBRARY - Scan the songs/ folder into a persisted track index
+Only files whose mtime or size changed since the last scan have their
+tags re-read, so startup stays fast for very large libraries. Audio
+mood features are computed separately, in a process pool.
+"""
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import mood_engine
+import storage
+from audio_features import audio_features
+from tracks import Track
+
+# mutagen is imported by the first scan, not at startup
+mutagen = None
+
+DEFAULT_INDEX_PATH = os.path.join("lyrics_data", "track_index.sqlite3")
+SCHEMA_VERSION = 4
+
+# How often a running audio analysis checks whether it should stop (s)
+STOP_POLL_S = 0.1
+
+# audio_state values
+AUDIO_PENDING, AUDIO_DONE, AUDIO_FAILED = 0, 1, 2
+
+AUDIO_EXTENSIONS = {'.mp3', '.ogg', '.wav', '.flac', '.m4a', '.opus'}
+
+
+def walk_audio_files(root):
+    """Yield (path, mtime_ns, size) for every audio file under root"""
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, stat.st_mtime_ns, stat.st_size
+
+
+def load_mutagen():
+    """Import mutagen on demand; False if it is not installed"""
+    global mutagen
+    if mutagen is None:
+        try:
+            import mutagen as module
+        except ImportError:  # Fall back to "Artist - Title.mp3" file names
+            return False
+        mutagen = module
+    return True
+
+
+def read_tags(path):
+    """Title, artist and duration for an audio file"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if " - " in name:
+        artist, title = (part.strip() for part in name.split(" - ", 1))
+    else:
+        artist, title = "Unknown Artist", name
+    duration = 0.0
+
+    if load_mutagen():
+        try:
+            audio = mutagen.File(path, easy=True)
+            if audio is not None:
+                tags = audio.tags or {}
+                title = (tags.get('title') or [title])[0]
+                artist = (tags.get('artist') or [artist])[0]
+                duration = float(getattr(audio.info, 'length', 0.0) or 0.0)
+        except Exception as e:
+            print(f"Tag read error for {path}: {e}")
+
+    return {"title": title, "artist": artist, "duration": duration}
+
+
+class TrackIndex:
+    """SQLite index of the tracks found in the songs folder"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = storage.connect(path, synchronous=None)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Older layout: drop it, the next scan rebuilds the index
+            self.db.execute("DROP TABLE IF EXISTS tracks")
+            self.db.execute("DELETE FROM meta WHERE key = 'generation'")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        # AUTOINCREMENT: the ID of a removed track is never handed to another file
+        self.db.execute("""CREATE TABLE IF NOT EXISTS tracks (
+                               id INTEGER PRIMARY KEY AUTOINCREMENT,
+                               path TEXT NOT NULL UNIQUE,
+                               mtime INTEGER NOT NULL,
+                               size INTEGER NOT NULL,
+                               title TEXT NOT NULL,
+                               artist TEXT NOT NULL,
+                               duration REAL NOT NULL,
+                               audio_state INTEGER NOT NULL DEFAULT 0,
+                               tempo REAL,
+                               energy REAL,
+                               brightness REAL)""")
+        # Changes whenever the table is rebuilt and its IDs start over, so data
+        # kept elsewhere by track ID (the mood index) knows to drop them
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        if row is None:
+            row = (uuid.uuid4().hex,)
+            self.db.execute("INSERT INTO meta VALUES ('generation', ?)", row)
+        self.generation = row[0]
+        self.db.commit()
+
+    def tracks(self):
+        """All indexed tracks, sorted by artist and title (with stable IDs)"""
+        with self.lock:
+            rows = self.db.execute("""SELECT id, path, title, artist, duration FROM tracks
+                                      ORDER BY artist COLLATE NOCASE, title COLLATE NOCASE""")
+            return [Track(track_id, title, artist, path, duration)
+                    for track_id, path, title, artist, duration in rows]
+
+    def scan(self, root="songs", workers=8, on_progress=None, on_removed=None):
+        """Bring the index up to date with root; returns (changed, removed, unchanged)
+
+        on_removed(track_ids) is called with the IDs of deleted files once
+        they are gone from the index.
+        """
+        with self.lock:
+            known = {path: (track_id, mtime, size) for track_id, path, mtime, size in
+                     self.db.execute("SELECT id, path, mtime, size FROM tracks")}
+
+        changed = []
+        seen = set()
+        for path, mtime, size in walk_audio_files(root):
+            seen.add(path)
+            if known.get(path, (None,))[1:] != (mtime, size):
+                changed.append((path, mtime, size))
+        removed = [path for path in known if path not in seen]
+
+        # Tag reading is I/O bound, so threads overlap the disk waits
+        rows = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tags_iter = pool.map(read_tags, [path for path, _, _ in changed], chunksize=64)
+            for done, ((path, mtime, size), tags) in enumerate(zip(changed, tags_iter), 1):
+                rows.append((path, mtime, size, tags["title"], tags["artist"], tags["duration"]))
+                if on_progress and done % 500 == 0:
+                    on_progress(done, len(changed))
+
+        with self.lock:
+            # Upsert rather than REPLACE so a changed file keeps its ID
+            self.db.executemany("""INSERT INTO tracks (path, mtime, size, title, artist, duration)
+                                   VALUES (?, ?, ?, ?, ?, ?)
+                                   ON CONFLICT(path) DO UPDATE SET
+                                       mtime = excluded.mtime, size = excluded.size,
+                                       title = excluded.title, artist = excluded.artist,
+                                       duration = excluded.duration,
+                                       audio_state = 0""", rows)
+            self.db.executemany("DELETE FROM tracks WHERE path = ?", [(p,) for p in removed])
+            self.db.commit()
+        if removed and on_removed:
+            on_removed([known[path][0] for path in removed])
+
+        return len(changed), len(removed), len(seen) - len(changed)
+
+    def features(self, track_id):
+        """Audio features of a track, or None if not (yet) analyzed"""
+        with self.lock:
+            row = self.db.execute("""SELECT tempo, energy, brightness FROM tracks
+                                     WHERE id = ? AND audio_state = ?""",
+                                  (track_id, AUDIO_DONE)).fetchone()
+        if row is None:
+            return None
+        return {'tempo': row[0], 'energy': row[1], 'brightness': row[2]}
+
+    def analyze_audio(self, workers=None, batch=64, should_stop=None):
+        """Compute audio features for new/changed tracks in a process pool
+
+        Returns the number of tracks analyzed. Results are written every
+        `batch` tracks so an interrupted run keeps its progress. Once
+        should_stop() is true nothing more is written, files not yet
+        started are cancelled and the call returns within STOP_POLL_S.
+        """
+        with self.lock:
+            pending = self.db.execute("SELECT id, path FROM tracks WHERE audio_state = ?",
+                                      (AUDIO_PENDING,)).fetchall()
+        if not pending or not mood_engine.load_numpy():
+            return 0
+
+        stopping = lambda: should_stop is not None and should_stop()
+        done = 0
+        rows = []
+        # spawn: forking a process that runs Tk and threads is not safe
+        context = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        try:
+            jobs = [(track_id, pool.submit(audio_features, path)) for track_id, path in pending]
+            for number, (track_id, job) in enumerate(jobs, 1):
+                while not job.done():
+                    if stopping():
+                        return done
+                    wait([job], timeout=STOP_POLL_S)
+                features = job.result()
+                if features is None:
+                    rows.append((AUDIO_FAILED, None, None, None, track_id))
+                else:
+                    rows.append((AUDIO_DONE, features['tempo'], features['energy'],
+                                 features['brightness'], track_id))
+                if len(rows) >= batch or number == len(jobs):
+                    with self.lock:
+                        # The index may be closing: it must not be written after that
+                        if stopping():
+                            return done
+                        self.db.executemany("""UPDATE tracks SET audio_state = ?, tempo = ?,
+                                               energy = ?, brightness = ? WHERE id = ?""", rows)
+                        self.db.commit()
+                    done += len(rows)
+                    rows = []
+        finally:
+            # Files not started are dropped; ones already running end in their process
+            pool.shutdown(wait=False, cancel_futures=True)
+        return done
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,100 @@
+"""
+LOOKUPS - One network lookup per song, with the user's songs first
+Worker threads ask the scheduler to run a lookup for a key, e.g. a
+lyrics cache key. Requests for a key that is already being looked up
+wait for that lookup and share its result instead of starting another.
+Background lookups (library prefetch) hold off while any foreground
+lookup (the song the user picked) is running, so clicks never queue
+behind prefetching.
+
+Superseded requests are dropped with `cancelled`: a callable checked
+right before the lookup starts. A lookup that already started is left
+to finish, since its result still lands in the cache.
+"""
+import threading
+from concurrent.futures import Future
+
+from metrics import NULL_METRICS
+
+FOREGROUND = 0
+BACKGROUND = 1
+
+
+class LookupCancelled(Exception):
+    """A request was superseded before its lookup started"""
+
+
+class _Flight:
+    __slots__ = ('future', 'foreground', 'waiters')
+
+    def __init__(self, foreground):
+        self.future = Future()
+        self.foreground = foreground
+        self.waiters = 0  # Other requests sharing the result
+
+
+class LookupScheduler:
+    """Coalesce concurrent lookups per key and let foreground ones go first"""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics or NULL_METRICS  # Coalesced/cancelled counts
+        self.in_flight = {}     # key -> _Flight
+        self.foreground = 0     # Foreground requests running or waiting
+        self.changed = threading.Condition()
+
+    def run(self, key, func, *args, priority=FOREGROUND, cancelled=None):
+        """func(*args), shared with every concurrent request for the same key"""
+        foreground = priority == FOREGROUND
+        with self.changed:
+            if cancelled is not None and cancelled():
+                self.metrics.increment("lookups_cancelled")
+                raise LookupCancelled(key)
+            if foreground:
+                self.foreground += 1
+            flight = self.in_flight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self.in_flight[key] = _Flight(foreground)
+            else:
+                flight.waiters += 1
+            if not owner and foreground and not flight.foreground:
+                # Someone is waiting on this background lookup now: let it go
+                flight.foreground = True
+                self.changed.notify_all()
+
+        try:
+            if not owner:
+                self.metrics.increment("lookups_coalesced")
+                try:
+                    return flight.future.result()
+                except LookupCancelled:
+                    # The lookup we joined was dropped just before we came: run our own
+                    return self.run(key, func, *args, priority=priority, cancelled=cancelled)
+            return self._run_owned(key, flight, func, args, cancelled)
+        finally:
+            if foreground:
+                with self.changed:
+                    self.foreground -= 1
+                    if not self.foreground:
+                        self.changed.notify_all()
+
+    def _run_owned(self, key, flight, func, args, cancelled):
+        try:
+            with self.changed:
+                while not flight.foreground and self.foreground:
+                    self.changed.wait()
+                # Others still want the result even if this request does not
+                dropped = not flight.waiters and cancelled is not None and cancelled()
+            if dropped:
+                self.metrics.increment("lookups_cancelled")
+                raise LookupCancelled(key)
+            result = func(*args)
+        except BaseException as error:
+            flight.future.set_exception(error)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            with self.changed:
+                del self.in_flight[key]
@@ -0,0 +1,133 @@
+"""
+LYRICS CACHE - Persistent lyrics cache stored in lyrics_data/
+SQLite on disk with an in-memory LRU in front, per-entry TTL and
+short-lived negative entries for songs the API does not know.
+"""
+import os
+import threading
+import time
+
+import storage
+
+DEFAULT_PATH = os.path.join("lyrics_data", "lyrics_cache.sqlite3")
+
+# Returned by get() when nothing usable is cached
+MISS = object()
+
+DAY = 24 * 60 * 60
+
+
+def make_key(title, artist=""):
+    """Cache key for a song, case and whitespace insensitive"""
+    return f"{' '.join(title.lower().split())}_{' '.join((artist or '').lower().split())}"
+
+
+class LyricsCache:
+    """Size-bounded LRU lyrics cache that survives restarts"""
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=5000, ttl=30 * DAY,
+                 negative_ttl=60 * 60, memory_entries=512):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = storage.LRUCache(memory_entries)  # key -> (lyrics or None, expires)
+        self.touched = {}            # key -> last access not yet written to disk
+        self.lock = threading.RLock()
+
+        self.db = storage.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS lyrics (
+                               key TEXT PRIMARY KEY,
+                               lyrics TEXT,
+                               expires REAL NOT NULL,
+                               accessed REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS lyrics_accessed ON lyrics (accessed)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS lyrics_expires ON lyrics (expires)")
+        self.db.commit()
+
+    def get(self, key, default=MISS):
+        """Cached lyrics, None for a cached miss, or default"""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                row = self.db.execute("SELECT lyrics, expires FROM lyrics WHERE key = ?",
+                                      (key,)).fetchone()
+                if row is None:
+                    return default
+                entry = (row[0], row[1])
+                self.memory.put(key, entry)
+
+            if entry[1] < now:
+                self.delete(key)
+                return default
+            self.touched[key] = now
+            return entry[0]
+
+    def __contains__(self, key):
+        return self.get(key) is not MISS
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is MISS:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, lyrics):
+        self.put(key, lyrics)
+
+    def put(self, key, lyrics, ttl=None):
+        """Store lyrics for a key (None records a miss)"""
+        if ttl is None:
+            ttl = self.ttl if lyrics is not None else self.negative_ttl
+        now = time.time()
+        entry = (lyrics, now + ttl)
+        with self.lock:
+            self.memory.put(key, entry)
+            self.touched.pop(key, None)
+            self.db.execute("INSERT OR REPLACE INTO lyrics VALUES (?, ?, ?, ?)",
+                            (key, lyrics, entry[1], now))
+            self._evict()
+            self.db.commit()
+
+    def put_missing(self, key):
+        """Remember that a song has no lyrics, for negative_ttl seconds"""
+        self.put(key, None)
+
+    def delete(self, key):
+        with self.lock:
+            self.memory.pop(key, None)
+            self.touched.pop(key, None)
+            self.db.execute("DELETE FROM lyrics WHERE key = ?", (key,))
+            self.db.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM lyrics").fetchone()[0]
+
+    def flush(self):
+        """Write pending access times so LRU order survives a restart"""
+        with self.lock:
+            if self.touched:
+                self.db.executemany("UPDATE lyrics SET accessed = ? WHERE key = ?",
+                                    [(t, k) for k, t in self.touched.items()])
+                self.touched.clear()
+                self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.db.close()
+
+    def _evict(self):
+        """Drop expired rows, then least recently used rows over the limit"""
+        self.db.execute("DELETE FROM lyrics WHERE expires < ?", (time.time(),))
+        count = self.db.execute("SELECT COUNT(*) FROM lyrics").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self.flush()
+        stale = [row[0] for row in self.db.execute(
+            "SELECT key FROM lyrics ORDER BY accessed LIMIT ?", (count - self.max_entries,))]
+        self.db.executemany("DELETE FROM lyrics WHERE key = ?", [(key,) for key in stale])
+        for key in stale:
+            self.memory.pop(key, None)
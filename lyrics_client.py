@@ -0,0 +1,57 @@
+"""
+LYRICS CLIENT - Shared lyrics.ovh client with a pooled keep-alive session
+Set MOODIFY_LYRICS_URL to point the apps at another server (for example
+lyrics_stub_server.py).
+"""
+import os
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import NULL_METRICS
+
+DEFAULT_BASE_URL = "https://api.lyrics.ovh"
+
+
+class LyricsClient:
+    """Thin lyrics.ovh client that reuses TCP/TLS connections"""
+
+    def __init__(self, base_url=None, pool_size=8, timeout=5, metrics=None):
+        self.base_url = (base_url or os.environ.get("MOODIFY_LYRICS_URL")
+                         or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.metrics = metrics or NULL_METRICS  # Request/error counts
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, artist, title):
+        return f"{self.base_url}/v1/{quote(artist, safe='')}/{quote(title, safe='')}"
+
+    def get(self, artist, title, timeout=None):
+        """Lyrics text, or None if the server has none
+
+        Network errors and any status other than 200 or 404 raise
+        requests.RequestException, so callers can tell "no lyrics" from
+        "server failed".
+        """
+        self.metrics.increment("http_requests")
+        try:
+            response = self.session.get(self.url(artist, title),
+                                        timeout=timeout or self.timeout)
+        except requests.RequestException:
+            self.metrics.increment("http_errors")
+            raise
+        if response.status_code == 404:
+            self.metrics.increment("http_not_found")
+            return None
+        if response.status_code != 200:
+            self.metrics.increment("http_errors")
+            raise requests.HTTPError(f"{response.status_code} from {response.url}",
+                                     response=response)
+        return response.json().get('lyrics') or None
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,261 @@
+"""
+LYRICS CORPUS - Offline lyrics, looked up before the network
+A SQLite table of lyrics keyed by normalized title and artist, so
+"Bohemian Rhapsody (Remastered)" and "bohemian rhapsody - 2011 remaster"
+find the same song. Titles that do not match exactly go through an FTS5
+trigram index and are accepted when close enough (typos, missing words).
+The demo songs are bundled; import your own lyrics with
+
+    python lyrics_corpus.py import lyrics/ catalog.jsonl
+    python lyrics_corpus.py lookup "Bohemian Rhapsody (Live Aid)" Queen
+
+Sources are read like `python -m moodify analyze` reads them: folders
+of "Artist - Title.txt" files or JSONL with title, artist and lyrics.
+"""
+import difflib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+
+import storage
+
+DEFAULT_PATH = os.path.join("lyrics_data", "lyrics_corpus.sqlite3")
+
+# Lowest title similarity (0-1) accepted for a fuzzy match, and for the artist
+TITLE_CUTOFF = 0.8
+ARTIST_CUTOFF = 0.6
+
+# Trigram-index candidates re-ranked per fuzzy lookup
+FUZZY_CANDIDATES = 20
+
+# Artists that say nothing about the song
+UNKNOWN_ARTISTS = {"", "unknown", "unknown artist", "various", "various artists"}
+
+BUNDLED_LYRICS = [
+    ("Bohemian Rhapsody", "Queen", """Is this the real life? Is this just fantasy?
+Caught in a landslide, no escape from reality
+Open your eyes, look up to the skies and see
+I'm just a poor boy, I need no sympathy
+Because I'm easy come, easy go, little high, little low
+Any way the wind blows doesn't really matter to me, to me"""),
+    ("Imagine", "John Lennon", """Imagine there's no heaven
+It's easy if you try
+No hell below us
+Above us only sky
+Imagine all the people
+Living for today"""),
+    ("Happy", "Pharrell Williams", """It might seem crazy what I'm about to say
+Sunshine she's here, you can take a break
+I'm a hot air balloon that could go to space
+With the air, like I don't care, baby, by the way"""),
+]
+
+# "(Remastered 2011)", "[Live]", "- 2011 Remaster", "feat. Someone"
+BRACKETS_RE = re.compile(r"[\(\[\{][^\)\]\}]*[\)\]\}]")
+SUFFIX_RE = re.compile(r"\s+-\s+.*\b(remaster\w*|live|version|edit|mix|mono|stereo|demo|"
+                       r"acoustic|instrumental|single|radio)\b.*$")
+FEATURING_RE = re.compile(r"\s+(feat|ft|featuring)\.?\s.*$")
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def fold(text):
+    """Lower case ASCII-ish text: accents dropped, & spelled out"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c)).replace("&", " and ")
+
+
+def normalize_title(title):
+    """Key of a song title without versions, features and punctuation"""
+    title = fold(title)
+    title = BRACKETS_RE.sub(" ", title)
+    title = SUFFIX_RE.sub("", title)
+    title = FEATURING_RE.sub("", title)
+    return " ".join(NON_WORD_RE.sub(" ", title).split())
+
+
+def normalize_artist(artist):
+    """Key of an artist name ('' when unknown)"""
+    artist = FEATURING_RE.sub("", fold(artist or ""))
+    artist = " ".join(NON_WORD_RE.sub(" ", artist).split())
+    if artist.startswith("the "):
+        artist = artist[4:]
+    return "" if artist in UNKNOWN_ARTISTS else artist
+
+
+def clean_lyrics(lyrics):
+    """Lyrics without [Verse]/[Chorus] markers or LRC timestamps"""
+    return re.sub(r'\[.*?\]', '', lyrics).strip()
+
+
+class LyricsCorpus:
+    """Local lyrics looked up by normalized or fuzzy title and artist"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = storage.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS songs (
+                               id INTEGER PRIMARY KEY,
+                               title TEXT NOT NULL,
+                               artist TEXT NOT NULL,
+                               title_key TEXT NOT NULL,
+                               artist_key TEXT NOT NULL,
+                               lyrics TEXT NOT NULL,
+                               UNIQUE (title_key, artist_key))""")
+        self.fuzzy = self._create_trigram_index()
+        self._titles = None  # title_key list for difflib when there is no trigram index
+        if not self.db.execute("SELECT 1 FROM songs LIMIT 1").fetchone():
+            self.add_many(BUNDLED_LYRICS)
+        self.db.commit()
+
+    def _create_trigram_index(self):
+        """FTS5 trigram index over title keys, if this SQLite has one (3.34+)"""
+        try:
+            self.db.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+                                   title_key, content='songs', content_rowid='id',
+                                   tokenize='trigram')""")
+        except sqlite3.OperationalError:
+            return False
+        self.db.executescript("""
+            CREATE TRIGGER IF NOT EXISTS songs_fts_insert AFTER INSERT ON songs BEGIN
+                INSERT INTO songs_fts (rowid, title_key) VALUES (new.id, new.title_key);
+            END;
+            CREATE TRIGGER IF NOT EXISTS songs_fts_delete AFTER DELETE ON songs BEGIN
+                INSERT INTO songs_fts (songs_fts, rowid, title_key)
+                VALUES ('delete', old.id, old.title_key);
+            END;""")
+        return True
+
+    def add_many(self, songs):
+        """Store (title, artist, lyrics) triples, replacing the same song; returns the count"""
+        rows = []
+        for title, artist, lyrics in songs:
+            key = normalize_title(title)
+            lyrics = clean_lyrics(lyrics or "")
+            if key and lyrics:
+                rows.append((title, artist or "", key, normalize_artist(artist), lyrics))
+        with self.lock:
+            # Keys never change on update, so the trigram index stays valid
+            self.db.executemany("INSERT INTO songs (title, artist, title_key, artist_key, lyrics) "
+                                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (title_key, artist_key) "
+                                "DO UPDATE SET title = excluded.title, artist = excluded.artist, "
+                                "lyrics = excluded.lyrics", rows)
+            self.db.commit()
+            self._titles = None
+        return len(rows)
+
+    def add(self, title, artist, lyrics):
+        return self.add_many([(title, artist, lyrics)]) == 1
+
+    def import_records(self, records):
+        """Add records from batch_analyze.read_records; returns the count"""
+        def songs():
+            for record in records:
+                title = record.get("title")
+                if not title and isinstance(record.get("id"), str):
+                    title = os.path.splitext(os.path.basename(record["id"]))[0]
+                if title:
+                    yield title, record.get("artist", ""), \
+                        record.get("lyrics") or record.get("text")
+        return self.add_many(songs())
+
+    def lookup(self, title, artist=""):
+        """Lyrics for a song, or None if the corpus has nothing close"""
+        title_key = normalize_title(title)
+        if not title_key:
+            return None
+        artist_key = normalize_artist(artist)
+        with self.lock:
+            rows = self.db.execute("SELECT artist_key, lyrics FROM songs WHERE title_key = ?",
+                                   (title_key,)).fetchall()
+            if rows:
+                match = self._best(rows, artist_key)
+                if match is not None:
+                    return match
+            return self._fuzzy_lookup(title_key, artist_key)
+
+    def _best(self, rows, artist_key, title_scores=None):
+        """Lyrics of the row whose artist fits best, or None if none fits
+
+        rows are (artist_key, lyrics[, title_key]); without an artist the
+        closest title wins.
+        """
+        best, best_score = None, 0.0
+        for i, row in enumerate(rows):
+            title_score = title_scores[i] if title_scores else 1.0
+            if not artist_key or not row[0]:
+                score = title_score
+            elif row[0] == artist_key:
+                score = title_score + 1
+            else:
+                artist_score = difflib.SequenceMatcher(None, artist_key, row[0]).ratio()
+                if artist_score < ARTIST_CUTOFF:
+                    continue
+                score = title_score + artist_score
+            if score > best_score:
+                best, best_score = row[1], score
+        return best
+
+    def _fuzzy_lookup(self, title_key, artist_key):
+        if self.fuzzy:
+            trigrams = {title_key[i:i + 3] for i in range(len(title_key) - 2)}
+            if not trigrams:
+                return None
+            query = " OR ".join('"%s"' % trigram.replace('"', '""') for trigram in trigrams)
+            rows = self.db.execute(
+                "SELECT s.artist_key, s.lyrics, s.title_key FROM songs_fts "
+                "JOIN songs s ON s.id = songs_fts.rowid WHERE songs_fts MATCH ? "
+                "ORDER BY songs_fts.rank LIMIT ?", (query, FUZZY_CANDIDATES)).fetchall()
+        else:
+            if self._titles is None:
+                self._titles = [row[0] for row in self.db.execute("SELECT title_key FROM songs")]
+            close = difflib.get_close_matches(title_key, self._titles, FUZZY_CANDIDATES,
+                                              TITLE_CUTOFF)
+            rows = self.db.execute(
+                "SELECT artist_key, lyrics, title_key FROM songs WHERE title_key IN (%s)"
+                % ",".join("?" * len(close)), close).fetchall() if close else []
+
+        matcher = difflib.SequenceMatcher(None, b=title_key)
+        candidates, scores = [], []
+        for row in rows:
+            matcher.set_seq1(row[2])
+            score = matcher.ratio()
+            if score >= TITLE_CUTOFF:
+                candidates.append(row)
+                scores.append(score)
+        return self._best(candidates, artist_key, scores) if candidates else None
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["import"] and len(argv) > 1:
+        from batch_analyze import read_records
+        corpus = LyricsCorpus()
+        for source in argv[1:]:
+            print(f"{source}: {corpus.import_records(read_records(source))} songs")
+        print(f"{corpus.path}: {len(corpus)} songs in total")
+        corpus.close()
+        return 0
+    if argv[:1] == ["lookup"] and len(argv) in (2, 3):
+        corpus = LyricsCorpus()
+        lyrics = corpus.lookup(argv[1], argv[2] if len(argv) > 2 else "")
+        corpus.close()
+        print(lyrics if lyrics is not None else "No lyrics found")
+        return 0 if lyrics is not None else 1
+    print(__doc__.strip().split("\n\n")[1], file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+LYRICS STUB SERVER - Local stand-in for api.lyrics.ovh
+Serves GET /v1/{artist}/{title} with optional latency and error
+injection, so the lyrics client can be measured and tested offline.
+
+    python lyrics_stub_server.py --port 8765 --latency 0.05 --error-rate 0.1
+    MOODIFY_LYRICS_URL=http://127.0.0.1:8765 python moodify.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+SAMPLE_LYRICS = {
+    ("queen", "bohemian rhapsody"): """Is this the real life? Is this just fantasy?
+Caught in a landslide, no escape from reality""",
+    ("pharrell williams", "happy"): """Because I'm happy
+Clap along if you feel like a room without a roof""",
+}
+
+
+class StubLyricsServer:
+    """Threaded HTTP server answering like lyrics.ovh"""
+
+    def __init__(self, lyrics=None, latency=0.0, error_rate=0.0, generate=True,
+                 host="127.0.0.1", port=0, seed=None):
+        self.lyrics = {(a.lower(), t.lower()): text
+                       for (a, t), text in (lyrics or SAMPLE_LYRICS).items()}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.generate = generate  # Invent lyrics for unknown songs
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def lookup(self, artist, title):
+        text = self.lyrics.get((artist.lower(), title.lower()))
+        if text is None and self.generate:
+            text = f"{title}\nsung by {artist}\nlove and light, dance all night"
+        return text
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+            disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    failed = server.random.random() < server.error_rate
+                if server.latency:
+                    time.sleep(server.latency)
+
+                parts = self.path.split("/")
+                if failed:
+                    self.reply(500, {"error": "Injected failure"})
+                elif len(parts) != 4 or parts[1] != "v1":
+                    self.reply(404, {"error": "Not found"})
+                else:
+                    text = server.lookup(unquote(parts[2]), unquote(parts[3]))
+                    if text is None:
+                        self.reply(404, {"error": "No lyrics found"})
+                    else:
+                        self.reply(200, {"lyrics": text})
+
+            def reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local lyrics.ovh stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500s")
+    parser.add_argument("--no-generate", action="store_true",
+                        help="404 for songs not in the sample set")
+    args = parser.parse_args()
+
+    server = StubLyricsServer(latency=args.latency, error_rate=args.error_rate,
+                              generate=not args.no_generate, host=args.host, port=args.port)
+    print(f"Lyrics stub listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+METRICS - Per-stage latencies and counters for the player
+Stages keep their most recent samples for p50/p99 plus running totals;
+counters only ever go up. Snapshots can be shown in the app or written
+to a file as JSON or Prometheus text (by extension: .prom/.txt).
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Recent samples per stage used for percentiles
+WINDOW = 1024
+
+
+class StageStats:
+    """Latency samples of one stage"""
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Metrics:
+    """Thread-safe stage timers and counters"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.stages = {}
+        self.counters = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.window)
+            stats.add(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block: with metrics.timer('fetch'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Plain dict of every stage (ms) and counter"""
+        with self.lock:
+            stages = {
+                name: {
+                    "count": stats.count,
+                    "p50_ms": round(stats.percentile(0.50) * 1000, 3),
+                    "p99_ms": round(stats.percentile(0.99) * 1000, 3),
+                    "mean_ms": round(stats.total / stats.count * 1000, 3),
+                    "max_ms": round(stats.max * 1000, 3),
+                    "sum_s": round(stats.total, 6),
+                }
+                for name, stats in self.stages.items()
+            }
+            counters = dict(self.counters)
+        return {"uptime_s": round(time.time() - self.started, 1),
+                "stages": stages, "counters": counters}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="moodify"):
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for name, stats in snapshot["stages"].items():
+            label = f'stage="{name}"'
+            lines.append(f'{prefix}_stage_seconds{{{label},quantile="0.5"}} {round(stats["p50_ms"] / 1000, 6)}')
+            lines.append(f'{prefix}_stage_seconds{{{label},quantile="0.99"}} {round(stats["p99_ms"] / 1000, 6)}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{label}}} {stats["sum_s"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{{label}}} {stats["count"]}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Replace `path` with the current numbers (Prometheus text for .prom/.txt)"""
+        if path.endswith((".prom", ".txt")):
+            text = self.to_prometheus()
+        else:
+            text = self.to_json()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def report(self):
+        """Fixed-width table for the stats panel"""
+        snapshot = self.snapshot()
+        lines = [f"{'stage':<16}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, stats in snapshot["stages"].items():
+            lines.append(f"{name:<16}{stats['count']:>7}{stats['p50_ms']:>10.1f}"
+                         f"{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+        lines.append("")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<23}{value:>7}")
+        counters = snapshot["counters"]
+        lookups = counters.get("cache_hits", 0) + counters.get("cache_misses", 0)
+        if lookups:
+            lines.append(f"{'cache hit rate':<23}{counters.get('cache_hits', 0) / lookups:>7.0%}")
+        return "\n".join(lines)
+
+
+class NullMetrics:
+    """Stands in for Metrics where none is collected: every call is a no-op"""
+
+    def observe(self, stage, seconds):
+        pass
+
+    @contextmanager
+    def timer(self, stage):
+        yield
+
+    def increment(self, name, amount=1):
+        pass
+
+
+# Default of the components that take an optional Metrics
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,131 @@
+"""
+MOOD CACHE - Persistent memo of mood analysis results
+Results are keyed by a hash of the normalized lyrics (case and spacing
+do not matter to the scorer) and the lexicon's version, so covers,
+remasters and replays of the same text are scored once. Rows written
+under an older version of a lexicon are dropped the first time the
+cache is used with the new one.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import storage
+from metrics import NULL_METRICS
+from mood_engine import MoodResult
+
+DEFAULT_PATH = os.path.join("lyrics_data", "mood_cache.sqlite3")
+
+
+def normalize_lyrics(text):
+    """The part of a text the scorer looks at: lower case, single spaces"""
+    return " ".join(text.lower().split())
+
+
+def make_key(text, version):
+    """Cache key of a text under one lexicon version"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(version.encode("ascii"))
+    digest.update(b"\0")
+    digest.update(normalize_lyrics(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MoodCache:
+    """In-memory LRU of analysis results over a size-bounded SQLite table
+
+    Cached results keep each matched keyword once and no offsets, which
+    is all the scores, mood and keyword ranking need.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=20000, memory_entries=1024,
+                 metrics=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory = storage.LRUCache(memory_entries)  # key -> (scores, terms)
+        self.checked = set()         # lexicon paths whose stale rows are gone
+        self.metrics = metrics or NULL_METRICS
+        self.lock = threading.RLock()
+
+        self.db = storage.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS moods (
+                               key TEXT PRIMARY KEY,
+                               lexicon TEXT NOT NULL,
+                               version TEXT NOT NULL,
+                               scores TEXT NOT NULL,
+                               terms TEXT NOT NULL,
+                               stored REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS moods_lexicon ON moods (lexicon, version)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS moods_stored ON moods (stored)")
+        self.db.commit()
+
+    def score(self, lexicon, text):
+        """lexicon.score(text), computed at most once per text and lexicon version"""
+        version = lexicon.version
+        key = make_key(text, version)
+        with self.lock:
+            if (lexicon.path or "") not in self.checked:
+                self._drop_stale(lexicon.path or "", version)
+            entry = self.memory.get(key)
+            if entry is None:
+                row = self.db.execute("SELECT scores, terms FROM moods WHERE key = ?",
+                                      (key,)).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), json.loads(row[1]))
+                    self.memory.put(key, entry)
+            if entry is not None:
+                self.metrics.increment("mood_cache_hits")
+                scores, terms = entry
+                return MoodResult(dict(scores), [(term, None) for term in terms], lexicon)
+        self.metrics.increment("mood_cache_misses")
+
+        # Score outside the lock so other threads' lookups are not held up
+        result = lexicon.score(text)
+        terms = list(dict.fromkeys(term for term, _ in result.matches))
+        self.put(key, lexicon, version, result.scores, terms)
+        return result
+
+    def analyze(self, lexicon, text, limit=5):
+        """(dominant mood, top keywords), cached like score()"""
+        return self.score(lexicon, text).analysis(limit)
+
+    def put(self, key, lexicon, version, scores, terms):
+        with self.lock:
+            self.memory.put(key, (dict(scores), terms))
+            self.db.execute("INSERT OR REPLACE INTO moods VALUES (?, ?, ?, ?, ?, ?)",
+                            (key, lexicon.path or "", version, json.dumps(scores),
+                             json.dumps(terms), time.time()))
+            self._evict()
+            self.db.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM moods").fetchone()[0]
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.db.execute("DELETE FROM moods")
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def _drop_stale(self, lexicon_path, version):
+        """Forget results of earlier versions of a lexicon"""
+        self.db.execute("DELETE FROM moods WHERE lexicon = ? AND version != ?",
+                        (lexicon_path, version))
+        self.db.commit()
+        self.checked.add(lexicon_path)
+
+    def _evict(self):
+        """Drop the oldest rows over the limit"""
+        count = self.db.execute("SELECT COUNT(*) FROM moods").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self.db.execute("DELETE FROM moods WHERE key IN "
+                        "(SELECT key FROM moods ORDER BY stored LIMIT ?)",
+                        (count - self.max_entries,))
@@ -0,0 +1,590 @@
+"""
+MOOD ENGINE - Shared single-pass mood scorer used by all Moodify apps
+Lexicons are compiled to memory-mapped .mlex files (see lexicon.py), so
+they can hold tens of thousands of weighted words, stems and phrases.
+"""
+import os
+import threading
+from collections import Counter
+from itertools import chain
+
+import lexicon
+
+# NumPy is imported on demand by the modules that use it (it is slow to import)
+np = None
+
+# Mood keywords mapping (full player)
+MOOD_KEYWORDS = {
+    'happy': ['love', 'happy', 'joy', 'smile', 'sun', 'light', 'good', 'beautiful', 'wonderful'],
+    'sad': ['sad', 'lonely', 'cry', 'tears', 'pain', 'hurt', 'alone', 'miss', 'goodbye'],
+    'romantic': ['love', 'heart', 'kiss', 'hold', 'touch', 'darling', 'baby', 'sweet', 'forever'],
+    'energetic': ['go', 'move', 'dance', 'jump', 'run', 'party', 'energy', 'wild', 'fire'],
+    'calm': ['peace', 'calm', 'quiet', 'still', 'gentle', 'soft', 'easy', 'slow', 'dream'],
+    'angry': ['hate', 'angry', 'rage', 'fight', 'war', 'kill', 'burn', 'break', 'mad']
+}
+
+# Smaller lexicon used by moodify_minimal.py
+MINIMAL_MOOD_KEYWORDS = {
+    'happy': ['happy', 'joy', 'smile', 'love', 'sun', 'bright', 'good', 'beautiful'],
+    'sad': ['sad', 'lonely', 'cry', 'tears', 'pain', 'hurt', 'alone', 'miss'],
+    'romantic': ['love', 'heart', 'kiss', 'hold', 'touch', 'darling', 'sweet'],
+    'energetic': ['go', 'move', 'dance', 'jump', 'run', 'party', 'energy', 'fire'],
+    'calm': ['peace', 'calm', 'quiet', 'still', 'gentle', 'soft', 'easy']
+}
+
+# Happy/sad only lexicon used by ultra_simple_moodify.py
+SIMPLE_MOOD_KEYWORDS = {
+    'happy': ['happy', 'joy', 'smile', 'love', 'sun'],
+    'sad': ['sad', 'cry', 'pain', 'hurt', 'alone']
+}
+
+# Term lookups remembered per lexicon (the cache is cleared when full)
+LOOKUP_CACHE_SIZE = 100000
+
+# lookup() result for a term the lexicon does not know
+NO_MATCH = ((), False)
+
+# Texts scored together by score_batch (bounds the count matrix)
+BATCH_CHUNK_SIZE = 4096
+
+# Multiplier of the word hash score_batch matches a chunk's words with (odd, 64-bit)
+WORD_HASH_BASE = 0x100000001B3
+WORD_HASH_MASK = (1 << 64) - 1
+
+# Bytes that make up words, besides inner apostrophes (same as lexicon.TOKEN_RE)
+WORD_CHARS = b"abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def word_hash(word):
+    """Hash of a word's UTF-8 bytes, as computed for a whole chunk by _match_words"""
+    value, power = 0, 1
+    for byte in word.encode("utf-8"):
+        value = (value + byte * power) & WORD_HASH_MASK
+        power = (power * WORD_HASH_BASE) & WORD_HASH_MASK
+    return value
+
+
+def tokenize(text):
+    """Yield (word, offset) for every word in the lowercased text"""
+    for match in lexicon.TOKEN_RE.finditer(text.lower()):
+        yield match.group(), match.start()
+
+
+def load_numpy():
+    """Import NumPy on demand; False if it is not installed"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # Batch scoring falls back to a plain loop
+            return False
+        np = numpy
+    return True
+
+
+class MoodResult:
+    """Scores, matched keywords and offsets from one pass over a text"""
+    __slots__ = ('scores', 'matches', 'lexicon')
+
+    def __init__(self, scores, matches, lexicon):
+        self.scores = scores      # mood -> summed keyword weight (hit count)
+        self.matches = matches    # list of (keyword, offset) in text order
+        self.lexicon = lexicon
+
+    @property
+    def total(self):
+        return sum(self.scores.values())
+
+    @property
+    def mood(self):
+        """Dominant mood, or 'neutral' when nothing matched"""
+        if not self.total:
+            return 'neutral'
+        return max(self.scores, key=self.scores.get)
+
+    def keywords(self, mood=None, limit=5):
+        """Distinct keywords found for a mood, strongest (then lexicon order) first"""
+        mood = mood or self.mood
+        return self.lexicon.rank_keywords((keyword for keyword, _ in self.matches), mood, limit)
+
+    def analysis(self, limit=5):
+        """(dominant mood, top keywords) like the apps' analyze_mood"""
+        mood = self.mood
+        if mood == 'neutral':
+            return 'neutral', []
+        return mood, self.keywords(mood, limit)
+
+    def offsets(self, keyword):
+        """Character offsets of every match of a keyword"""
+        return [offset for word, offset in self.matches if word == keyword]
+
+
+class MoodLexicon:
+    """Mood lexicon backed by a compiled .mlex file, mapped on first use
+
+    Either built from a {mood: [keywords]} mapping, which is compiled to
+    `path` whenever that file is missing or out of date, or opened from
+    a prebuilt file (see lexicon.py) for large weighted lexicons.
+    """
+
+    def __init__(self, mood_keywords=None, path=None):
+        if mood_keywords is None and path is None:
+            raise ValueError("MoodLexicon needs keywords or a compiled lexicon path")
+        self.source = mood_keywords
+        self.path = path
+        self._compiled = None
+        self._cache = {}     # term -> (postings, starts a phrase)
+        self._words = None   # score_batch's table of every word (False: tokenize instead)
+        self.lock = threading.Lock()
+
+    def source_entries(self):
+        moods = list(self.source)
+        return moods, [(word, mood, 1.0) for mood in moods for word in self.source[mood]]
+
+    def compile_source(self):
+        return lexicon.compile_lexicon(*self.source_entries())
+
+    @property
+    def compiled(self):
+        """The CompiledLexicon (opened, or compiled and written, on first use)"""
+        if self._compiled is None:
+            with self.lock:
+                if self._compiled is None:
+                    self._compiled = self._open()
+        return self._compiled
+
+    def _open(self):
+        if self.source is None:
+            return lexicon.CompiledLexicon.open(self.path)
+
+        moods, entries = self.source_entries()
+        digest = lexicon.source_digest(moods, entries)
+        if self.path and os.path.exists(self.path):
+            try:
+                compiled = lexicon.CompiledLexicon.open(self.path)
+                if compiled.digest == digest:
+                    return compiled
+                compiled.close()
+            except (OSError, lexicon.LexiconError):
+                pass
+        data = lexicon.compile_lexicon(moods, entries)
+        if self.path:
+            try:
+                lexicon.write_lexicon(data, self.path)
+                return lexicon.CompiledLexicon.open(self.path)
+            except OSError:
+                pass  # Read-only location: use the bytes in memory
+        return lexicon.CompiledLexicon(data)
+
+    @property
+    def mood_names(self):
+        return (self._compiled or self.compiled).moods
+
+    @property
+    def column(self):
+        """mood -> index into score vectors"""
+        return (self._compiled or self.compiled).column
+
+    @property
+    def version(self):
+        """Changes whenever the lexicon's terms or weights change"""
+        return self.compiled.version
+
+    def lookup(self, term):
+        """(postings, starts a phrase) for a token or phrase
+
+        Postings are (mood index, rank, weight) tuples. A token with no
+        entry of its own matches its longest stem ("happ*"), if any.
+        """
+        found = self._cache.get(term)
+        if found is None:
+            found = self._resolve(term)
+            if len(self._cache) >= LOOKUP_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[term] = found
+        return found
+
+    def _resolve(self, term):
+        compiled = self.compiled
+        flags, postings = compiled.entry(term) or (0, ())
+        if not postings and " " not in term:
+            for length in compiled.stem_lengths:
+                if length <= len(term):
+                    stem = compiled.entry(term[:length] + "*")
+                    if stem:
+                        postings = stem[1]
+                        break
+        postings = self._convert(postings)
+        if not postings and not flags & lexicon.STARTS_PHRASE:
+            return NO_MATCH
+        return postings, bool(flags & lexicon.STARTS_PHRASE)
+
+    def _convert(self, postings):
+        """Stored as float32: whole numbers back to int, the rest to the source precision"""
+        if self.compiled.integral:
+            return tuple((mood, rank, int(weight)) for mood, rank, weight in postings)
+        return tuple((mood, rank, round(weight, 6)) for mood, rank, weight in postings)
+
+    def scan(self, text):
+        """Yield (term, offset, postings) for every lexicon match in a text"""
+        cache = self._cache
+        lookup = self.lookup
+        longest = self.compiled.max_phrase_words
+        if longest == 1:
+            for match in lexicon.TOKEN_RE.finditer(text.lower()):
+                word = match.group()
+                postings = (cache.get(word) or lookup(word))[0]
+                if postings:
+                    yield word, match.start(), postings
+            return
+
+        tokens = [(match.group(), match.start()) for match in lexicon.TOKEN_RE.finditer(text.lower())]
+        i = 0
+        while i < len(tokens):
+            word, offset = tokens[i]
+            postings, starts_phrase = cache.get(word) or lookup(word)
+            step = 1
+            if starts_phrase:
+                # Longest phrase starting here wins over its first word
+                for size in range(min(longest, len(tokens) - i), 1, -1):
+                    phrase = " ".join(w for w, _ in tokens[i:i + size])
+                    found = lookup(phrase)[0]
+                    if found:
+                        word, postings, step = phrase, found, size
+                        break
+            if postings:
+                yield word, offset, postings
+            i += step
+
+    def score(self, text):
+        """Score a text in a single pass over its tokens"""
+        totals = [0] * len(self.mood_names)
+        matches = []
+        for term, offset, postings in self.scan(text):
+            matches.append((term, offset))
+            for mood, _, weight in postings:
+                totals[mood] += weight
+        return MoodResult(dict(zip(self.mood_names, totals)), matches, self)
+
+    def rank_keywords(self, terms, mood, limit=5):
+        """Distinct terms counting towards a mood, strongest (then lexicon order) first"""
+        column = self.column.get(mood)
+        if column is None:
+            return []
+        ranks = {}
+        for term in terms:
+            if term in ranks:
+                continue
+            for m, rank, _ in self.lookup(term)[0]:
+                if m == column:
+                    ranks[term] = rank
+                    break
+        return sorted(ranks, key=ranks.get)[:limit]
+
+    def analyze(self, text, limit=5):
+        """Return (dominant mood, top keywords) like the apps' analyze_mood"""
+        return self.score(text).analysis(limit)
+
+    def analyze_batch(self, texts, limit=5):
+        """Analyze many texts; same results as analyze() on each"""
+        return [result[:2] for result in self.score_batch(texts, limit)]
+
+    def score_batch(self, texts, limit=5, chunk_size=BATCH_CHUNK_SIZE):
+        """Yield (mood, keywords, scores dict) per text
+
+        Skips match offsets, which makes it cheaper than score() for bulk
+        work. With NumPy, the words of a whole chunk of texts are found
+        and looked up in array operations (lexicons with stems or phrases
+        are tokenized text by text), then scored as one sparse text x term
+        count matrix times the terms' mood weights. Keywords are ranked
+        from the same matrix.
+        """
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                yield from self._score_chunk(chunk, limit)
+                chunk = []
+        if chunk:
+            yield from self._score_chunk(chunk, limit)
+
+    def _score_chunk(self, texts, limit):
+        if not load_numpy():
+            yield from self._score_loop(texts, limit)
+            return
+        words = self._word_table()
+        if words:
+            # Only words: find and hash them for the whole chunk at once
+            docs, ids = self._match_words(texts, words)
+            names, weights, ranks = words["names"], words["weights"], words["ranks"]
+        else:
+            docs, ids, names, weights, ranks = self._match_terms(texts)
+        yield from self._score_matrix(len(texts), docs, ids, names, weights, ranks, limit)
+
+    def _term_matrices(self, postings_list):
+        """Per term rows of mood weights and of ranks (rank of no posting: int64 max)"""
+        width = len(self.mood_names)
+        weights = np.zeros((len(postings_list), width))
+        ranks = np.full((len(postings_list), width), np.iinfo(np.int64).max)
+        for term_id, postings in enumerate(postings_list):
+            for mood, rank, weight in postings:
+                weights[term_id, mood] = weight
+                ranks[term_id, mood] = rank
+        return weights, ranks
+
+    def _word_table(self):
+        """Every term of a words-only lexicon keyed by word_hash, built on first use"""
+        if self._words is None:
+            compiled = self.compiled
+            if compiled.stem_lengths or compiled.max_phrase_words > 1:
+                self._words = False
+            else:
+                entries = [(key, self._convert(postings))
+                           for key, _, postings in compiled.items() if postings]
+                names = [key for key, _ in entries]
+                hashes = np.array([word_hash(name) for name in names], dtype=np.uint64)
+                order = np.argsort(hashes, kind="stable")
+                if len(np.unique(hashes)) < len(names):
+                    self._words = False  # Two words share a hash: tokenize instead
+                else:
+                    weights, ranks = self._term_matrices([postings for _, postings in entries])
+                    self._words = {
+                        "names": names, "weights": weights, "ranks": ranks,
+                        "hashes": hashes[order], "ids": order,
+                        "bytes": [name.encode("utf-8") for name in names],
+                    }
+        return self._words
+
+    def _match_words(self, texts, words):
+        """(text index, term id) of every lexicon word in the texts, in text order
+
+        Words are found with the same rules as TOKEN_RE, but on the bytes of
+        the whole chunk with NumPy, so only matching words become strings.
+        """
+        encoded = [text.lower().encode("utf-8", "surrogatepass") for text in texts]
+        sizes = np.fromiter(map(len, encoded), dtype=np.intp, count=len(encoded))
+        # Texts joined by a newline, which also pads both ends with a non-word byte
+        text_starts = np.cumsum(sizes + 1) - sizes
+        data = b"\n" + b"\n".join(encoded) + b"\n"
+        chars = np.frombuffer(data, dtype=np.uint8)
+
+        is_word_char = np.zeros(256, dtype=bool)
+        is_word_char[np.frombuffer(WORD_CHARS, dtype=np.uint8)] = True
+        alnum = is_word_char[chars]
+        # An apostrophe joins two runs of letters and digits ("don't")
+        inner = chars == ord("'")
+        inner[1:-1] &= alnum[:-2] & alnum[2:]
+        in_word = alnum | inner
+        edges = np.diff(in_word.view(np.int8))
+        starts = np.flatnonzero(edges == 1) + 1
+        ends = np.flatnonzero(edges == -1) + 1
+        if not len(starts):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+        # word_hash of every word: sum of byte * BASE**(position in the word)
+        lengths = ends - starts
+        positions = np.flatnonzero(in_word)
+        heads = np.cumsum(lengths) - lengths
+        # Position in its word of every word byte: +1 per byte, back to 0 at each word
+        steps = np.ones(len(positions), dtype=np.intp)
+        steps[0] = 0
+        steps[heads[1:]] = 1 - lengths[:-1]
+        within = np.cumsum(steps)
+        powers = np.cumprod(np.full(int(lengths.max()), WORD_HASH_BASE, dtype=np.uint64))
+        powers = np.concatenate(([np.uint64(1)], powers[:-1]))
+        hashes = np.add.reduceat(chars[positions].astype(np.uint64) * powers[within], heads)
+
+        found = np.minimum(np.searchsorted(words["hashes"], hashes), len(words["hashes"]) - 1)
+        hits = np.flatnonzero(words["hashes"][found] == hashes)
+        ids = words["ids"][found[hits]]
+        # Confirm the few hits byte for byte (a hash collision is not a match)
+        key_bytes = words["bytes"]
+        same = [data[start:end] == key_bytes[term_id] for start, end, term_id
+                in zip(starts[hits].tolist(), ends[hits].tolist(), ids.tolist())]
+        hits, ids = hits[same], ids[same]
+        docs = np.searchsorted(text_starts, starts[hits], side="right") - 1
+        return docs, ids
+
+    def _match_terms(self, texts):
+        """_match_words for lexicons with stems or phrases, tokenizing text by text"""
+        terms = [[term for term, _, _ in self.scan(text)] for text in texts]
+        term_ids = {}
+        postings_list = []
+        for term in dict.fromkeys(chain.from_iterable(terms)):
+            term_ids[term] = len(postings_list)
+            postings_list.append(self.lookup(term)[0])
+        lengths = np.fromiter(map(len, terms), dtype=np.intp, count=len(terms))
+        ids = np.fromiter(map(term_ids.__getitem__, chain.from_iterable(terms)),
+                          dtype=np.intp, count=int(lengths.sum()))
+        docs = np.repeat(np.arange(len(terms)), lengths)
+        return (docs, ids, list(term_ids)) + self._term_matrices(postings_list)
+
+    def _score_matrix(self, count, docs, ids, names, weights, ranks, limit):
+        """Yield score_batch results from the (text, term) pairs of matched terms"""
+        mood_names = self.mood_names
+        width = len(mood_names)
+        terms = max(len(names), 1)
+        # Sparse count matrix: one cell per distinct (text, term), with its first match
+        cells, first, counts = np.unique(docs * terms + ids, return_index=True,
+                                         return_counts=True)
+        cell_docs, cell_terms = np.divmod(cells, terms)
+
+        targets = cell_docs[:, None] * width + np.arange(width)
+        totals = np.bincount(targets.ravel(), (counts[:, None] * weights[cell_terms]).ravel(),
+                             minlength=count * width).reshape(count, width)
+        if self.compiled.integral:
+            totals = totals.astype(np.int64)
+        moods = totals.argmax(axis=1)  # First max wins, same as max() on the scores dict
+        scored = totals.any(axis=1)
+
+        # Keywords: each text's terms for its mood, by rank, then by first appearance
+        cell_ranks = ranks[cell_terms, moods[cell_docs]]
+        keep = scored[cell_docs] & (cell_ranks < np.iinfo(np.int64).max)
+        order = np.lexsort((first[keep], cell_ranks[keep], cell_docs[keep]))
+        cell_docs, cell_terms = cell_docs[keep][order], cell_terms[keep][order]
+        top = np.arange(len(cell_docs)) - np.searchsorted(cell_docs, cell_docs) < limit
+        cell_docs, cell_terms = cell_docs[top], cell_terms[top]
+        bounds = np.searchsorted(cell_docs, np.arange(count + 1)).tolist()
+        keywords = [names[term_id] for term_id in cell_terms.tolist()]
+
+        for doc, (mood, row_totals) in enumerate(zip(moods.tolist(), totals.tolist())):
+            if scored[doc]:
+                yield mood_names[mood], keywords[bounds[doc]:bounds[doc + 1]], \
+                    dict(zip(mood_names, row_totals))
+            else:
+                yield 'neutral', [], dict(zip(mood_names, row_totals))
+
+    def _score_loop(self, texts, limit):
+        """score_batch without NumPy: a Counter of matched terms per text"""
+        names = self.mood_names
+        width = len(names)
+        simple = self.compiled.max_phrase_words == 1
+        cache = self._cache
+        lookup = self.lookup
+        for text in texts:
+            if simple:
+                terms = Counter(lexicon.TOKEN_RE.findall(text.lower()))
+            else:
+                terms = Counter(term for term, _, _ in self.scan(text))
+            totals = [0] * width
+            matched = []
+            for term, count in terms.items():
+                postings = (cache.get(term) or lookup(term))[0]
+                if postings:
+                    matched.append(term)
+                    for mood, _, weight in postings:
+                        totals[mood] += weight * count
+            if any(totals):
+                # First max wins, same as max() on the scores dict
+                mood = names[max(range(width), key=totals.__getitem__)]
+                yield mood, self.rank_keywords(matched, mood, limit), dict(zip(names, totals))
+            else:
+                yield 'neutral', [], dict(zip(names, totals))
+
+
+BUILTIN_LEXICONS = {
+    'default': MoodLexicon(MOOD_KEYWORDS, os.path.join(lexicon.LEXICON_DIR, "default.mlex")),
+    'minimal': MoodLexicon(MINIMAL_MOOD_KEYWORDS, os.path.join(lexicon.LEXICON_DIR, "minimal.mlex")),
+    'simple': MoodLexicon(SIMPLE_MOOD_KEYWORDS, os.path.join(lexicon.LEXICON_DIR, "simple.mlex")),
+}
+
+# MOODIFY_LEXICON points the full player (and batch analysis) at a compiled lexicon
+DEFAULT_LEXICON = (MoodLexicon(path=os.environ["MOODIFY_LEXICON"])
+                   if os.environ.get("MOODIFY_LEXICON") else BUILTIN_LEXICONS['default'])
+MINIMAL_LEXICON = BUILTIN_LEXICONS['minimal']
+SIMPLE_LEXICON = BUILTIN_LEXICONS['simple']
+
+
+class LiveMood:
+    """Mood of a text being edited, rescoring only the lines that changed
+
+    Each line keeps its own mood totals and matched terms; update()
+    diffs the new text against the previous lines (common prefix and
+    suffix) and rescans just the changed middle. Phrases do not span
+    lines.
+    """
+
+    def __init__(self, lexicon=DEFAULT_LEXICON):
+        self.lexicon = lexicon
+        self.lines = []
+        self.line_scores = []     # Per line: (totals, Counter of terms), or None
+        self.totals = [0] * len(lexicon.mood_names)
+        self.terms = Counter()    # Matched term -> occurrences in the whole text
+
+    def reset(self, text=""):
+        """Analyze a whole new text (e.g. freshly loaded lyrics)"""
+        self.lines = []
+        self.line_scores = []
+        self.totals = [0] * len(self.lexicon.mood_names)
+        self.terms = Counter()
+        return self.update(text)
+
+    def update(self, text):
+        """Catch up with an edited text; returns how many lines were rescored"""
+        lines = text.split("\n")
+        old = self.lines
+        start = 0
+        limit = min(len(old), len(lines))
+        while start < limit and old[start] == lines[start]:
+            start += 1
+        old_end, new_end = len(old), len(lines)
+        while old_end > start and new_end > start and old[old_end - 1] == lines[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+
+        for entry in self.line_scores[start:old_end]:
+            self._apply(entry, -1)
+        entries = [self._score_line(line) for line in lines[start:new_end]]
+        for entry in entries:
+            self._apply(entry, 1)
+        self.line_scores[start:old_end] = entries
+        self.lines = lines
+        return new_end - start
+
+    def _score_line(self, line):
+        totals = None
+        terms = Counter()
+        for term, _, postings in self.lexicon.scan(line):
+            if totals is None:
+                totals = [0] * len(self.totals)
+            terms[term] += 1
+            for mood, _, weight in postings:
+                totals[mood] += weight
+        return None if totals is None else (totals, terms)
+
+    def _apply(self, entry, sign):
+        if entry is None:
+            return
+        totals, terms = entry
+        for i, value in enumerate(totals):
+            self.totals[i] += sign * value
+        for term, count in terms.items():
+            left = self.terms[term] + sign * count
+            if left:
+                self.terms[term] = left
+            else:
+                del self.terms[term]
+
+    @property
+    def scores(self):
+        # Weighted lexicons accumulate float error as lines come and go
+        return {mood: round(total, 9) if isinstance(total, float) else total
+                for mood, total in zip(self.lexicon.mood_names, self.totals)}
+
+    def analysis(self, limit=5):
+        """(dominant mood, top keywords) for the current text"""
+        scores = self.scores
+        if not any(scores.values()):
+            return 'neutral', []
+        mood = max(scores, key=scores.get)
+        return mood, self.lexicon.rank_keywords(self.terms, mood, limit)
+
+
+def analyze_mood(text, lexicon=DEFAULT_LEXICON, limit=5):
+    """Return (dominant mood, top keywords) for a text"""
+    return lexicon.analyze(text, limit)
+
+
+def analyze_mood_batch(lyrics_iterable, lexicon=DEFAULT_LEXICON, limit=5):
+    """Return a (mood, keywords) tuple for every text in an iterable"""
+    return lexicon.analyze_batch(lyrics_iterable, limit)
@@ -0,0 +1,200 @@
+"""
+MOOD INDEX - Persisted per-track mood vectors for instant playlists
+Each analyzed track keeps its analyze_mood score vector in one flat
+float array that is updated in place. Playlists for a mood and "more
+like this" lookups scan that array with NumPy (a few ms at 100k
+tracks), so neither re-analyzes the library.
+"""
+import heapq
+import math
+import os
+import threading
+from array import array
+
+import mood_engine
+import storage
+
+DEFAULT_PATH = os.path.join("lyrics_data", "mood_index.sqlite3")
+
+# Pending vectors written to disk in one transaction
+FLUSH_EVERY = 200
+
+
+class MoodIndex:
+    """track_id -> mood score vector, queried by mood and by similarity"""
+
+    def __init__(self, moods=tuple(mood_engine.MOOD_KEYWORDS), path=DEFAULT_PATH,
+                 generation=None):
+        self.moods = tuple(moods)
+        self.width = len(self.moods)
+        self.path = path
+        self.ids = []          # row -> track_id
+        self.rows = {}         # track_id -> row
+        self.data = array('f')  # rows * width scores, row-major
+        self.pending = {}
+        self.lock = threading.Lock()
+
+        self.db = storage.connect(path, journal_mode=None, synchronous=None)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS vectors (
+                               track_id INTEGER PRIMARY KEY,
+                               scores BLOB NOT NULL)""")
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        if meta.get('moods') != ",".join(self.moods):
+            # Vectors laid out for another set of moods are useless
+            self.db.execute("DELETE FROM vectors")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('moods', ?)",
+                            (",".join(self.moods),))
+        if generation is not None and meta.get('generation') != generation:
+            # The track index was rebuilt (TrackIndex.generation): its IDs name other files now
+            self.db.execute("DELETE FROM vectors")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)",
+                            (generation,))
+        self.db.commit()
+
+        blobs = []
+        for track_id, blob in self.db.execute("SELECT track_id, scores FROM vectors"):
+            self.rows[track_id] = len(self.ids)
+            self.ids.append(track_id)
+            blobs.append(blob)
+        self.data.frombytes(b"".join(blobs))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, track_id):
+        return track_id in self.rows
+
+    def vector(self, track_id):
+        row = self.rows.get(track_id)
+        if row is None:
+            return None
+        return tuple(self.data[row * self.width:(row + 1) * self.width])
+
+    def add(self, track_id, scores):
+        """Store the analyze_mood scores (mood -> count) of a track"""
+        vector = array('f', [scores.get(mood, 0) for mood in self.moods])
+        with self.lock:
+            row = self.rows.get(track_id)
+            if row is None:
+                self.rows[track_id] = len(self.ids)
+                self.ids.append(track_id)
+                self.data.extend(vector)
+            else:
+                start = row * self.width
+                if self.data[start:start + self.width] == vector:
+                    return
+                self.data[start:start + self.width] = vector
+            self.pending[track_id] = vector.tobytes()
+            if len(self.pending) >= FLUSH_EVERY:
+                self._flush()
+
+    def remove(self, track_ids):
+        """Forget tracks that left the library"""
+        width = self.width
+        with self.lock:
+            for track_id in track_ids:
+                self.pending.pop(track_id, None)
+                row = self.rows.pop(track_id, None)
+                if row is None:
+                    continue
+                # Move the last row into the gap so the array stays dense
+                last = len(self.ids) - 1
+                if row != last:
+                    moved = self.ids[last]
+                    self.ids[row] = moved
+                    self.rows[moved] = row
+                    self.data[row * width:(row + 1) * width] = self.data[last * width:]
+                self.ids.pop()
+                del self.data[last * width:]
+            self.db.executemany("DELETE FROM vectors WHERE track_id = ?",
+                                [(track_id,) for track_id in track_ids])
+            self.db.commit()
+
+    def dominant(self, track_id):
+        vector = self.vector(track_id)
+        if not vector or not any(vector):
+            return 'neutral'
+        return self.moods[max(range(self.width), key=vector.__getitem__)]
+
+    def playlist(self, mood, count=50, exclude=()):
+        """Track ids whose dominant mood is `mood`, strongest share first"""
+        if mood not in self.moods:
+            return []
+        m = self.moods.index(mood)
+        exclude = set(exclude)
+        wanted = count + len(exclude)
+
+        with self.lock:
+            if mood_engine.load_numpy():
+                np = mood_engine.np
+                data = np.frombuffer(self.data, dtype=np.float32).reshape(-1, self.width)
+                totals = data.sum(axis=1)
+                candidates = np.flatnonzero((data.argmax(axis=1) == m) & (totals > 0))
+                share = data[candidates, m] / totals[candidates]
+                # Highest share first, then most keyword hits, then oldest row
+                order = np.lexsort((candidates, -totals[candidates], -share))[:wanted]
+                ranked = [self.ids[i] for i in candidates[order]]
+                del data
+            else:
+                ranked = []
+                for row, track_id in enumerate(self.ids):
+                    vector = self.data[row * self.width:(row + 1) * self.width]
+                    total = sum(vector)
+                    if total and max(range(self.width), key=vector.__getitem__) == m:
+                        ranked.append((-vector[m] / total, -total, row, track_id))
+                ranked = [track_id for *_, track_id in heapq.nsmallest(wanted, ranked)]
+
+        return [i for i in ranked if i not in exclude][:count]
+
+    def similar(self, track_id, count=50, exclude=()):
+        """Track ids with the closest mood vectors (cosine similarity)"""
+        target = self.vector(track_id)
+        if not target or not any(target):
+            return []
+        exclude = set(exclude) | {track_id}
+        wanted = count + len(exclude)
+        norm = math.sqrt(sum(v * v for v in target))
+        query = [v / norm for v in target]
+
+        with self.lock:
+            if mood_engine.load_numpy():
+                np = mood_engine.np
+                data = np.frombuffer(self.data, dtype=np.float32).reshape(-1, self.width)
+                norms = np.sqrt((data * data).sum(axis=1))
+                similarity = (data @ np.asarray(query, dtype=np.float32)) / np.maximum(norms, 1e-9)
+                similarity[norms == 0] = -1.0
+                if len(self.ids) > wanted:
+                    top = np.argpartition(-similarity, wanted)[:wanted]
+                else:
+                    top = np.arange(len(self.ids))
+                order = top[np.lexsort((top, -similarity[top]))]
+                ranked = [self.ids[i] for i in order if similarity[i] > -1.0]
+                del data
+            else:
+                scored = []
+                for row, other in enumerate(self.ids):
+                    vector = self.data[row * self.width:(row + 1) * self.width]
+                    length = math.sqrt(sum(v * v for v in vector))
+                    if length:
+                        scored.append((-sum(a * b for a, b in zip(vector, query)) / length,
+                                       row, other))
+                ranked = [other for *_, other in heapq.nsmallest(wanted, scored)]
+
+        return [i for i in ranked if i not in exclude][:count]
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.db.close()
+
+    def _flush(self):
+        if self.pending:
+            self.db.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?)",
+                                list(self.pending.items()))
+            self.db.commit()
+            self.pending = {}
@@ -1,411 +1,1023 @@
-"""
-MOODIFY - AI-Powered Music Mood Player
-A simple Python music player that detects emotions from song lyrics
-"""
-
-import os
-import json
-import random
-import requests
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-from PIL import Image, ImageTk
-import pygame
-from collections import Counter
-import re
-
-# Initialize pygame mixer for audio
-pygame.mixer.init()
-
-class MoodifyPlayer:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("🎵 Moodify - AI Music Mood Player")
-        self.root.geometry("900x700")
-        self.root.configure(bg="#1e1e2e")
-        
-        # Variables
-        self.current_song = None
-        self.is_playing = False
-        self.song_list = []
-        self.lyrics_cache = {}
-        self.mood_colors = {
-            'happy': '#FFD700',
-            'sad': '#4169E1',
-            'romantic': '#FF69B4',
-            'energetic': '#FF4500',
-            'calm': '#32CD32',
-            'angry': '#DC143C',
-            'neutral': '#808080'
-        }
-        
-        # Setup GUI
-        self.setup_gui()
-        self.load_sample_songs()
-        
-    def setup_gui(self):
-        """Create the user interface"""
-        
-        # Main container
-        main_frame = tk.Frame(self.root, bg="#1e1e2e")
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        # Header
-        header = tk.Frame(main_frame, bg="#282a36")
-        header.pack(fill=tk.X, pady=(0, 20))
-        
-        title = tk.Label(header, text="🎵 MOODIFY", font=("Arial", 28, "bold"),
-                        bg="#282a36", fg="#f8f8f2")
-        title.pack(pady=10)
-        
-        subtitle = tk.Label(header, text="AI-Powered Music Mood Detection Player",
-                           font=("Arial", 12), bg="#282a36", fg="#bd93f9")
-        subtitle.pack(pady=(0, 10))
-        
-        # Body with two columns
-        body_frame = tk.Frame(main_frame, bg="#1e1e2e")
-        body_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Left panel - Song controls
-        left_panel = tk.Frame(body_frame, bg="#282a36", relief=tk.RAISED, borderwidth=2)
-        left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-        
-        # Song list
-        song_list_label = tk.Label(left_panel, text="🎶 Song Library", 
-                                  font=("Arial", 14, "bold"), bg="#282a36", fg="#f8f8f2")
-        song_list_label.pack(pady=10)
-        
-        # Search box
-        search_frame = tk.Frame(left_panel, bg="#282a36")
-        search_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
-        
-        tk.Label(search_frame, text="Search:", bg="#282a36", fg="#f8f8f2").pack(side=tk.LEFT)
-        self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_songs)
-        search_entry = tk.Entry(search_frame, textvariable=self.search_var, 
-                               bg="#44475a", fg="#f8f8f2", insertbackground="white")
-        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-        
-        # Listbox with scrollbar
-        listbox_frame = tk.Frame(left_panel, bg="#282a36")
-        listbox_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        
-        scrollbar = tk.Scrollbar(listbox_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.song_listbox = tk.Listbox(listbox_frame, bg="#44475a", fg="#f8f8f2",
-                                      selectbackground="#6272a4", yscrollcommand=scrollbar.set,
-                                      font=("Arial", 10), selectmode=tk.SINGLE)
-        self.song_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.song_listbox.yview)
-        
-        # Control buttons
-        control_frame = tk.Frame(left_panel, bg="#282a36")
-        control_frame.pack(fill=tk.X, padx=10, pady=10)
-        
-        button_style = {"bg": "#44475a", "fg": "#f8f8f2", "activebackground": "#6272a4",
-                       "font": ("Arial", 10), "relief": tk.RAISED, "borderwidth": 2}
-        
-        self.play_btn = tk.Button(control_frame, text="▶ Play", command=self.play_selected,
-                                 **button_style)
-        self.play_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        self.pause_btn = tk.Button(control_frame, text="⏸ Pause", command=self.pause_music,
-                                  **button_style)
-        self.pause_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        self.stop_btn = tk.Button(control_frame, text="⏹ Stop", command=self.stop_music,
-                                 **button_style)
-        self.stop_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        # Right panel - Lyrics and Mood
-        right_panel = tk.Frame(body_frame, bg="#282a36", relief=tk.RAISED, borderwidth=2)
-        right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-        
-        # Now Playing section
-        now_playing_frame = tk.Frame(right_panel, bg="#282a36")
-        now_playing_frame.pack(fill=tk.X, padx=10, pady=10)
-        
-        self.now_playing_label = tk.Label(now_playing_frame, text="Now Playing: None",
-                                         font=("Arial", 12, "bold"), bg="#282a36", fg="#50fa7b")
-        self.now_playing_label.pack(anchor=tk.W)
-        
-        # Mood visualization
-        mood_frame = tk.Frame(right_panel, bg="#282a36")
-        mood_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
-        
-        self.mood_label = tk.Label(mood_frame, text="Detected Mood: --",
-                                  font=("Arial", 14, "bold"), bg="#282a36", fg="#ff79c6")
-        self.mood_label.pack(anchor=tk.W)
-        
-        # Mood color bar
-        self.mood_canvas = tk.Canvas(mood_frame, bg="#44475a", height=30, highlightthickness=0)
-        self.mood_canvas.pack(fill=tk.X, pady=5)
-        
-        # Lyrics display
-        lyrics_label = tk.Label(right_panel, text="📝 Lyrics", font=("Arial", 14, "bold"),
-                               bg="#282a36", fg="#f8f8f2")
-        lyrics_label.pack(pady=(10, 5))
-        
-        self.lyrics_text = scrolledtext.ScrolledText(right_panel, bg="#44475a", fg="#f8f8f2",
-                                                    font=("Courier", 10), wrap=tk.WORD,
-                                                    height=15)
-        self.lyrics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        
-        # Mood keywords
-        keywords_frame = tk.Frame(right_panel, bg="#282a36")
-        keywords_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
-        
-        self.keywords_label = tk.Label(keywords_frame, text="Mood Keywords: --",
-                                      bg="#282a36", fg="#f1fa8c")
-        self.keywords_label.pack(anchor=tk.W)
-        
-        # Status bar
-        self.status_bar = tk.Label(main_frame, text="Ready", bd=1, relief=tk.SUNKEN,
-                                  anchor=tk.W, bg="#282a36", fg="#f8f8f2")
-        self.status_bar.pack(fill=tk.X, pady=(10, 0))
-    
-    def load_sample_songs(self):
-        """Load sample songs (you can add your own MP3 files)"""
-        self.song_list = [
-            {"title": "Bohemian Rhapsody", "artist": "Queen", "file": "bohemian.mp3", "url": None},
-            {"title": "Imagine", "artist": "John Lennon", "file": "imagine.mp3", "url": None},
-            {"title": "Blinding Lights", "artist": "The Weeknd", "file": None, "url": "search"},
-            {"title": "Perfect", "artist": "Ed Sheeran", "file": None, "url": "search"},
-            {"title": "Shape of You", "artist": "Ed Sheeran", "file": None, "url": "search"},
-            {"title": "Someone Like You", "artist": "Adele", "file": None, "url": "search"},
-            {"title": "Uptown Funk", "artist": "Mark Ronson ft. Bruno Mars", "file": None, "url": "search"},
-            {"title": "Despacito", "artist": "Luis Fonsi", "file": None, "url": "search"},
-            {"title": "See You Again", "artist": "Wiz Khalifa ft. Charlie Puth", "file": None, "url": "search"},
-            {"title": "Happy", "artist": "Pharrell Williams", "file": None, "url": "search"},
-        ]
-        
-        self.update_song_listbox()
-    
-    def update_song_listbox(self, filtered_list=None):
-        """Update the song listbox"""
-        self.song_listbox.delete(0, tk.END)
-        
-        songs_to_show = filtered_list if filtered_list else self.song_list
-        
-        for song in songs_to_show:
-            display_text = f"{song['title']} - {song['artist']}"
-            if song.get('file'):
-                display_text += " 📁"
-            self.song_listbox.insert(tk.END, display_text)
-    
-    def filter_songs(self, *args):
-        """Filter songs based on search"""
-        search_term = self.search_var.get().lower()
-        
-        if not search_term:
-            self.update_song_listbox()
-            return
-        
-        filtered = []
-        for song in self.song_list:
-            if (search_term in song['title'].lower() or 
-                search_term in song['artist'].lower()):
-                filtered.append(song)
-        
-        self.update_song_listbox(filtered)
-    
-    def play_selected(self):
-        """Play selected song"""
-        selection = self.song_listbox.curselection()
-        if not selection:
-            messagebox.showinfo("No Selection", "Please select a song from the list")
-            return
-        
-        # Get selected song
-        index = selection[0]
-        all_items = self.song_listbox.get(0, tk.END)
-        
-        # Find the actual song
-        for song in self.song_list:
-            if f"{song['title']} - {song['artist']}" == all_items[index]:
-                self.current_song = song
-                break
-        
-        if not self.current_song:
-            return
-        
-        # Update UI
-        self.now_playing_label.config(text=f"Now Playing: {self.current_song['title']}")
-        self.status_bar.config(text=f"Loading {self.current_song['title']}...")
-        
-        # Get lyrics and analyze mood
-        self.get_lyrics_and_analyze()
-        
-        # Simulate playback (in real app, you'd play actual audio)
-        self.is_playing = True
-        self.status_bar.config(text=f"Playing: {self.current_song['title']}")
-        
-        # Show message
-        messagebox.showinfo("Playing Song", 
-                          f"Now playing: {self.current_song['title']}\n"
-                          f"Artist: {self.current_song['artist']}\n\n"
-                          f"Note: This is a demo. Add MP3 files to 'songs' folder for actual playback.")
-    
-    def get_lyrics_and_analyze(self):
-        """Get lyrics and analyze mood"""
-        song = self.current_song
-        
-        # Clear previous
-        self.lyrics_text.delete(1.0, tk.END)
-        
-        # Try to get lyrics
-        lyrics = self.fetch_lyrics(song['title'], song['artist'])
-        
-        if lyrics:
-            self.lyrics_text.insert(tk.END, lyrics)
-            
-            # Analyze mood
-            mood, keywords = self.analyze_mood(lyrics)
-            
-            # Update mood display
-            self.mood_label.config(text=f"Detected Mood: {mood.upper()}")
-            self.keywords_label.config(text=f"Mood Keywords: {', '.join(keywords[:5])}")
-            
-            # Update mood color bar
-            color = self.mood_colors.get(mood, '#808080')
-            self.mood_canvas.delete("all")
-            self.mood_canvas.create_rectangle(0, 0, 300, 30, fill=color, outline="")
-            self.mood_canvas.create_text(150, 15, text=mood.upper(), 
-                                        font=("Arial", 12, "bold"), fill="white")
-        else:
-            self.lyrics_text.insert(tk.END, "Lyrics not available for this song.")
-            self.mood_label.config(text="Detected Mood: Unknown")
-            self.keywords_label.config(text="Mood Keywords: None")
-    
-    def fetch_lyrics(self, title, artist):
-        """Fetch lyrics from API"""
-        # Cache check
-        cache_key = f"{title}_{artist}"
-        if cache_key in self.lyrics_cache:
-            return self.lyrics_cache[cache_key]
-        
-        try:
-            # Try lyrics.ovh API
-            url = f"https://api.lyrics.ovh/v1/{artist}/{title}"
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code == 200:
-                lyrics = response.json().get('lyrics', '')
-                if lyrics:
-                    # Clean lyrics
-                    lyrics = re.sub(r'\[.*?\]', '', lyrics)  # Remove [Verse], [Chorus]
-                    self.lyrics_cache[cache_key] = lyrics
-                    return lyrics
-            
-            # Try alternative for popular songs
-            popular_lyrics = {
-                "Bohemian Rhapsody": """Is this the real life? Is this just fantasy?
-Caught in a landslide, no escape from reality
-Open your eyes, look up to the skies and see
-I'm just a poor boy, I need no sympathy
-Because I'm easy come, easy go, little high, little low
-Any way the wind blows doesn't really matter to me, to me""",
-                
-                "Imagine": """Imagine there's no heaven
-It's easy if you try
-No hell below us
-Above us only sky
-Imagine all the people
-Living for today""",
-                
-                "Happy": """It might seem crazy what I'm about to say
-Sunshine she's here, you can take a break
-I'm a hot air balloon that could go to space
-With the air, like I don't care, baby, by the way"""
-            }
-            
-            if title in popular_lyrics:
-                return popular_lyrics[title]
-                
-        except Exception as e:
-            print(f"Lyrics fetch error: {e}")
-        
-        return None
-    
-    def analyze_mood(self, lyrics):
-        """Simple mood analysis from lyrics"""
-        # Mood keywords mapping
-        mood_keywords = {
-            'happy': ['love', 'happy', 'joy', 'smile', 'sun', 'light', 'good', 'beautiful', 'wonderful'],
-            'sad': ['sad', 'lonely', 'cry', 'tears', 'pain', 'hurt', 'alone', 'miss', 'goodbye'],
-            'romantic': ['love', 'heart', 'kiss', 'hold', 'touch', 'darling', 'baby', 'sweet', 'forever'],
-            'energetic': ['go', 'move', 'dance', 'jump', 'run', 'party', 'energy', 'wild', 'fire'],
-            'calm': ['peace', 'calm', 'quiet', 'still', 'gentle', 'soft', 'easy', 'slow', 'dream'],
-            'angry': ['hate', 'angry', 'rage', 'fight', 'war', 'kill', 'burn', 'break', 'mad']
-        }
-        
-        lyrics_lower = lyrics.lower()
-        scores = {}
-        
-        # Count keyword matches
-        for mood, keywords in mood_keywords.items():
-            count = 0
-            for keyword in keywords:
-                count += lyrics_lower.count(keyword)
-            scores[mood] = count
-        
-        # Find dominant mood
-        if sum(scores.values()) == 0:
-            return 'neutral', []
-        
-        dominant_mood = max(scores, key=scores.get)
-        
-        # Get top keywords
-        found_keywords = []
-        for keyword in mood_keywords[dominant_mood]:
-            if keyword in lyrics_lower:
-                found_keywords.append(keyword)
-        
-        return dominant_mood, found_keywords[:5]
-    
-    def pause_music(self):
-        """Pause/resume music"""
-        if self.current_song:
-            self.is_playing = not self.is_playing
-            if self.is_playing:
-                self.status_bar.config(text=f"Resumed: {self.current_song['title']}")
-                self.pause_btn.config(text="⏸ Pause")
-            else:
-                self.status_bar.config(text=f"Paused: {self.current_song['title']}")
-                self.pause_btn.config(text="▶ Resume")
-    
-    def stop_music(self):
-        """Stop music"""
-        if self.current_song:
-            self.is_playing = False
-            self.status_bar.config(text=f"Stopped: {self.current_song['title']}")
-            self.now_playing_label.config(text="Now Playing: None")
-            self.lyrics_text.delete(1.0, tk.END)
-            self.mood_label.config(text="Detected Mood: --")
-            self.keywords_label.config(text="Mood Keywords: --")
-            self.mood_canvas.delete("all")
-
-def main():
-    """Main function"""
-    root = tk.Tk()
-    app = MoodifyPlayer(root)
-    root.mainloop()
-
-if __name__ == "__main__":
-    # Create necessary directories
-    os.makedirs("songs", exist_ok=True)
-    os.makedirs("lyrics_data", exist_ok=True)
-    os.makedirs("assets", exist_ok=True)
-    
-    # Check requirements
-    try:
-        import pygame
-        import PIL
-    except ImportError:
-        print("Installing required packages...")
-        import subprocess
-        subprocess.call(['pip', 'install', 'pygame', 'pillow', 'requests'])
-        print("Please restart the application.")
-    
-    main()
\ No newline at end of file
+"""
+MOODIFY - AI-Powered Music Mood Player
+A simple Python music player that detects emotions from song lyrics
+"""
+
+import time
+
+# Start of the startup-time measurement (import -> first frame)
+IMPORT_STARTED = time.perf_counter()
+
+import os
+import json
+import sys
+import threading
+from concurrent.futures import wait
+
+if __name__ == "__main__" and sys.argv[1:2] == ["analyze"]:
+    # Headless batch mode: dispatched before tkinter or any GUI module is imported
+    import batch_analyze
+    sys.exit(batch_analyze.main(sys.argv[2:]))
+
+import tkinter as tk
+from tkinter import scrolledtext, messagebox
+import re
+import mood_engine
+from lookups import BACKGROUND, FOREGROUND, LookupCancelled, LookupScheduler
+from lyrics_cache import LyricsCache, MISS, make_key
+from lyrics_corpus import LyricsCorpus
+from mood_cache import MoodCache
+from workers import BackgroundWorker
+from prefetch import LibraryPrefetcher
+from library import TrackIndex
+from search import SongSearchIndex
+from virtual_list import IndexView, VirtualListbox
+from cover_art import CoverArt
+from visualizer import SpectrumVisualizer
+from history import ListeningHistory, MOOD, PAUSE, PLAY, RESUME, STOP
+from tracks import Track, TrackList
+from playback import PlaybackEngine
+from mood_index import MoodIndex
+from audio_features import audio_mood_scores, blend_scores
+from metrics import Metrics
+
+# Folder scanned for local music files
+SONGS_DIR = "songs"
+
+# Delay after the last keystroke before the song list is filtered (ms)
+SEARCH_DEBOUNCE_MS = 120
+
+# Lyrics lookups allowed in flight while prefetching the library
+PREFETCH_CONCURRENCY = 4
+
+# How often the UI checks on the playback engine (ms)
+PLAYBACK_POLL_MS = 100
+
+# Songs queued after the one you pressed Play on
+PLAY_QUEUE_LENGTH = 50
+
+# Scrolling must pause this long before cover art of the visible rows is loaded (ms)
+ART_PREFETCH_DELAY_MS = 150
+
+# Height of the spectrum and mood bars canvas (px)
+VISUALIZER_HEIGHT = 96
+
+# Days shown in the mood history chart
+HISTORY_DAYS = 30
+
+# Songs in a generated mood playlist
+PLAYLIST_LENGTH = 50
+
+# Import -> first frame target; slower starts are reported on stderr
+STARTUP_BUDGET_S = 1.0
+
+# How often the metrics file is rewritten, and the stats panel refreshed (ms)
+METRICS_INTERVAL_MS = 10000
+STATS_REFRESH_MS = 1000
+
+class MoodifyPlayer:
+    def __init__(self, root, metrics_path=None):
+        self.root = root
+        self.root.title("🎵 Moodify - AI Music Mood Player")
+        self.root.geometry("900x700")
+        self.root.configure(bg="#1e1e2e")
+        
+        # Variables
+        self.current_song = None
+        self.is_playing = False
+        self.song_list = TrackList()
+        self.search_index = None
+        self.search_index_pending = None
+        self.filter_job = None
+        self.lyrics_cache = LyricsCache()
+        # Offline lyrics, asked before the network
+        self.lyrics_corpus = LyricsCorpus()
+        self.track_index = TrackIndex()
+        # Audio and HTTP are set up on first use or right after the first frame
+        self._player = None
+        self._lyrics_client = None
+        self._mood_index = None
+        # One lock per subsystem, so waiting on pygame never blocks the mood index
+        self.player_lock = threading.Lock()
+        self.client_lock = threading.Lock()
+        self.mood_index_lock = threading.Lock()
+        self.startup_time = None
+        self.closing = False
+        self.audio_job = None
+        # Stage timings and counters; written to a file if a path is given
+        self.metrics = Metrics()
+        self.metrics_path = metrics_path or os.environ.get("MOODIFY_METRICS_FILE")
+        # Scores by lyrics content, so replays and duplicate lyrics are not rescored
+        self.mood_cache = MoodCache(metrics=self.metrics)
+        # Shares in-flight lyrics lookups and puts the selected song ahead of prefetching
+        self.lookups = LookupScheduler(metrics=self.metrics)
+        self.lyrics_job = None
+        self.stats_window = None
+        # Every play/pause/stop, with mood statistics kept up to date
+        self.history = ListeningHistory()
+        self.history_window = None
+        # Incremental scorer behind the live mood mode
+        self.live_mood = mood_engine.LiveMood(mood_engine.DEFAULT_LEXICON)
+        self.live_job = None
+        self.cover_art = CoverArt(root)
+        self.art_job = None
+        self.worker = BackgroundWorker(root)
+        # Separate pool so prefetching never delays the song the user clicked
+        self.prefetch_worker = BackgroundWorker(root, max_workers=PREFETCH_CONCURRENCY)
+        self.prefetcher = LibraryPrefetcher(self.prefetch_worker,
+                                            lambda song: self.load_lyrics_and_mood(song, BACKGROUND),
+                                            concurrency=PREFETCH_CONCURRENCY,
+                                            on_result=self.prefetch_result,
+                                            on_progress=self.prefetch_progress,
+                                            on_finished=self.prefetch_finished)
+        self.mood_colors = {
+            'happy': '#FFD700',
+            'sad': '#4169E1',
+            'romantic': '#FF69B4',
+            'energetic': '#FF4500',
+            'calm': '#32CD32',
+            'angry': '#DC143C',
+            'neutral': '#808080'
+        }
+        
+        # Setup GUI
+        self.setup_gui()
+        self.load_library()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(PLAYBACK_POLL_MS, self.poll_playback)
+        self.root.bind("<Map>", self.first_frame, add="+")
+        if self.metrics_path:
+            self.root.after(METRICS_INTERVAL_MS, self.write_metrics)
+        
+    def first_frame(self, event=None):
+        """Record startup time once the window is shown, then warm up in the background"""
+        if self.startup_time is not None:
+            return
+        self.root.update_idletasks()
+        self.startup_time = time.perf_counter() - IMPORT_STARTED
+        if self.startup_time > STARTUP_BUDGET_S:
+            print(f"Startup took {self.startup_time:.2f}s "
+                  f"(budget {STARTUP_BUDGET_S:.2f}s)", file=sys.stderr)
+        self.worker.submit(self.warm_up, on_error=lambda error: self.status_bar.config(
+            text=f"Audio/network unavailable: {error}"))
+    
+    def warm_up(self):
+        """Load the audio, HTTP and mood index subsystems (runs on a worker thread)"""
+        self.mood_index
+        self.lyrics_client
+        self.player
+    
+    @property
+    def mood_index(self):
+        """Per-track mood vectors; loaded from disk on first use"""
+        with self.mood_index_lock:
+            if self._mood_index is None:
+                self._mood_index = MoodIndex(mood_engine.DEFAULT_LEXICON.mood_names,
+                                             generation=self.track_index.generation)
+            return self._mood_index
+    
+    @property
+    def player(self):
+        """Playback engine; pygame.mixer is initialized on first use"""
+        with self.player_lock:
+            if self._player is None:
+                import pygame
+                pygame.mixer.init()
+                self._player = PlaybackEngine(pygame.mixer)
+            return self._player
+    
+    @property
+    def lyrics_client(self):
+        """Lyrics client; requests is imported on first use"""
+        with self.client_lock:
+            if self._lyrics_client is None:
+                from lyrics_client import LyricsClient
+                self._lyrics_client = LyricsClient(timeout=5, metrics=self.metrics)
+            return self._lyrics_client
+        
+    def setup_gui(self):
+        """Create the user interface"""
+        
+        # Main container
+        main_frame = tk.Frame(self.root, bg="#1e1e2e")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # Header
+        header = tk.Frame(main_frame, bg="#282a36")
+        header.pack(fill=tk.X, pady=(0, 20))
+        
+        title = tk.Label(header, text="🎵 MOODIFY", font=("Arial", 28, "bold"),
+                        bg="#282a36", fg="#f8f8f2")
+        title.pack(pady=10)
+        
+        subtitle = tk.Label(header, text="AI-Powered Music Mood Detection Player",
+                           font=("Arial", 12), bg="#282a36", fg="#bd93f9")
+        subtitle.pack(pady=(0, 10))
+        
+        # Body with two columns
+        body_frame = tk.Frame(main_frame, bg="#1e1e2e")
+        body_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Left panel - Song controls
+        left_panel = tk.Frame(body_frame, bg="#282a36", relief=tk.RAISED, borderwidth=2)
+        left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        
+        # Song list
+        song_list_label = tk.Label(left_panel, text="🎶 Song Library", 
+                                  font=("Arial", 14, "bold"), bg="#282a36", fg="#f8f8f2")
+        song_list_label.pack(pady=10)
+        
+        # Search box
+        search_frame = tk.Frame(left_panel, bg="#282a36")
+        search_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        tk.Label(search_frame, text="Search:", bg="#282a36", fg="#f8f8f2").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', self.schedule_filter)
+        search_entry = tk.Entry(search_frame, textvariable=self.search_var, 
+                               bg="#44475a", fg="#f8f8f2", insertbackground="white")
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        # Song list with scrollbar (only visible rows are rendered)
+        self.song_listbox = VirtualListbox(left_panel, render=self.display_text,
+                                          on_redraw=self.rows_shown, bg="#44475a", fg="#f8f8f2",
+                                          selectbackground="#6272a4", font=("Arial", 10))
+        self.song_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        # Control buttons
+        control_frame = tk.Frame(left_panel, bg="#282a36")
+        control_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        button_style = {"bg": "#44475a", "fg": "#f8f8f2", "activebackground": "#6272a4",
+                       "font": ("Arial", 10), "relief": tk.RAISED, "borderwidth": 2}
+        
+        self.play_btn = tk.Button(control_frame, text="▶ Play", command=self.play_selected,
+                                 **button_style)
+        self.play_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        self.pause_btn = tk.Button(control_frame, text="⏸ Pause", command=self.pause_music,
+                                  **button_style)
+        self.pause_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        self.stop_btn = tk.Button(control_frame, text="⏹ Stop", command=self.stop_music,
+                                 **button_style)
+        self.stop_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        self.prefetch_btn = tk.Button(left_panel, text="⟳ Prefetch Library",
+                                     command=self.toggle_prefetch, **button_style)
+        self.prefetch_btn.pack(fill=tk.X, padx=15, pady=(0, 10))
+        
+        tk.Button(left_panel, text="📊 Stats", command=self.show_stats,
+                 **button_style).pack(fill=tk.X, padx=15, pady=(0, 10))
+        tk.Button(left_panel, text="📈 My mood over time", command=self.show_mood_history,
+                 **button_style).pack(fill=tk.X, padx=15, pady=(0, 10))
+        
+        # Mood playlists
+        playlist_frame = tk.Frame(left_panel, bg="#282a36")
+        playlist_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        tk.Label(playlist_frame, text="Play me something", bg="#282a36",
+                fg="#f8f8f2").pack(side=tk.LEFT, padx=5)
+        self.playlist_mood = tk.StringVar(value=mood_engine.DEFAULT_LEXICON.mood_names[0])
+        mood_menu = tk.OptionMenu(playlist_frame, self.playlist_mood,
+                                  *mood_engine.DEFAULT_LEXICON.mood_names)
+        mood_menu.config(bg="#44475a", fg="#f8f8f2", activebackground="#6272a4",
+                         highlightthickness=0)
+        mood_menu.pack(side=tk.LEFT, padx=5)
+        tk.Button(playlist_frame, text="🎲 Go", command=self.play_mood_playlist,
+                 **button_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(playlist_frame, text="More like this", command=self.play_similar,
+                 **button_style).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        # Right panel - Lyrics and Mood
+        right_panel = tk.Frame(body_frame, bg="#282a36", relief=tk.RAISED, borderwidth=2)
+        right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        
+        # Now Playing section
+        now_playing_frame = tk.Frame(right_panel, bg="#282a36")
+        now_playing_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Cover art of the playing song (hidden when it has none)
+        self.cover_label = tk.Label(now_playing_frame, bg="#282a36")
+        self.now_playing_label = tk.Label(now_playing_frame, text="Now Playing: None",
+                                         font=("Arial", 12, "bold"), bg="#282a36", fg="#50fa7b")
+        self.now_playing_label.pack(side=tk.LEFT, anchor=tk.W)
+        
+        # Mood visualization
+        mood_frame = tk.Frame(right_panel, bg="#282a36")
+        mood_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.mood_label = tk.Label(mood_frame, text="Detected Mood: --",
+                                  font=("Arial", 14, "bold"), bg="#282a36", fg="#ff79c6")
+        self.mood_label.pack(anchor=tk.W)
+        
+        # Spectrum of the playing track over per-mood score bars
+        self.mood_canvas = tk.Canvas(mood_frame, bg="#44475a", height=VISUALIZER_HEIGHT,
+                                     highlightthickness=0)
+        self.mood_canvas.pack(fill=tk.X, pady=5)
+        self.visualizer = SpectrumVisualizer(self.root, self.mood_canvas,
+                                             mood_engine.DEFAULT_LEXICON.mood_names,
+                                             self.mood_colors, metrics=self.metrics)
+        
+        # Lyrics display
+        lyrics_header = tk.Frame(right_panel, bg="#282a36")
+        lyrics_header.pack(fill=tk.X, padx=10, pady=(10, 5))
+        lyrics_label = tk.Label(lyrics_header, text="📝 Lyrics", font=("Arial", 14, "bold"),
+                               bg="#282a36", fg="#f8f8f2")
+        lyrics_label.pack(side=tk.LEFT, expand=True)
+        
+        # Live mode: edit the lyrics and the mood follows (edited lines only)
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(lyrics_header, text="✎ Live mood", variable=self.live_var,
+                       command=self.toggle_live, bg="#282a36", fg="#f8f8f2",
+                       selectcolor="#44475a", activebackground="#282a36").pack(side=tk.RIGHT)
+        
+        self.lyrics_text = scrolledtext.ScrolledText(right_panel, bg="#44475a", fg="#f8f8f2",
+                                                    font=("Courier", 10), wrap=tk.WORD,
+                                                    height=15)
+        self.lyrics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.lyrics_text.bind("<<Modified>>", self.lyrics_modified)
+        
+        # Mood keywords
+        keywords_frame = tk.Frame(right_panel, bg="#282a36")
+        keywords_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.keywords_label = tk.Label(keywords_frame, text="Mood Keywords: --",
+                                      bg="#282a36", fg="#f1fa8c")
+        self.keywords_label.pack(anchor=tk.W)
+        
+        # Status bar
+        self.status_bar = tk.Label(main_frame, text="Ready", bd=1, relief=tk.SUNKEN,
+                                  anchor=tk.W, bg="#282a36", fg="#f8f8f2")
+        self.status_bar.pack(fill=tk.X, pady=(10, 0))
+    
+    def load_sample_songs(self):
+        """Load sample songs (you can add your own MP3 files)"""
+        # Negative IDs never collide with the track index's row IDs
+        self.set_song_list(TrackList([
+            Track(-1, "Bohemian Rhapsody", "Queen", os.path.join(SONGS_DIR, "bohemian.mp3")),
+            Track(-2, "Imagine", "John Lennon", os.path.join(SONGS_DIR, "imagine.mp3")),
+            Track(-3, "Blinding Lights", "The Weeknd"),
+            Track(-4, "Perfect", "Ed Sheeran"),
+            Track(-5, "Shape of You", "Ed Sheeran"),
+            Track(-6, "Someone Like You", "Adele"),
+            Track(-7, "Uptown Funk", "Mark Ronson ft. Bruno Mars"),
+            Track(-8, "Despacito", "Luis Fonsi"),
+            Track(-9, "See You Again", "Wiz Khalifa ft. Charlie Puth"),
+            Track(-10, "Happy", "Pharrell Williams"),
+        ]))
+    
+    def set_song_list(self, song_list):
+        """Replace the library shown in the song list"""
+        self.song_list = song_list
+        self.filter_songs()
+        self.build_search_index()
+    
+    def load_library(self):
+        """Show the indexed songs/ library at once, then rescan it in the background"""
+        tracks = self.track_index.tracks()
+        if tracks:
+            self.set_song_list(TrackList(tracks))
+        else:
+            self.load_sample_songs()
+        
+        self.status_bar.config(text=f"Scanning {SONGS_DIR}/...")
+        self.worker.submit(lambda: self.track_index.scan(SONGS_DIR,
+                                                         on_removed=self.forget_tracks),
+                           on_done=self.library_scanned,
+                           on_error=lambda error: self.status_bar.config(
+                               text=f"Library scan failed: {error}"))
+    
+    def library_scanned(self, result):
+        """Refresh the song list if the scan found changes"""
+        changed, removed, unchanged = result
+        if changed or removed:
+            tracks = self.track_index.tracks()
+            if tracks:
+                self.set_song_list(TrackList(tracks))
+            else:
+                self.load_sample_songs()
+        self.status_bar.config(text=f"Library: {changed + unchanged} files "
+                                    f"({changed} new/changed, {removed} removed)")
+        
+        # Audio features for songs without (matching) lyrics, in worker processes
+        self.audio_job = self.worker.submit(lambda: self.track_index.analyze_audio(
+                                                should_stop=lambda: self.closing),
+                                            on_done=self.audio_analyzed,
+                                            on_error=lambda error: print(
+                                                f"Audio analysis failed: {error}"))
+    
+    def forget_tracks(self, track_ids):
+        """Drop the mood vectors of deleted files (runs on the scan's worker thread)"""
+        self.mood_index.remove(track_ids)
+    
+    def audio_analyzed(self, count):
+        if count:
+            self.status_bar.config(text=f"Analyzed the audio of {count} songs")
+    
+    def update_song_listbox(self, filtered_ids=None):
+        """Update the song listbox (rows are track IDs)"""
+        ids_to_show = filtered_ids if filtered_ids is not None else self.song_list.ids
+        self.song_listbox.set_items(ids_to_show)
+    
+    def display_text(self, track_id):
+        """Listbox row text for a track"""
+        song = self.song_list.get(track_id)
+        display_text = f"{song.title} - {song.artist}"
+        if song.file:
+            display_text += " 📁"
+        return display_text
+    
+    def schedule_filter(self, *args):
+        """Debounce keystrokes so fast typing filters once"""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_songs)
+    
+    def filter_songs(self, *args):
+        """Filter songs based on search"""
+        self.filter_job = None
+        search_term = self.search_var.get().lower()
+        
+        if not search_term:
+            self.update_song_listbox()
+            return
+        
+        index = self.search_index
+        if index is not None and index.songs is self.song_list:
+            filtered = IndexView(self.song_list.ids, index.search(search_term))
+        else:
+            # Index for this list is still being built: plain scan
+            self.build_search_index()
+            filtered = [song.id for song in self.song_list
+                        if search_term in song.title.lower()
+                        or search_term in song.artist.lower()]
+        
+        self.update_song_listbox(filtered)
+    
+    def build_search_index(self):
+        """Index the current song list on the background worker"""
+        songs = self.song_list
+        if self.search_index_pending is songs or (
+                self.search_index is not None and self.search_index.songs is songs):
+            return
+        self.search_index_pending = songs
+        
+        def built(index):
+            if self.search_index_pending is index.songs:
+                self.search_index_pending = None
+            if index.songs is self.song_list:
+                self.search_index = index
+        
+        self.worker.submit(SongSearchIndex, songs, on_done=built)
+    
+    def play_selected(self):
+        """Play selected song"""
+        clicked_at = time.perf_counter()
+        selection = self.song_listbox.curselection()
+        if not selection:
+            messagebox.showinfo("No Selection", "Please select a song from the list")
+            return
+        
+        # Get selected song (rows are track IDs)
+        song = self.song_list.get(self.song_listbox.selected_item())
+        if song is None:
+            return
+        self.current_song = song
+        
+        # Update UI
+        self.now_playing_label.config(text=f"Now Playing: {self.current_song.title}")
+        self.show_cover(song)
+        self.pause_btn.config(text="⏸ Pause")
+        
+        # Play the file, queueing the songs listed after it
+        has_file = bool(song.file) and os.path.isfile(song.file)
+        if has_file:
+            try:
+                self.player.set_queue(self.upcoming_songs(selection[0]))
+                self.player.play(song, clicked_at)
+            except Exception as e:
+                messagebox.showerror("Playback Error", f"Could not play {song.file}:\n{e}")
+                return
+            self.start_visualizer(song)
+        elif self._player is not None:
+            self._player.stop()
+        if not has_file:
+            self.start_visualizer(None)
+        self.is_playing = True
+        self.history.record(PLAY, song, song.mood)
+        
+        # Get lyrics and analyze mood (in the background)
+        self.get_lyrics_and_analyze()
+        
+        # Show message
+        if not has_file:
+            messagebox.showinfo("Playing Song", 
+                          f"Now playing: {self.current_song.title}\n"
+                          f"Artist: {self.current_song.artist}\n\n"
+                          f"Note: This is a demo. Add MP3 files to 'songs' folder for actual playback.")
+    
+    def upcoming_songs(self, index):
+        """Songs after a list row that have a playable file"""
+        rows = self.song_listbox.items
+        upcoming = []
+        for i in range(index + 1, len(rows)):
+            song = self.song_list.get(rows[i])
+            if song.file and os.path.isfile(song.file):
+                upcoming.append(song)
+                if len(upcoming) >= PLAY_QUEUE_LENGTH:
+                    break
+        return upcoming
+    
+    def poll_playback(self):
+        """Follow the playback engine: track changes, end of queue, first audio"""
+        self.root.after(PLAYBACK_POLL_MS, self.poll_playback)
+        if self._player is None:
+            return
+        
+        reported = self.player.time_to_first_audio is not None
+        song = self.player.update()
+        if song is not None:
+            self.current_song = song
+            self.now_playing_label.config(text=f"Now Playing: {song.title}")
+            self.show_cover(song)
+            self.start_visualizer(song)
+            self.history.record(PLAY, song, song.mood)
+            self.get_lyrics_and_analyze()
+        elif self.is_playing and self.player.current is None and self.current_song \
+                and self.current_song.file and os.path.isfile(self.current_song.file):
+            self.is_playing = False
+            self.history.record(STOP, self.current_song)
+            self.status_bar.config(text=f"Finished: {self.current_song.title}")
+        
+        if not reported and self.player.time_to_first_audio is not None:
+            ms = self.player.time_to_first_audio * 1000
+            self.status_bar.config(text=f"Playing: {self.player.current.title} "
+                                        f"(audio after {ms:.0f} ms)")
+    
+    def get_lyrics_and_analyze(self):
+        """Get lyrics and analyze mood without blocking the window"""
+        song = self.current_song
+        
+        # Show loading state
+        self.set_lyrics_text("Loading lyrics...")
+        self.mood_label.config(text="Detected Mood: ...")
+        self.keywords_label.config(text="Mood Keywords: ...")
+        self.status_bar.config(text=f"⏳ Loading lyrics for {song.title}...")
+        
+        # A song clicked before this one no longer needs its lyrics
+        if self.lyrics_job is not None:
+            self.lyrics_job.cancel()
+        requested = time.perf_counter()
+        self.lyrics_job = self.worker.submit(
+            self.load_lyrics_and_mood, song,
+            on_done=lambda result: self.show_lyrics_and_mood(song, result, requested),
+            on_error=lambda error: None if isinstance(error, LookupCancelled) else
+            self.show_lyrics_and_mood(song, (None, None, [], None), requested))
+    
+    def load_lyrics_and_mood(self, song, priority=FOREGROUND):
+        """Fetch and analyze lyrics, blended with audio features (runs on a worker thread)
+
+        Foreground loads are dropped (LookupCancelled) once another song is selected.
+        """
+        cancelled = None
+        if priority == FOREGROUND:
+            cancelled = lambda: song is not self.current_song
+        lyrics = self.fetch_lyrics(song.title, song.artist, priority, cancelled)
+        if cancelled is not None and cancelled():
+            raise LookupCancelled(song.title)
+        features = self.track_index.features(song.id) if song.file else None
+        audio = audio_mood_scores(features, mood_engine.DEFAULT_LEXICON.mood_names) \
+            if features else None
+        if not lyrics:
+            if not audio:
+                return None, None, [], None
+            # Instrumental or unknown lyrics: the audio decides on its own
+            return None, max(audio, key=audio.get), [], audio
+        with self.metrics.timer("scoring"):
+            result = self.score_mood(lyrics)
+            mood, keywords = result.analysis()
+            scores = result.scores
+            if audio:
+                scores = blend_scores(result.scores, audio)
+                mood = max(scores, key=scores.get)
+                keywords = result.keywords(mood)
+        return lyrics, mood, keywords, scores
+    
+    def show_lyrics_and_mood(self, song, result, requested=None):
+        """Show lyrics and mood for a song (runs on the Tk thread)"""
+        # Ignore results for a song that is no longer selected
+        if song is not self.current_song:
+            return
+        
+        lyrics, mood, keywords, scores = result
+        if scores:
+            self.mood_index.add(song.id, scores)
+        if mood:
+            self.history.record(MOOD, song, mood)
+        started = time.perf_counter()
+        
+        if lyrics:
+            self.set_lyrics_text(lyrics)
+            
+            # Update mood display
+            self.mood_label.config(text=f"Detected Mood: {mood.upper()}")
+            self.keywords_label.config(text=f"Mood Keywords: {', '.join(keywords[:5])}")
+            
+            self.draw_mood(mood, scores)
+        elif mood:
+            self.set_lyrics_text("Lyrics not available for this song.")
+            self.mood_label.config(text=f"Detected Mood: {mood.upper()} (from audio)")
+            self.keywords_label.config(text="Mood Keywords: None")
+            self.draw_mood(mood, scores)
+        else:
+            self.set_lyrics_text("Lyrics not available for this song.")
+            self.mood_label.config(text="Detected Mood: Unknown")
+            self.keywords_label.config(text="Mood Keywords: None")
+            self.draw_mood(None)
+        
+        if self.is_playing:
+            self.status_bar.config(text=f"Playing: {song.title}")
+        
+        self.root.update_idletasks()
+        finished = time.perf_counter()
+        self.metrics.observe("widget_update", finished - started)
+        if requested is not None:
+            self.metrics.observe("end_to_end", finished - requested)
+    
+    def show_cover(self, song):
+        """Show a song's cover art next to its title (loaded in the background)"""
+        if song is None or not song.file:
+            self.set_cover(None)
+            return
+        image = self.cover_art.get(song.file, lambda image: self.set_cover(image, song))
+        if image is None:
+            self.set_cover(None)  # Until (and unless) the thumbnail arrives
+    
+    def set_cover(self, image, song=None):
+        if song is not None and song is not self.current_song:
+            return
+        if image is None:
+            self.cover_label.pack_forget()
+        else:
+            self.cover_label.config(image=image)
+            self.cover_label.image = image  # Tk drops images nothing references
+            self.cover_label.pack(side=tk.LEFT, padx=(0, 10), before=self.now_playing_label)
+    
+    def rows_shown(self, first, end):
+        """Load the visible rows' cover art once scrolling pauses"""
+        if self.art_job is not None:
+            self.root.after_cancel(self.art_job)
+        self.art_job = self.root.after(ART_PREFETCH_DELAY_MS, self.prefetch_cover_art, first, end)
+    
+    def prefetch_cover_art(self, first, end):
+        self.art_job = None
+        rows = self.song_listbox.items
+        songs = (self.song_list.get(rows[i]) for i in range(first, min(end, len(rows))))
+        self.cover_art.prefetch([song.file for song in songs if song and song.file])
+    
+    def set_lyrics_text(self, text):
+        """Replace the lyrics shown; live mode starts over from this text"""
+        self.lyrics_text.delete(1.0, tk.END)
+        self.lyrics_text.insert(tk.END, text)
+        if self.live_var.get():
+            self.live_mood.reset(text)
+    
+    def toggle_live(self):
+        """Live mode was switched: when on, start from the lyrics shown now"""
+        if self.live_var.get():
+            self.live_mood.reset(self.lyrics_text.get(1.0, "end-1c"))
+            self.live_update()
+    
+    def lyrics_modified(self, event=None):
+        if not self.lyrics_text.edit_modified():
+            return
+        self.lyrics_text.edit_modified(False)
+        if self.live_var.get() and self.live_job is None:
+            # One update per burst of edits (paste, key repeat)
+            self.live_job = self.root.after_idle(self.live_update)
+    
+    def live_update(self):
+        """Rescore the edited lines of the lyrics and show the new mood"""
+        self.live_job = None
+        if not self.live_var.get():
+            return
+        with self.metrics.timer("live_update"):
+            self.live_mood.update(self.lyrics_text.get(1.0, "end-1c"))
+            mood, keywords = self.live_mood.analysis()
+            self.mood_label.config(text=f"Detected Mood: {mood.upper()} (live)")
+            self.keywords_label.config(text=f"Mood Keywords: {', '.join(keywords) or 'None'}")
+            self.draw_mood(mood, self.live_mood.scores)
+    
+    def draw_mood(self, mood, scores=None):
+        """Show the mood (and each mood's share of the scores) in the visualizer"""
+        self.visualizer.set_mood(mood, scores)
+    
+    def playback_position(self):
+        """Seconds into the playing track, or None when nothing is audible"""
+        player = self._player
+        if player is None or player.current is None or player.paused:
+            return None
+        return player.position
+    
+    def start_visualizer(self, song):
+        """Follow a newly started track with the spectrum"""
+        if song is not None and song.file and os.path.isfile(song.file):
+            self.visualizer.load(song.file)
+            self.visualizer.start(self.playback_position)
+        else:
+            self.visualizer.load(None)
+            self.visualizer.stop()
+    
+    def play_mood_playlist(self):
+        """Queue the library's strongest matches for the chosen mood"""
+        mood = self.playlist_mood.get()
+        ids = self.mood_index.playlist(mood, count=PLAYLIST_LENGTH * 2)
+        self.play_playlist(ids, f"🎲 {mood.title()} playlist")
+    
+    def play_similar(self):
+        """Queue songs whose mood is closest to the current one"""
+        song = self.current_song
+        if song is None or song.id not in self.mood_index:
+            self.status_bar.config(text="Play a song with lyrics first to find similar ones")
+            return
+        ids = self.mood_index.similar(song.id, count=PLAYLIST_LENGTH * 2)
+        self.play_playlist([song.id] + ids, f"More like {song.title}")
+    
+    def play_playlist(self, ids, name):
+        """Show a playlist in the song list and start its first song"""
+        # Only songs still in the library (the index may know removed ones)
+        ids = [i for i in ids if self.song_list.get(i) is not None][:PLAYLIST_LENGTH]
+        if not ids:
+            self.status_bar.config(text=f"{name}: no analyzed songs yet, "
+                                        f"try Prefetch Library")
+            return
+        self.song_listbox.set_items(ids)
+        self.song_listbox.select(0)
+        self.play_selected()
+        self.status_bar.config(text=f"{name}: {len(ids)} songs")
+    
+    def toggle_prefetch(self):
+        """Start or cancel fetching lyrics and moods for the whole library"""
+        if self.prefetcher.running:
+            self.prefetcher.cancel()
+            self.prefetch_btn.config(text="⟳ Prefetch Library")
+            self.status_bar.config(text="Prefetch cancelled")
+            return
+        
+        self.prefetch_btn.config(text="✖ Cancel Prefetch")
+        self.status_bar.config(text=f"Prefetching 0/{len(self.song_list)}...")
+        self.prefetcher.start(self.song_list)
+    
+    def prefetch_result(self, song, result):
+        """Remember the mood found for a prefetched song"""
+        lyrics, mood, keywords, scores = result
+        song.mood = mood
+        if scores:
+            self.mood_index.add(song.id, scores)
+    
+    def prefetch_progress(self, done, total, failed):
+        if self.prefetcher.running:
+            self.status_bar.config(text=f"Prefetching {done}/{total}"
+                                        + (f" ({failed} failed)" if failed else "") + "...")
+    
+    def prefetch_finished(self, done, total, failed):
+        self.prefetch_btn.config(text="⟳ Prefetch Library")
+        found = sum(1 for song in self.song_list if song.mood)
+        self.status_bar.config(text=f"✓ Prefetched {total} songs: {found} with lyrics"
+                                    + (f", {failed} failed" if failed else ""))
+    
+    def fetch_lyrics(self, title, artist, priority=FOREGROUND, cancelled=None):
+        """Fetch lyrics from API"""
+        # Cache check (a cached None means the song is known to have no lyrics)
+        cache_key = make_key(title, artist)
+        cached = self.lyrics_cache.get(cache_key)
+        if cached is not MISS:
+            self.metrics.increment("cache_hits")
+            return cached
+        self.metrics.increment("cache_misses")
+        
+        lyrics = self.lyrics_corpus.lookup(title, artist)
+        if lyrics is not None:
+            self.metrics.increment("corpus_hits")
+            return lyrics
+        return self.lookups.run(cache_key, self.download_lyrics, title, artist, cache_key,
+                                priority=priority, cancelled=cancelled)
+    
+    def download_lyrics(self, title, artist, cache_key):
+        """Ask the API for lyrics and cache the answer (one call per song at a time)"""
+        # A lookup for this song may have finished since fetch_lyrics looked
+        cached = self.lyrics_cache.get(cache_key)
+        if cached is not MISS:
+            return cached
+        
+        try:
+            # Try lyrics.ovh API
+            with self.metrics.timer("fetch"):
+                lyrics = self.lyrics_client.get(artist, title)
+        except Exception as e:
+            # Offline or server failing: not cached, so the next play asks again
+            print(f"Lyrics fetch error: {e}")
+            return None
+        
+        if lyrics:
+            # Clean lyrics
+            with self.metrics.timer("cleanup"):
+                lyrics = re.sub(r'\[.*?\]', '', lyrics)  # Remove [Verse], [Chorus]
+            self.lyrics_cache[cache_key] = lyrics
+            return lyrics
+        
+        # The API answered that it has no lyrics for this song
+        self.lyrics_cache.put_missing(cache_key)
+        return None
+    
+    def show_stats(self):
+        """Open (or raise) the live stats panel"""
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        self.stats_window = tk.Toplevel(self.root, bg="#282a36")
+        self.stats_window.title("📊 Moodify Stats")
+        self.stats_label = tk.Label(self.stats_window, font=("Courier", 10), justify=tk.LEFT,
+                                    bg="#282a36", fg="#f8f8f2", anchor=tk.NW)
+        self.stats_label.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.refresh_stats()
+    
+    def show_mood_history(self):
+        """Open (or raise) the mood history chart, drawn from the running aggregates"""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            self.draw_mood_history()
+            return
+        self.history_window = tk.Toplevel(self.root, bg="#282a36")
+        self.history_window.title("📈 My mood over time")
+        self.history_canvas = tk.Canvas(self.history_window, bg="#44475a", width=600,
+                                        height=220, highlightthickness=0)
+        self.history_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.history_canvas.bind("<Configure>", lambda event: self.draw_mood_history())
+        self.history_label = tk.Label(self.history_window, font=("Courier", 10),
+                                      justify=tk.LEFT, bg="#282a36", fg="#f8f8f2", anchor=tk.NW)
+        self.history_label.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.draw_mood_history()
+    
+    def draw_mood_history(self):
+        """Listening time per day, split by mood (one stacked bar per day)"""
+        canvas = self.history_canvas
+        canvas.delete("all")
+        self.history_label.config(text=self.history.stats.report())
+        days = self.history.stats.recent_days(HISTORY_DAYS)
+        width = max(canvas.winfo_width(), 1)
+        height = max(canvas.winfo_height(), 1)
+        if not days:
+            canvas.create_text(width / 2, height / 2, text="Nothing played yet",
+                               fill="#f8f8f2", font=("Arial", 12))
+            return
+        chart = height - 16  # Room for the day labels
+        busiest = max(sum(moods.values()) for _, moods in days) or 1
+        slot = width / len(days)
+        label_every = max(1, len(days) // 8)
+        for i, (day, moods) in enumerate(days):
+            left, right = i * slot + 2, (i + 1) * slot - 2
+            y = chart
+            for mood, seconds in sorted(moods.items()):
+                top = y - seconds / busiest * (chart - 4)
+                canvas.create_rectangle(left, top, right, y, outline="",
+                                        fill=self.mood_colors.get(mood, "#808080"))
+                y = top
+            if i % label_every == 0:
+                canvas.create_text((left + right) / 2, height - 2, text=day[5:], anchor="s",
+                                   fill="#f8f8f2", font=("Arial", 7))
+    
+    def refresh_stats(self):
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.stats_window = None
+            return
+        self.stats_label.config(text=self.metrics.report())
+        self.root.after(STATS_REFRESH_MS, self.refresh_stats)
+    
+    def write_metrics(self):
+        """Rewrite the metrics file in the background, then reschedule"""
+        self.worker.submit(self.metrics.write, self.metrics_path,
+                           on_error=lambda error: print(f"Metrics write failed: {error}"))
+        self.root.after(METRICS_INTERVAL_MS, self.write_metrics)
+    
+    def analyze_mood(self, lyrics):
+        """Simple mood analysis from lyrics"""
+        return self.score_mood(lyrics).analysis()
+    
+    def score_mood(self, lyrics):
+        """Per-mood scores and matched keywords for lyrics (memoized by content)"""
+        return self.mood_cache.score(mood_engine.DEFAULT_LEXICON, lyrics)
+    
+    def analyze_mood_batch(self, lyrics_iterable):
+        """Mood analysis for many lyrics at once (same results as analyze_mood)"""
+        return mood_engine.analyze_mood_batch(lyrics_iterable, mood_engine.DEFAULT_LEXICON)
+    
+    def pause_music(self):
+        """Pause/resume music"""
+        if self.current_song:
+            self.is_playing = not self.is_playing
+            if self.is_playing:
+                if self._player is not None:
+                    self._player.resume()
+                    self.visualizer.start(self.playback_position)
+                self.history.record(RESUME, self.current_song)
+                self.status_bar.config(text=f"Resumed: {self.current_song.title}")
+                self.pause_btn.config(text="⏸ Pause")
+            else:
+                if self._player is not None:
+                    self._player.pause()
+                self.history.record(PAUSE, self.current_song)
+                self.status_bar.config(text=f"Paused: {self.current_song.title}")
+                self.pause_btn.config(text="▶ Resume")
+    
+    def stop_music(self):
+        """Stop music"""
+        if self.current_song:
+            if self.is_playing:
+                self.history.record(STOP, self.current_song)
+            self.is_playing = False
+            if self._player is not None:
+                self._player.stop()
+            self.pause_btn.config(text="⏸ Pause")
+            self.status_bar.config(text=f"Stopped: {self.current_song.title}")
+            self.now_playing_label.config(text="Now Playing: None")
+            self.show_cover(None)
+            self.set_lyrics_text("")
+            self.mood_label.config(text="Detected Mood: --")
+            self.keywords_label.config(text="Mood Keywords: --")
+            self.visualizer.clear()
+    
+    def on_close(self):
+        """Save cache state and close the window"""
+        self.closing = True
+        if self.is_playing and self.current_song:
+            self.history.record(STOP, self.current_song)
+        self.history.close()
+        if self.metrics_path:
+            try:
+                self.metrics.write(self.metrics_path)
+            except OSError as e:
+                print(f"Metrics write failed: {e}")
+        if self._player is not None:
+            self._player.stop()
+            self._player.shutdown()
+        self.prefetcher.cancel()
+        self.prefetch_worker.shutdown()
+        self.cover_art.shutdown()
+        self.visualizer.shutdown()
+        self.worker.shutdown()
+        if self._lyrics_client is not None:
+            self._lyrics_client.close()
+        if self._mood_index is not None:
+            self._mood_index.close()
+        if self.audio_job is not None and not self.audio_job.cancel():
+            # Already running: it sees self.closing and stops writing within a poll interval.
+            # (wait() never returns for a job cancelled while queued, hence cancel() first.)
+            wait([self.audio_job])
+        self.track_index.close()
+        self.lyrics_cache.close()
+        self.lyrics_corpus.close()
+        self.mood_cache.close()
+        self.root.destroy()
+
+def main(argv=None):
+    """Main function"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["analyze"]:
+        # Headless batch mode (also dispatched above the GUI imports when run as a script)
+        import batch_analyze
+        return batch_analyze.main(argv[1:])
+    
+    metrics_path = None
+    if "--metrics" in argv[:-1]:
+        # --metrics FILE: write stage timings/counters every few seconds
+        metrics_path = argv[argv.index("--metrics") + 1]
+    
+    root = tk.Tk()
+    app = MoodifyPlayer(root, metrics_path=metrics_path)
+    
+    if "--startup-time" in argv:
+        # Print import -> first frame as JSON and exit (non-zero over budget)
+        def report():
+            if app.startup_time is None:
+                root.after(10, report)
+                return
+            print(json.dumps({"startup_s": round(app.startup_time, 4),
+                              "budget_s": STARTUP_BUDGET_S}))
+            app.on_close()
+            sys.exit(0 if app.startup_time <= STARTUP_BUDGET_S else 1)
+        root.after(10, report)
+    
+    root.mainloop()
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["analyze"]:
+        # Create necessary directories
+        os.makedirs("songs", exist_ok=True)
+        os.makedirs("lyrics_data", exist_ok=True)
+        os.makedirs("assets", exist_ok=True)
+    
+    # pygame and requests are loaded after the window is up; if they are
+    # missing the status bar says so (run install_and_run.py to add them)
+    sys.exit(main())
\ No newline at end of file
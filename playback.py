@@ -0,0 +1,136 @@
+"""
+PLAYBACK - Streaming playback engine on pygame.mixer.music
+Keeps a play queue and reads the next queued file into memory on a
+background thread, then hands it to SDL_mixer's own queue so the
+switch to the next track has next to no gap.
+"""
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class PlaybackEngine:
+    """Play queue over pygame.mixer.music with next-track preloading"""
+
+    def __init__(self, mixer):
+        self.mixer = mixer              # The pygame.mixer module (initialized)
+        self.queue = deque()            # Tracks still to play
+        self.current = None
+        self.paused = False
+        self.queued_next = None         # Track handed to mixer.music.queue
+        self.last_pos = 0
+        self.preloads = {}              # path -> Future with the file bytes
+        self.preload_pool = ThreadPoolExecutor(max_workers=1,
+                                               thread_name_prefix="moodify-preload")
+        self.clicked_at = None
+        self.time_to_first_audio = None  # Seconds from Play click to audio
+
+    @property
+    def music(self):
+        return self.mixer.music
+
+    @property
+    def position(self):
+        """Seconds into the current track (SDL_mixer restarts its clock per track)"""
+        pos = self.music.get_pos()
+        return pos / 1000 if pos >= 0 else None
+
+    def set_queue(self, tracks):
+        """Replace the tracks that play after the current one"""
+        self.queue = deque(track for track in tracks if track.file)
+        self._arm_next()
+
+    def play(self, track, clicked_at=None):
+        """Start a track now; clicked_at is the perf_counter() of the click"""
+        self.clicked_at = clicked_at or time.perf_counter()
+        self.time_to_first_audio = None
+        self.music.load(*self._source(track.file))
+        self.music.play()
+        self.current = track
+        self.paused = False
+        self.queued_next = None
+        self.last_pos = 0
+        self._arm_next()
+
+    def pause(self):
+        if self.current and not self.paused:
+            self.music.pause()
+            self.paused = True
+
+    def resume(self):
+        if self.current and self.paused:
+            self.music.unpause()
+            self.paused = False
+
+    def stop(self):
+        self.music.stop()
+        self.current = None
+        self.paused = False
+        self.queued_next = None
+
+    def next(self):
+        """Skip to the next queued track (returns it, or None)"""
+        if not self.queue:
+            self.stop()
+            return None
+        track = self.queue.popleft()
+        self.play(track)
+        return track
+
+    def update(self):
+        """Call periodically on the UI thread; returns a track when playback moved on"""
+        if self.current is None or self.paused:
+            return None
+
+        pos = self.music.get_pos()
+        if self.time_to_first_audio is None and pos > 0:
+            # Audio started pos ms before this poll, not at it
+            self.time_to_first_audio = max(0.0, time.perf_counter() - self.clicked_at - pos / 1000)
+
+        if not self.music.get_busy():
+            # Ran out without a pre-armed queue entry
+            self.current = None
+            return self.next()
+
+        if self.queued_next is not None and pos < self.last_pos:
+            # SDL_mixer switched to the queued track and restarted the clock
+            self.current = self.queued_next
+            self.queued_next = None
+            self.last_pos = pos
+            self._arm_next()
+            return self.current
+
+        self.last_pos = pos
+        self._arm_next()
+        return None
+
+    def shutdown(self):
+        self.preload_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _source(self, path):
+        """Arguments for music.load/queue: preloaded bytes if ready, else the path"""
+        future = self.preloads.pop(path, None)
+        if future is not None and future.done() and not future.exception():
+            return io.BytesIO(future.result()), os.path.splitext(path)[1].lstrip('.')
+        return (path,)
+
+    def _arm_next(self):
+        """Preload the next track and queue it in the mixer once it is in memory"""
+        if not self.queue or self.current is None:
+            return
+        track = self.queue[0]
+        future = self.preloads.get(track.file)
+        if future is None:
+            # Only keep the buffer for the upcoming track
+            self.preloads = {track.file: self.preload_pool.submit(read_file, track.file)}
+            return
+        if self.queued_next is None and future.done():
+            self.music.queue(*self._source(track.file))
+            self.queued_next = self.queue.popleft()
@@ -0,0 +1,71 @@
+"""
+PREFETCH - Stream a whole library through fetch -> clean -> analyze
+Keeps at most `concurrency` jobs in flight so huge libraries do not
+flood the thread pool or the lyrics server.
+"""
+
+
+class LibraryPrefetcher:
+    """Feed items to a BackgroundWorker with bounded concurrency"""
+
+    def __init__(self, worker, load, concurrency=4, on_result=None,
+                 on_progress=None, on_finished=None):
+        self.worker = worker
+        self.load = load                # Runs on a worker thread
+        self.concurrency = concurrency
+        self.on_result = on_result      # on_result(item, result) on the Tk thread
+        self.on_progress = on_progress  # on_progress(done, total, failed)
+        self.on_finished = on_finished  # on_finished(done, total, failed)
+        self.items = iter(())
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.running = False
+
+    def start(self, items):
+        """Begin prefetching a list of items"""
+        items = list(items)
+        self.items = iter(items)
+        self.total = len(items)
+        self.done = self.failed = 0
+        self.running = True
+        for _ in range(self.concurrency):
+            self._submit_next()
+        if self.in_flight == 0:
+            self._finish()
+
+    def cancel(self):
+        """Stop handing out new work (jobs already running still finish)"""
+        self.running = False
+        self.items = iter(())
+
+    def _submit_next(self):
+        if not self.running:
+            return
+        item = next(self.items, None)
+        if item is None:
+            return
+        self.in_flight += 1
+        self.worker.submit(self.load, item,
+                           on_done=lambda result: self._completed(item, result),
+                           on_error=lambda error: self._completed(item, error, failed=True))
+
+    def _completed(self, item, result, failed=False):
+        self.in_flight -= 1
+        self.done += 1
+        if failed:
+            self.failed += 1
+        elif self.on_result:
+            self.on_result(item, result)
+        if self.on_progress:
+            self.on_progress(self.done, self.total, self.failed)
+        self._submit_next()
+        if self.in_flight == 0:
+            self._finish()
+
+    def _finish(self):
+        was_running = self.running
+        self.running = False
+        if was_running and self.on_finished:
+            self.on_finished(self.done, self.total, self.failed)
@@ -0,0 +1,65 @@
+"""
+SEARCH - N-gram index over song titles and artists
+A query matches a song when it is a substring of the title or the
+artist, same as the old linear filter, but candidates come from a
+n-gram inverted index and a longer query only re-checks the previous
+results.
+"""
+from array import array
+
+
+def normalize(song):
+    """Searchable text; the newline keeps matches from spanning both fields"""
+    return f"{song.title}\n{song.artist}".lower()
+
+
+class SongSearchIndex:
+    """Inverted n-gram index with incremental narrowing"""
+
+    def __init__(self, songs):
+        self.songs = songs
+        self.texts = [normalize(song) for song in songs]
+        # 1-, 2- and 3-grams: a query of up to 3 characters is answered
+        # straight from its posting list, longer ones are verified
+        postings = {}
+        for i, text in enumerate(self.texts):
+            grams = set(text)
+            for field in text.split("\n"):
+                grams.update(field[j:j + 2] for j in range(len(field) - 1))
+                grams.update(field[j:j + 3] for j in range(len(field) - 2))
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = ids = array('I')
+                ids.append(i)
+        self.postings = postings
+        self.last_query = None
+        self.last_ids = None
+
+    def search(self, query):
+        """Indices of matching songs, in song list order"""
+        query = query.lower()
+        if not query:
+            return range(len(self.texts))
+        if "\n" in query:
+            return []
+        texts = self.texts
+
+        if len(query) <= 3:
+            ids = self.postings.get(query, ())
+        else:
+            if self.last_query is not None and self.last_query in query:
+                # Typing more can only narrow the previous result set
+                candidates = self.last_ids
+            else:
+                grams = {query[j:j + 3] for j in range(len(query) - 2)}
+                lists = [self.postings.get(gram) for gram in grams]
+                candidates = min(lists, key=len) if all(lists) else ()
+            ids = [i for i in candidates if query in texts[i]]
+        self.last_query = query
+        self.last_ids = ids
+        return ids
+
+    def filter(self, query):
+        """Matching songs, in song list order"""
+        return [self.songs[i] for i in self.search(query)]
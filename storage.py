@@ -0,0 +1,65 @@
+"""
+STORAGE - SQLite connections and memory LRUs shared by the data stores
+The caches and indexes under lyrics_data/ are each used from the Tk
+thread and from worker threads. They open their database through
+connect() and guard it with their own lock, and keep hot entries in an
+LRUCache in front of it.
+"""
+import os
+import sqlite3
+from collections import OrderedDict
+
+
+def connect(path, journal_mode="WAL", synchronous="NORMAL"):
+    """SQLite connection usable from any thread
+
+    The caller serializes access with its own lock. The parent folder is
+    created if needed; ':memory:' opens a private in-memory database.
+    WAL lets readers go on while a writer commits; pass None for either
+    pragma to keep SQLite's default.
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    if journal_mode:
+        db.execute(f"PRAGMA journal_mode={journal_mode}")
+    if synchronous:
+        db.execute(f"PRAGMA synchronous={synchronous}")
+    return db
+
+
+class LRUCache:
+    """Mapping bounded to max_entries that drops the least recently used first
+
+    Not thread-safe: callers use it under the same lock as their database.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """The value for key (now the most recent entry), or default"""
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            return default
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self.entries.pop(key, default)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,10 @@
+"""
+Tests run from the repo root with `python -m pytest`. The app modules
+sit at the top level of the repo, so make them importable the way the
+benchmarks do.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
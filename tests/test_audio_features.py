@@ -0,0 +1,52 @@
+"""Audio mood scores only take part when the audio says something"""
+import math
+import struct
+import wave
+
+import pytest
+
+import mood_engine
+from audio_features import audio_features, audio_mood_scores, blend_scores
+
+pytest.importorskip("numpy")
+
+RATE = 22050
+LYRIC_SCORES = {"happy": 0, "sad": 2, "romantic": 1, "energetic": 0, "calm": 0, "angry": 0}
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(b"".join(struct.pack("<h", int(sample * 32767)) for sample in samples))
+    return str(path)
+
+
+def test_silent_track_has_no_audio_mood(tmp_path):
+    features = audio_features(write_wav(tmp_path / "silence.wav", [0.0] * RATE * 3))
+    assert features is not None and features["energy"] == 0
+    assert audio_mood_scores(features) is None
+
+
+def test_audible_track_gives_mood_shares(tmp_path):
+    # Half-second bursts of a bright tone: loud and with a beat
+    samples = [0.5 * math.sin(2 * math.pi * 3000 * i / RATE) if (i // (RATE // 4)) % 2 else 0.0
+               for i in range(RATE * 4)]
+    scores = audio_mood_scores(audio_features(write_wav(tmp_path / "tone.wav", samples)))
+    assert set(scores) == set(mood_engine.MOOD_KEYWORDS)
+    assert sum(scores.values()) == pytest.approx(1.0)
+
+
+def test_moods_without_an_audio_profile():
+    features = {"tempo": 120.0, "energy": 0.2, "brightness": 0.2}
+    assert audio_mood_scores(features, ("nostalgic", "hopeful")) is None
+
+
+def test_zero_audio_scores_leave_lyrics_alone():
+    zeros = dict.fromkeys(LYRIC_SCORES, 0.0)
+    assert blend_scores(LYRIC_SCORES, zeros) == LYRIC_SCORES
+    assert blend_scores(LYRIC_SCORES, None) == LYRIC_SCORES
+    blended = blend_scores(LYRIC_SCORES, dict(zeros, happy=1.0))
+    assert max(blended, key=blended.get) == "sad"
+    assert blended["happy"] > 0
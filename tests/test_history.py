@@ -0,0 +1,111 @@
+"""ListeningHistory: running aggregates stay in step with the log"""
+import pytest
+
+import history
+from history import MOOD, PAUSE, PLAY, RESUME, STOP, ListeningHistory, MoodStats
+from tracks import Track
+
+START = 1_700_000_000.0
+DAY = history.day_of(START)
+SUNNY = Track(1, "Sunny Day", "The Band")
+RAINY = Track(2, "Rainy Night", "Solo Artist")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "history.log"), str(tmp_path / "history_stats.json")
+
+
+def play_session(log, at=START):
+    """Two tracks: one paused midway and retagged, one left running"""
+    log.record(PLAY, SUNNY, "happy", timestamp=at)
+    log.record(PAUSE, SUNNY, timestamp=at + 60)
+    log.record(RESUME, SUNNY, timestamp=at + 100)
+    log.record(MOOD, SUNNY, "calm", timestamp=at + 110)
+    log.record(STOP, SUNNY, timestamp=at + 130)
+    log.record(PLAY, RAINY, "sad", timestamp=at + 200)
+
+
+def test_stats_count_plays_and_listening_time(paths):
+    log = ListeningHistory(*paths)
+    play_session(log)
+    stats = log.stats
+    # 60s before the pause + 30s after resuming; the pause itself is not listening.
+    # Time goes to the mood it was heard under, the play to the final mood
+    assert stats.total_plays == 1
+    assert stats.total_seconds == 90.0
+    assert stats.days == {DAY: {"happy": [0, 60.0], "calm": [1, 30.0]}}
+    assert stats.artists == {"The Band": {"calm": 1}}
+    assert stats.current == ["Solo Artist", "sad", START + 200, DAY]
+
+    # A missed stop is capped rather than counted as hours of listening
+    log.record(PLAY, SUNNY, "happy", timestamp=START + 200 + 5 * 3600)
+    assert stats.days[DAY]["sad"] == [1, history.MAX_SPAN_S]
+    assert stats.top_artists() == [("The Band", 1, [("calm", 1)]),
+                                   ("Solo Artist", 1, [("sad", 1)])]
+    log.close()
+
+
+def test_reopen_replays_only_the_tail(paths, monkeypatch):
+    log = ListeningHistory(*paths)
+    play_session(log)
+    log.close()
+
+    # Events appended after the last save, then a crash before the next save
+    log = ListeningHistory(*paths)
+    log.record(STOP, RAINY, timestamp=START + 260)
+    log.record(PLAY, SUNNY, "happy", timestamp=START + 300)
+    expected = log.stats.to_dict()
+    log.log.close()
+
+    replayed = []
+    apply_line = ListeningHistory._apply_line
+    monkeypatch.setattr(ListeningHistory, "_apply_line",
+                        lambda self, line: replayed.append(line) or apply_line(self, line))
+    reopened = ListeningHistory(*paths)
+    assert len(replayed) == 2
+    assert reopened.stats.to_dict() == expected
+
+    # The aggregates equal a full replay of the log
+    full = MoodStats()
+    with open(paths[0], encoding="utf-8") as f:
+        for line in f:
+            timestamp, event, mood, artist, _ = line.rstrip("\n").split("\t")
+            full.apply(float(timestamp), event, mood, artist)
+    assert reopened.stats.to_dict() == full.to_dict()
+    reopened.close()
+
+
+def test_torn_last_line_is_dropped(paths):
+    log = ListeningHistory(*paths)
+    play_session(log)
+    log.close()
+    with open(paths[0], "ab") as f:
+        f.write(b"1700000400.000\tstop\t\tSolo")
+    size = len(open(paths[0], "rb").read())
+
+    log = ListeningHistory(*paths)
+    assert log.stats.total_plays == 1
+    assert log.offset == size - len(b"1700000400.000\tstop\t\tSolo")
+    log.record(STOP, RAINY, timestamp=START + 260)
+    log.close()
+    lines = open(paths[0], encoding="utf-8").read().split("\n")
+    assert lines[-2].startswith(f"{START + 260:.3f}\tstop")
+    assert ListeningHistory(*paths).stats.total_plays == 2
+
+
+def test_replaced_log_is_rebuilt(paths):
+    log = ListeningHistory(*paths)
+    play_session(log)
+    play_session(log, START + 1000)
+    log.close()
+
+    # A shorter log than the saved offset covers: start again from its first line
+    with open(paths[0], "w", encoding="utf-8", newline="\n") as f:
+        f.write(f"{START:.3f}\tplay\thappy\tThe Band\tSunny Day\n"
+                f"{START + 45:.3f}\tstop\t\tThe Band\tSunny Day\n")
+    log = ListeningHistory(*paths)
+    assert log.stats.total_plays == 1
+    assert log.stats.total_seconds == 45.0
+    assert log.stats.days == {DAY: {"happy": [1, 45.0]}}
+    log.close()
@@ -0,0 +1,148 @@
+"""Compiled .mlex lexicons: build, write, map and score"""
+import os
+
+import pytest
+
+import lexicon
+import mood_engine
+from lexicon import CompiledLexicon, LexiconError
+from mood_engine import MoodLexicon
+
+MOODS = ["happy", "sad"]
+ENTRIES = [
+    ("happy", "happy", 2.0),
+    ("joy", "happy", 1.0),
+    ("smil*", "happy", 1.5),
+    ("broken heart", "sad", 3.0),
+    ("heart", "happy", 0.5),
+    ("cry", "sad", 1.0),
+    ("Don't Go", "sad", 1.0),
+]
+
+TEXTS = [
+    "I'm happy, so happy, smiling with joy",
+    "A broken heart makes me cry\nbroken hearted, heart of gold",
+    "don't go, DON'T GO",
+    "nothing to see here",
+    "",
+]
+
+
+@pytest.fixture
+def compiled_path(tmp_path):
+    path = str(tmp_path / "test.mlex")
+    lexicon.write_lexicon(lexicon.compile_lexicon(MOODS, ENTRIES), path)
+    return path
+
+
+def test_round_trip(compiled_path):
+    compiled = CompiledLexicon.open(compiled_path)
+    assert compiled.moods == MOODS
+    assert compiled.term_count == len(ENTRIES)
+    assert compiled.max_phrase_words == 2
+    assert compiled.stem_lengths == [4]
+    assert not compiled.integral
+    assert compiled.digest == lexicon.source_digest(MOODS, ENTRIES)
+
+    flags, postings = compiled.entry("happy")
+    assert flags == lexicon.HAS_POSTINGS
+    assert postings == ((0, 0, 2.0),)
+    # A phrase head carries its own postings and the look-ahead flag
+    flags, postings = compiled.entry("broken")
+    assert flags == lexicon.STARTS_PHRASE and postings == ()
+    # Ranked within the mood: strongest first, then source order
+    assert compiled.entry("don't go")[1] == ((1, 2, 1.0),)
+    assert compiled.entry("unknown") is None
+    compiled.close()
+
+
+def test_scoring_words_stems_and_phrases(compiled_path):
+    moods = MoodLexicon(path=compiled_path)
+    result = moods.score("Smiling, a broken heart, my heart")
+    assert result.scores == {"happy": 2.0, "sad": 3.0}
+    assert [term for term, _ in result.matches] == ["smiling", "broken heart", "heart"]
+    assert result.offsets("heart") == [28]
+    assert moods.analyze("happy joy joy") == ("happy", ["happy", "joy"])
+    assert moods.analyze("nothing") == ("neutral", [])
+
+
+def test_source_lexicon_recompiles_when_changed(tmp_path):
+    path = str(tmp_path / "words.mlex")
+    first = MoodLexicon({"happy": ["sun"], "sad": ["rain"]}, path)
+    assert first.analyze("rain rain sun") == ("sad", ["rain"])
+
+    # Same file, new words: the stale compiled file is replaced
+    second = MoodLexicon({"happy": ["sun", "rain"], "sad": ["tears"]}, path)
+    assert second.analyze("rain rain sun") == ("happy", ["sun", "rain"])
+    assert second.version != first.version
+    assert CompiledLexicon.open(path).version == second.version
+
+
+def test_corrupt_file_is_rejected(tmp_path):
+    path = tmp_path / "bad.mlex"
+    path.write_bytes(b"MOODLEX9" + bytes(100))
+    with pytest.raises(LexiconError):
+        CompiledLexicon.open(str(path))
+    with pytest.raises(LexiconError):
+        lexicon.compile_lexicon(["happy"], [("sun", "sad", 1.0)])
+
+
+def test_read_tsv_source(tmp_path):
+    path = tmp_path / "source.tsv"
+    path.write_text("# term\tmood\tweight\nsunny\thappy\t2\nrain\tsad\n\nbroken heart\tsad\t1.5\n",
+                    encoding="utf-8")
+    moods, entries = lexicon.read_source(str(path))
+    assert moods == ["happy", "sad"]
+    assert entries == [("sunny", "happy", 2.0), ("rain", "sad", 1.0),
+                       ("broken heart", "sad", 1.5)]
+
+
+def test_build_builtin_writes_to_directory(tmp_path):
+    paths = lexicon.build_builtin(str(tmp_path))
+    assert sorted(map(os.path.basename, paths)) == ["default.mlex", "minimal.mlex",
+                                                    "simple.mlex"]
+    for path in paths:
+        assert path.startswith(str(tmp_path))
+        assert CompiledLexicon.open(path).moods
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_score_batch_matches_score(compiled_path, monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(mood_engine, "load_numpy", lambda: False)
+    for moods in (MoodLexicon(path=compiled_path), mood_engine.DEFAULT_LEXICON):
+        texts = TEXTS * 3
+        batched = list(moods.score_batch(texts, chunk_size=4))
+        for text, (mood, keywords, scores) in zip(texts, batched):
+            result = moods.score(text)
+            assert scores == pytest.approx(result.scores)
+            assert (mood, keywords) == result.analysis()
+
+
+WORD_TEXTS = [
+    "Don't go, 'go' and go' - GO'S gone; rock'n'roll",
+    "café joy, naïve JOY!! İstanbul joy2 2joy joy",
+    "''joy'' joy''s o'clock 4ever 4 ever",
+    "\n\njoy\n",
+    "!!! ...",
+    "",
+]
+
+
+@pytest.mark.parametrize("collide", [False, True])
+def test_score_batch_words_match_tokenizer(tmp_path, monkeypatch, collide):
+    pytest.importorskip("numpy")
+    if collide:
+        # Every word hashes alike: the lexicon is scored through the tokenizer instead
+        monkeypatch.setattr(mood_engine, "word_hash", lambda word: 7)
+    moods = MoodLexicon({"happy": ["joy", "go's", "rock'n'roll", "4ever", "joy2"],
+                         "sad": ["go", "don't", "o'clock", "gone", "4"]},
+                        str(tmp_path / "words.mlex"))
+    batched = list(moods.score_batch(WORD_TEXTS * 2, chunk_size=5))
+    assert (moods._words is False) == collide
+    for text, (mood, keywords, scores) in zip(WORD_TEXTS * 2, batched):
+        result = moods.score(text)
+        assert scores == result.scores
+        assert (mood, keywords) == result.analysis()
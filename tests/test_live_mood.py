@@ -0,0 +1,75 @@
+"""LiveMood: incremental rescoring gives the same answer as a full pass"""
+import mood_engine
+from mood_engine import LiveMood
+
+LYRICS = """I'm happy today, the sun is shining
+Love is in the air, everything's fine
+Tears fall, I cry alone in the rain
+Dance all night, move your body
+Quiet and calm, a gentle dream"""
+
+
+def full_pass(lexicon, text):
+    result = lexicon.score(text)
+    return result.scores, result.analysis()
+
+
+def check(live, text):
+    assert (live.scores, live.analysis()) == full_pass(live.lexicon, text)
+
+
+def test_reset_scores_whole_text():
+    live = LiveMood()
+    assert live.reset(LYRICS) == 5
+    check(live, LYRICS)
+
+
+def test_editing_one_line_rescans_only_that_line():
+    live = LiveMood()
+    live.reset(LYRICS)
+    lines = LYRICS.split("\n")
+    lines[2] = "Tears fall, I cry alone, so sad and lonely"
+    text = "\n".join(lines)
+    assert live.update(text) == 1
+    check(live, text)
+
+
+def test_typing_inserting_and_deleting_lines():
+    live = LiveMood()
+    text = ""
+    # Type the lyrics one character at a time
+    for char in LYRICS:
+        text += char
+        live.update(text)
+    check(live, text)
+
+    lines = text.split("\n")
+    lines.insert(1, "hate and rage, fight the war")
+    text = "\n".join(lines)
+    assert live.update(text) == 1
+    check(live, text)
+
+    del lines[3:5]
+    text = "\n".join(lines)
+    assert live.update(text) == 0
+    check(live, text)
+
+    assert live.update(text) == 0
+    check(live, text)
+
+
+def test_clearing_is_neutral():
+    live = LiveMood()
+    live.reset(LYRICS)
+    live.update("")
+    assert live.analysis() == ("neutral", [])
+    assert not any(live.scores.values())
+    assert not live.terms
+
+
+def test_other_lexicons():
+    live = LiveMood(mood_engine.SIMPLE_LEXICON)
+    live.reset("happy happy\nsad")
+    live.update("happy happy\nsad\ncry pain hurt")
+    assert live.analysis() == ("sad", ["sad", "cry", "pain", "hurt"])
+    check(live, "happy happy\nsad\ncry pain hurt")
@@ -0,0 +1,151 @@
+"""LookupScheduler: coalescing, foreground priority and cancellation"""
+import threading
+import time
+
+import pytest
+
+from lookups import BACKGROUND, FOREGROUND, LookupCancelled, LookupScheduler
+from metrics import Metrics
+
+TIMEOUT = 5
+
+
+class Lookup:
+    """A lookup that blocks until released and records each call"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        return value
+
+
+def start(scheduler, key, func, *args, **kwargs):
+    """Run a lookup on a thread; returns (thread, outcome dict)"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = scheduler.run(key, func, *args, **kwargs)
+        except Exception as error:
+            outcome["error"] = error
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def scheduler():
+    return LookupScheduler(metrics=Metrics())
+
+
+def counters(scheduler):
+    return scheduler.metrics.snapshot()["counters"]
+
+
+def test_concurrent_requests_share_one_lookup(scheduler):
+    lookup = Lookup()
+    first, first_outcome = start(scheduler, "song", lookup, "lyrics")
+    assert lookup.started.wait(TIMEOUT)
+    second, second_outcome = start(scheduler, "song", lookup, "other")
+    wait_until(lambda: scheduler.in_flight["song"].waiters == 1)
+
+    lookup.release.set()
+    first.join(TIMEOUT)
+    second.join(TIMEOUT)
+    assert first_outcome == second_outcome == {"result": "lyrics"}
+    assert lookup.calls == 1
+    assert counters(scheduler) == {"lookups_coalesced": 1}
+    assert not scheduler.in_flight
+
+
+def test_errors_reach_every_waiter(scheduler):
+    release = threading.Event()
+
+    def failing():
+        assert release.wait(TIMEOUT)
+        raise OSError("offline")
+
+    first, first_outcome = start(scheduler, "song", failing)
+    wait_until(lambda: "song" in scheduler.in_flight)
+    second, second_outcome = start(scheduler, "song", failing)
+    wait_until(lambda: scheduler.in_flight["song"].waiters == 1)
+    release.set()
+    first.join(TIMEOUT)
+    second.join(TIMEOUT)
+    assert isinstance(first_outcome["error"], OSError)
+    assert second_outcome["error"] is first_outcome["error"]
+
+
+def test_background_waits_for_foreground(scheduler):
+    foreground = Lookup()
+    background = Lookup()
+    background.release.set()
+    fg_thread, _ = start(scheduler, "clicked", foreground, "a")
+    assert foreground.started.wait(TIMEOUT)
+    bg_thread, bg_outcome = start(scheduler, "prefetch", background, "b", priority=BACKGROUND)
+    wait_until(lambda: "prefetch" in scheduler.in_flight)
+    assert not background.started.wait(0.1)
+
+    foreground.release.set()
+    bg_thread.join(TIMEOUT)
+    assert bg_outcome == {"result": "b"}
+    fg_thread.join(TIMEOUT)
+
+
+def test_foreground_request_promotes_waiting_background_lookup(scheduler):
+    foreground = Lookup()
+    background = Lookup()
+    background.release.set()
+    start(scheduler, "clicked", foreground, "a")
+    assert foreground.started.wait(TIMEOUT)
+    start(scheduler, "next song", background, "b", priority=BACKGROUND)
+    wait_until(lambda: "next song" in scheduler.in_flight)
+    assert not background.started.is_set()
+
+    # The user picks the song being prefetched: it must not wait any longer
+    thread, outcome = start(scheduler, "next song", background, "b", priority=FOREGROUND)
+    assert background.started.wait(TIMEOUT)
+    thread.join(TIMEOUT)
+    assert outcome == {"result": "b"}
+    assert background.calls == 1
+    foreground.release.set()
+
+
+def test_cancelled_before_start(scheduler):
+    lookup = Lookup()
+    with pytest.raises(LookupCancelled):
+        scheduler.run("song", lookup, "x", cancelled=lambda: True)
+    assert lookup.calls == 0
+    assert counters(scheduler) == {"lookups_cancelled": 1}
+
+
+def test_superseded_background_lookup_is_dropped(scheduler):
+    foreground = Lookup()
+    background = Lookup()
+    superseded = threading.Event()
+    start(scheduler, "clicked", foreground, "a")
+    assert foreground.started.wait(TIMEOUT)
+    thread, outcome = start(scheduler, "old", background, "b", priority=BACKGROUND,
+                            cancelled=superseded.is_set)
+    wait_until(lambda: "old" in scheduler.in_flight)
+
+    superseded.set()
+    foreground.release.set()
+    thread.join(TIMEOUT)
+    assert isinstance(outcome["error"], LookupCancelled)
+    assert background.calls == 0
+    assert not scheduler.in_flight
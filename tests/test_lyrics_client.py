@@ -0,0 +1,67 @@
+"""LyricsClient against the local lyrics.ovh stand-in"""
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from lyrics_client import LyricsClient
+from lyrics_stub_server import StubLyricsServer
+from metrics import Metrics
+
+
+@pytest.fixture
+def server():
+    with StubLyricsServer(generate=False, seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    client = LyricsClient(base_url=server.url, metrics=Metrics())
+    yield client
+    client.close()
+
+
+def counters(client):
+    return client.metrics.snapshot()["counters"]
+
+
+def test_hit_returns_lyrics(client):
+    lyrics = client.get("Queen", "Bohemian Rhapsody")
+    assert lyrics.startswith("Is this the real life?")
+    assert counters(client) == {"http_requests": 1}
+
+
+def test_not_found_is_none(client):
+    assert client.get("Nobody", "No Such Song") is None
+    assert counters(client) == {"http_requests": 1, "http_not_found": 1}
+
+
+def test_server_error_raises(server, client):
+    server.error_rate = 1.0
+    with pytest.raises(requests.HTTPError) as error:
+        client.get("Queen", "Bohemian Rhapsody")
+    assert error.value.response.status_code == 500
+    assert counters(client) == {"http_requests": 1, "http_errors": 1}
+
+
+def test_connection_refused_raises(server):
+    url = server.url
+    server.stop()
+    client = LyricsClient(base_url=url, timeout=2, metrics=Metrics())
+    with pytest.raises(requests.ConnectionError):
+        client.get("Queen", "Bohemian Rhapsody")
+    assert counters(client)["http_errors"] == 1
+    client.close()
+
+
+def test_keep_alive_reuses_one_connection(server, client):
+    before = server.connections
+    for i in range(20):
+        client.get("Pharrell Williams", "Happy")
+    assert server.requests == 20
+    assert server.connections - before == 1
+
+
+def test_special_characters_are_quoted(server, client):
+    server.lyrics[("ac/dc", "what's up?")] = "riff"
+    assert client.get("AC/DC", "What's Up?") == "riff"
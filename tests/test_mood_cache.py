@@ -0,0 +1,99 @@
+"""MoodCache: analysis memoized by lyrics content and lexicon version"""
+import pytest
+
+import mood_engine
+from metrics import Metrics
+from mood_cache import MoodCache
+from mood_engine import MoodLexicon
+from storage import LRUCache
+
+LYRICS = "I'm so happy, joy and sunshine\nbut tears fall, I cry alone"
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "mood_cache.sqlite3")
+
+
+def counters(cache):
+    return cache.metrics.snapshot()["counters"]
+
+
+def test_hit_matches_fresh_analysis(cache_path):
+    cache = MoodCache(cache_path, metrics=Metrics())
+    lexicon = mood_engine.DEFAULT_LEXICON
+    first = cache.score(lexicon, LYRICS)
+    again = cache.score(lexicon, LYRICS)
+
+    fresh = lexicon.score(LYRICS)
+    assert first.scores == again.scores == fresh.scores
+    assert first.analysis() == again.analysis() == fresh.analysis()
+    assert cache.analyze(lexicon, LYRICS) == mood_engine.analyze_mood(LYRICS)
+    assert counters(cache) == {"mood_cache_misses": 1, "mood_cache_hits": 2}
+    cache.close()
+
+
+def test_case_and_spacing_share_an_entry(cache_path):
+    cache = MoodCache(cache_path, metrics=Metrics())
+    cache.score(mood_engine.DEFAULT_LEXICON, LYRICS)
+    cache.score(mood_engine.DEFAULT_LEXICON, "  " + LYRICS.upper().replace(" ", "\t "))
+    assert counters(cache) == {"mood_cache_misses": 1, "mood_cache_hits": 1}
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_lexicons_are_cached_separately(cache_path):
+    cache = MoodCache(cache_path)
+    full = cache.analyze(mood_engine.DEFAULT_LEXICON, LYRICS)
+    simple = cache.analyze(mood_engine.SIMPLE_LEXICON, LYRICS)
+    assert full == mood_engine.DEFAULT_LEXICON.analyze(LYRICS)
+    assert simple == mood_engine.SIMPLE_LEXICON.analyze(LYRICS)
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_survives_restart(cache_path):
+    cache = MoodCache(cache_path)
+    expected = cache.analyze(mood_engine.DEFAULT_LEXICON, LYRICS)
+    cache.close()
+
+    reopened = MoodCache(cache_path, metrics=Metrics())
+    assert reopened.analyze(mood_engine.DEFAULT_LEXICON, LYRICS) == expected
+    assert counters(reopened) == {"mood_cache_hits": 1}
+    reopened.close()
+
+
+def test_new_lexicon_version_drops_stale_results(cache_path, tmp_path):
+    lexicon_path = str(tmp_path / "words.mlex")
+    cache = MoodCache(cache_path, metrics=Metrics())
+    old = MoodLexicon({"happy": ["sun"], "sad": ["rain"]}, lexicon_path)
+    assert cache.analyze(old, "rain rain sun") == ("sad", ["rain"])
+    cache.close()
+
+    # Same lexicon file, different words: a new version
+    cache = MoodCache(cache_path, metrics=Metrics())
+    new = MoodLexicon({"happy": ["sun", "rain"], "sad": ["tears"]}, lexicon_path)
+    assert cache.analyze(new, "rain rain sun") == ("happy", ["sun", "rain"])
+    assert counters(cache) == {"mood_cache_misses": 1}
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_rows_are_bounded(cache_path):
+    cache = MoodCache(cache_path, max_entries=5, memory_entries=2)
+    for i in range(12):
+        cache.score(mood_engine.DEFAULT_LEXICON, f"song {i} happy")
+    assert len(cache) == 5
+    assert len(cache.memory) == 2
+    cache.close()
+
+
+def test_lru_cache_order():
+    lru = LRUCache(2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # "a" is now the most recent
+    lru.put("c", 3)
+    assert "b" not in lru and "a" in lru and "c" in lru
+    assert lru.get("b", "missing") == "missing"
+    assert lru.pop("a") == 1 and len(lru) == 1
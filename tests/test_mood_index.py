@@ -0,0 +1,94 @@
+"""MoodIndex vectors stay attached to the files they were computed for"""
+import os
+import sqlite3
+
+import pytest
+
+import library
+from library import TrackIndex
+from mood_index import MoodIndex
+
+MOODS = ("happy", "sad")
+
+
+@pytest.fixture
+def folder(tmp_path):
+    songs = tmp_path / "songs"
+    songs.mkdir()
+    return tmp_path
+
+
+def add_song(folder, name):
+    (folder / "songs" / name).write_bytes(b"")
+
+
+def ids_by_title(index):
+    return {track.title: track.id for track in index.tracks()}
+
+
+def open_indexes(folder):
+    tracks = TrackIndex(str(folder / "tracks.sqlite3"))
+    moods = MoodIndex(MOODS, str(folder / "moods.sqlite3"), generation=tracks.generation)
+    return tracks, moods
+
+
+def test_new_file_never_inherits_a_removed_tracks_vector(folder):
+    tracks, moods = open_indexes(folder)
+    add_song(folder, "Band - Sunny.mp3")
+    add_song(folder, "Band - Gloomy.mp3")
+    tracks.scan(str(folder / "songs"), on_removed=moods.remove)
+    ids = ids_by_title(tracks)
+    moods.add(ids["Sunny"], {"happy": 3})
+    moods.add(ids["Gloomy"], {"sad": 5})  # The newest row: its ID would be handed out next
+
+    os.remove(folder / "songs" / "Band - Gloomy.mp3")
+    assert tracks.scan(str(folder / "songs"), on_removed=moods.remove) == (0, 1, 1)
+    assert ids["Gloomy"] not in moods
+    assert moods.playlist("sad") == []
+
+    add_song(folder, "Band - Brand New.mp3")
+    tracks.scan(str(folder / "songs"), on_removed=moods.remove)
+    new_id = ids_by_title(tracks)["Brand New"]
+    assert new_id != ids["Gloomy"]
+    assert new_id not in moods
+    assert moods.playlist("happy") == [ids["Sunny"]]
+    moods.close()
+    tracks.close()
+
+    # Nothing of the removed track comes back from disk either
+    tracks, moods = open_indexes(folder)
+    assert len(moods) == 1 and moods.vector(ids["Sunny"]) == (3.0, 0.0)
+    assert ids["Gloomy"] not in moods and new_id not in moods
+    moods.close()
+    tracks.close()
+
+
+def test_rebuilt_track_index_drops_all_vectors(folder):
+    tracks, moods = open_indexes(folder)
+    add_song(folder, "Band - Sunny.mp3")
+    tracks.scan(str(folder / "songs"))
+    moods.add(ids_by_title(tracks)["Sunny"], {"happy": 3})
+    moods.close()
+    tracks.close()
+
+    # An index written by an older layout is rebuilt and numbers its tracks from 1 again
+    db = sqlite3.connect(str(folder / "tracks.sqlite3"))
+    db.execute(f"PRAGMA user_version = {library.SCHEMA_VERSION - 1}")
+    db.close()
+    tracks, moods = open_indexes(folder)
+    assert len(moods) == 0
+    tracks.scan(str(folder / "songs"))
+    assert ids_by_title(tracks)["Sunny"] not in moods
+    moods.close()
+    tracks.close()
+
+
+def test_remove_keeps_the_other_vectors(tmp_path):
+    moods = MoodIndex(MOODS, str(tmp_path / "moods.sqlite3"))
+    for track_id in range(1, 6):
+        moods.add(track_id, {"happy": track_id, "sad": 10 - track_id})
+    moods.remove([2, 5, 42])
+    assert sorted(moods.rows) == [1, 3, 4]
+    for track_id in (1, 3, 4):
+        assert moods.vector(track_id) == (track_id, 10 - track_id)
+    assert moods.similar(4) == [3, 1]
@@ -0,0 +1,78 @@
+"""`moodify --startup-time` reports import -> first frame against the budget"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+import harness
+
+
+class MappedTk(harness.FakeTk):
+    """Fake root that maps its window when mainloop starts and runs after() jobs"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bindings = {}
+
+    def bind(self, sequence, func=None, add=None):
+        self.bindings.setdefault(sequence, []).append(func)
+
+    def mainloop(self):
+        for func in self.bindings.get("<Map>", []):
+            func(None)
+        for _ in range(1000):
+            self.run_pending()
+        raise AssertionError("--startup-time never exited")
+
+
+@pytest.fixture
+def fake_moodify(monkeypatch, tmp_path):
+    """moodify imported against the stand-in tkinter, running in a temp folder"""
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules)
+             if name == "moodify" or name.split(".")[0] in ("tkinter", "virtual_list", "cover_art")}
+    harness.install_fake_tk()
+    sys.modules["tkinter"].Tk = MappedTk
+    monkeypatch.chdir(tmp_path)
+    import moodify
+    yield moodify
+    for name in list(sys.modules):
+        if name == "moodify" or name.split(".")[0] in ("tkinter", "virtual_list", "cover_art"):
+            del sys.modules[name]
+    sys.modules.update(saved)
+
+
+def test_startup_time_report(fake_moodify, capsys):
+    with pytest.raises(SystemExit) as exit:
+        fake_moodify.main(["--startup-time"])
+    report = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+    assert set(report) == {"startup_s", "budget_s"}
+    assert report["budget_s"] == fake_moodify.STARTUP_BUDGET_S
+    assert 0 < report["startup_s"] <= fake_moodify.STARTUP_BUDGET_S
+    assert exit.value.code == 0
+
+
+def test_startup_over_budget_exits_non_zero(fake_moodify, monkeypatch, capsys):
+    monkeypatch.setattr(fake_moodify, "STARTUP_BUDGET_S", 0.0)
+    with pytest.raises(SystemExit) as exit:
+        fake_moodify.main(["--startup-time"])
+    report = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+    assert report["startup_s"] > report["budget_s"] == 0.0
+    assert exit.value.code == 1
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs a display (e.g. xvfb-run)")
+def test_startup_time_real_tk(tmp_path):
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "moodify.py"), "--startup-time"],
+                             cwd=tmp_path, capture_output=True, text=True, timeout=60,
+                             env=dict(os.environ, PYTHONPATH=ROOT))
+    report = json.loads(process.stdout.strip().splitlines()[-1])
+
+    assert report["budget_s"] > 0
+    assert process.returncode == (0 if report["startup_s"] <= report["budget_s"] else 1)
@@ -0,0 +1,77 @@
+"""TrackStream keeps a few seconds of a track around the playback position"""
+import time
+import wave
+
+import pytest
+
+import visualizer
+from visualizer import TrackStream
+
+np = pytest.importorskip("numpy")
+
+RATE = 48000        # Decimated by 2 for the display
+SECONDS = 60
+
+
+@pytest.fixture
+def long_track(tmp_path):
+    """A WAV whose every sample encodes its own time, so frames can be checked"""
+    samples = (np.arange(RATE * SECONDS) % 30000).astype(np.int16)
+    path = str(tmp_path / "mix.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.tobytes())
+    return path, samples.astype(np.float32) / 32768.0
+
+
+def wait_for_frame(stream, position, size=256):
+    deadline = time.monotonic() + 5
+    while True:
+        frame = stream.frame(position, size)
+        if frame is not None or time.monotonic() > deadline:
+            return frame
+        time.sleep(0.005)
+
+
+def buffered(stream):
+    with stream.changed:
+        return sum(len(samples) for _, samples in stream.chunks)
+
+
+def test_frames_follow_playback_with_bounded_memory(long_track):
+    path, samples = long_track
+    expected = samples.reshape(-1, 2).mean(axis=1)
+    stream = TrackStream(path)
+    try:
+        limit = 0
+        for position in (0.0, 5.0, 12.5, 30.0, 47.25, 59.0):
+            rate, frame = wait_for_frame(stream, position)
+            assert rate == RATE // 2
+            start = int(position * rate)
+            assert np.allclose(frame, expected[start:start + 256])
+            time.sleep(0.05)  # Let the decoder catch up and drop what was played
+            limit = max(limit, buffered(stream))
+        # Never more than the look-ahead, the kept tail and a chunk either side
+        chunk = 65536 // 2
+        assert limit <= (visualizer.LOOKAHEAD_S + visualizer.KEEP_S) * RATE // 2 + 2 * chunk
+        assert limit < len(expected) / 2
+    finally:
+        stream.stop()
+    stream.thread.join(5)
+    assert not stream.thread.is_alive()
+
+
+def test_stopped_stream_and_missing_audio(long_track, tmp_path):
+    path, _ = long_track
+    stream = TrackStream(path)
+    wait_for_frame(stream, 0.0)
+    assert stream.frame(SECONDS + 1, 256) is None
+    stream.stop()
+    stream.thread.join(5)
+    assert not stream.thread.is_alive()
+
+    missing = TrackStream(str(tmp_path / "missing.wav"))
+    missing.thread.join(5)
+    assert missing.frame(0.0, 256) is None
@@ -0,0 +1,42 @@
+"""
+TRACKS - Compact track records with stable integer IDs
+"""
+import sys
+from array import array
+
+
+class Track:
+    """One song in the library (slots keep 100k tracks small)"""
+    __slots__ = ('id', 'title', 'artist', 'file', 'duration', 'mood')
+
+    def __init__(self, id, title, artist, file=None, duration=0.0, mood=None):
+        self.id = id
+        self.title = title
+        self.artist = sys.intern(artist)  # Artists repeat across many tracks
+        self.file = file
+        self.duration = duration
+        self.mood = mood
+
+    def __repr__(self):
+        return f"Track({self.id}, {self.title!r}, {self.artist!r})"
+
+
+class TrackList:
+    """Ordered tracks plus an id -> track map for O(1) lookups"""
+
+    def __init__(self, tracks=()):
+        self.tracks = list(tracks)
+        self.ids = array('q', [track.id for track in self.tracks])
+        self.by_id = {track.id: track for track in self.tracks}
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __iter__(self):
+        return iter(self.tracks)
+
+    def __getitem__(self, index):
+        return self.tracks[index]
+
+    def get(self, track_id):
+        return self.by_id.get(track_id)
@@ -0,0 +1,147 @@
+"""
+VIRTUAL LIST - Listbox that only materializes the rows in view
+The items are any sequence (a list of songs, an index array...); only
+the visible window is rendered into the underlying tk.Listbox, so
+showing, filtering or sorting 100k items costs the same as 20.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class IndexView:
+    """Read-only view of items[ids[i]], so filters can swap index arrays"""
+    __slots__ = ('items', 'ids')
+
+    def __init__(self, items, ids):
+        self.items = items
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return self.items[self.ids[i]]
+
+
+class VirtualListbox(tk.Frame):
+    """Scrollable list view over a sequence, rendering visible rows only"""
+
+    def __init__(self, master, render=str, font=("Arial", 10), on_redraw=None,
+                 **listbox_options):
+        bg = listbox_options.get("bg", master.cget("bg"))
+        super().__init__(master, bg=bg)
+        self.render = render     # item -> row text
+        self.on_redraw = on_redraw  # on_redraw(first, end) after the visible rows change
+        self.items = []
+        self.top = 0             # Index of the first visible item
+        self.rows = 20           # Visible rows, updated on resize
+        self.selected = None     # Index of the selected item
+        self.line_height = tkfont.Font(font=font).metrics("linespace") + 1
+
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(self, font=font, selectmode=tk.SINGLE,
+                                  exportselection=False, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(3))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self._move_selection(-self.rows))
+        self.listbox.bind("<Next>", lambda e: self._move_selection(self.rows))
+
+    def set_items(self, items):
+        """Show a new sequence (no per-item widget work)"""
+        self.items = items
+        self.top = 0
+        self.selected = None
+        self.redraw()
+
+    def __len__(self):
+        return len(self.items)
+
+    def curselection(self):
+        """Selected item index, as a tuple like tk.Listbox"""
+        return () if self.selected is None else (self.selected,)
+
+    def get(self, index):
+        """Row text of an item"""
+        return self.render(self.items[index])
+
+    def selected_item(self):
+        return None if self.selected is None else self.items[self.selected]
+
+    def select(self, index):
+        """Select an item and scroll it into view"""
+        self.selected = index
+        self.see(index)
+
+    def see(self, index):
+        """Scroll so an item is visible"""
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.rows:
+            self.top = index - self.rows + 1
+        self.redraw()
+
+    def scroll(self, amount):
+        self.top = max(0, min(self.top + amount, max(0, len(self.items) - self.rows)))
+        self.redraw()
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command"""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.items))
+            self.scroll(0)
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def redraw(self):
+        """Render only the visible window of items"""
+        count = len(self.items)
+        self.top = max(0, min(self.top, max(0, count - self.rows)))
+        end = min(count, self.top + self.rows)
+
+        self.listbox.delete(0, tk.END)
+        if end > self.top:
+            render = self.render
+            items = self.items
+            self.listbox.insert(tk.END, *[render(items[i]) for i in range(self.top, end)])
+
+        if self.selected is not None and self.top <= self.selected < end:
+            self.listbox.selection_set(self.selected - self.top)
+        if count:
+            self.scrollbar.set(self.top / count, end / count)
+        else:
+            self.scrollbar.set(0, 1)
+        if self.on_redraw:
+            self.on_redraw(self.top, end)
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.redraw()
+
+    def _on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.top + selection[0]
+
+    def _on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _move_selection(self, step):
+        if not self.items:
+            return "break"
+        current = self.selected if self.selected is not None else self.top - (1 if step > 0 else 0)
+        self.selected = max(0, min(len(self.items) - 1, current + step))
+        self.see(self.selected)
+        self.listbox.event_generate("<<ListboxSelect>>")
+        return "break"
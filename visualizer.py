@@ -0,0 +1,270 @@
+"""
+VISUALIZER - Live spectrum and mood bars for the playing track
+The track is decoded on its own thread, a few seconds ahead of the
+playback position, and only that window of samples is kept, so a long
+mix or audiobook costs no more memory than a song. Each frame takes the
+FFT of the samples at the playback position, folds it into log-spaced
+bands and moves the canvas items that are already there: nothing is
+created or deleted while playing, and only bars whose height changed
+are touched. A frame that runs long pushes the next one back, so
+drawing never crowds out clicks and key presses.
+"""
+import threading
+import time
+from collections import deque
+
+import mood_engine
+from audio_features import iter_pcm
+from metrics import NULL_METRICS
+
+FRAME_MS = 33            # ~30 frames per second
+FRAME_BUDGET_MS = 8      # Frames slower than this delay the next one
+FFT_SIZE = 2048
+BANDS = 32
+MIN_FREQ = 40.0
+MAX_FREQ = 16000.0
+FLOOR_DB = -60.0         # Band level drawn as an empty bar
+DECAY = 0.85             # Share of last frame's level kept when a band falls
+MAX_RATE = 24000         # Decoded audio is decimated to at most this rate
+LOOKAHEAD_S = 8.0        # Audio decoded ahead of the playback position
+KEEP_S = 1.0             # Audio kept behind it
+
+# Fraction of the canvas height used by the spectrum; mood bars get the rest
+SPECTRUM_SHARE = 0.6
+
+
+class TrackStream:
+    """A track decoded on its own thread, kept only around the playback position
+
+    The decoder runs at most LOOKAHEAD_S ahead of the last position asked
+    for and drops samples more than KEEP_S behind it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rate = None         # Sample rate after decimation, once known
+        self.chunks = deque()    # (index of the first sample, mono float32 samples)
+        self.wanted = 0.0        # Last playback position asked for (s)
+        self.stopped = False
+        self.changed = threading.Condition()
+        self.thread = threading.Thread(target=self._decode, name="moodify-visualizer",
+                                       daemon=True)
+        self.thread.start()
+
+    def frame(self, position, size):
+        """(rate, `size` samples from position in seconds), or None if not decoded"""
+        with self.changed:
+            self.wanted = position
+            self.changed.notify()
+            if self.rate is None:
+                return None
+            start = int(position * self.rate)
+            pieces = []
+            for first, samples in self.chunks:
+                if first + len(samples) <= start:
+                    continue
+                if first >= start + size or (not pieces and first > start):
+                    break
+                pieces.append(samples[max(0, start - first):start + size - first])
+            rate = self.rate
+        if not pieces:
+            return None
+        frame = pieces[0] if len(pieces) == 1 else mood_engine.np.concatenate(pieces)
+        return (rate, frame) if len(frame) == size else None
+
+    def stop(self):
+        with self.changed:
+            self.stopped = True
+            self.changed.notify()
+
+    def _decode(self):
+        if not mood_engine.load_numpy():
+            return
+        np = mood_engine.np
+        pcm = iter_pcm(self.path)
+        step = None
+        carry = np.zeros(0, dtype=np.float32)
+        decoded = 0
+        try:
+            for rate, samples in pcm:
+                if step is None:
+                    step = rate // MAX_RATE + (rate % MAX_RATE > 0)
+                    with self.changed:
+                        self.rate = rate // step
+                if step > 1:
+                    # Averaging neighbours is enough anti-aliasing for a display
+                    samples = np.concatenate((carry, samples))
+                    usable = len(samples) - len(samples) % step
+                    carry = samples[usable:]
+                    samples = samples[:usable].reshape(-1, step).mean(axis=1)
+                samples = samples.astype(np.float32)
+                with self.changed:
+                    while not self.stopped and decoded > (self.wanted + LOOKAHEAD_S) * self.rate:
+                        self.changed.wait()
+                    if self.stopped:
+                        return
+                    self.chunks.append((decoded, samples))
+                    decoded += len(samples)
+                    # Playback has passed these
+                    keep = (self.wanted - KEEP_S) * self.rate
+                    while self.chunks and self.chunks[0][0] + len(self.chunks[0][1]) < keep:
+                        self.chunks.popleft()
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Visualizer cannot decode {self.path}: {e}")
+        finally:
+            pcm.close()
+
+
+class SpectrumVisualizer:
+    """Spectrum and per-mood score bars drawn into one canvas"""
+
+    def __init__(self, root, canvas, moods, colors, metrics=None):
+        self.root = root
+        self.canvas = canvas
+        self.moods = list(moods)
+        self.colors = colors
+        self.metrics = metrics or NULL_METRICS
+        self.width = 1
+        self.height = 1
+        self.stream = None         # TrackStream of the current track
+        self.position = None       # Callable: playback position in seconds, or None
+        self.job = None
+        self.levels = [0.0] * BANDS
+        self.band_heights = [-1] * BANDS
+        self.shares = {mood: 0.0 for mood in self.moods}
+        self.mood = None
+        self.band_edges = None
+        self.band_rate = None
+        self.window = None
+
+        # Every item is created once; frames only move and recolour them
+        self.spectrum = [canvas.create_rectangle(0, 0, 0, 0, fill="#6272a4", outline="")
+                         for _ in range(BANDS)]
+        self.mood_bars = [canvas.create_rectangle(0, 0, 0, 0, outline="",
+                                                  fill=colors.get(mood, "#808080"))
+                          for mood in self.moods]
+        self.mood_names = [canvas.create_text(0, 0, text=mood, anchor="s", fill="#f8f8f2",
+                                              font=("Arial", 7)) for mood in self.moods]
+        self.title = canvas.create_text(0, 0, text="", anchor="nw", fill="white",
+                                        font=("Arial", 12, "bold"))
+        canvas.bind("<Configure>", self._on_resize)
+
+    def load(self, path):
+        """Decode a track in the background as it plays; None clears the spectrum"""
+        if self.stream is not None:
+            self.stream.stop()  # A skipped track need not be decoded any further
+        self.stream = TrackStream(path) if path else None
+
+    def start(self, position):
+        """Animate while position() returns seconds into the track (None stops)"""
+        self.position = position
+        if self.job is None:
+            self.job = self.root.after(FRAME_MS, self._frame)
+
+    def stop(self):
+        self.position = None
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.levels = [0.0] * BANDS
+        self._draw_spectrum()
+
+    def set_mood(self, mood, scores=None):
+        """Show the dominant mood and, if given, every mood's share of the scores"""
+        self.mood = mood
+        total = sum(scores.values()) if scores else 0
+        self.shares = {m: (scores.get(m, 0) / total if total else 0.0) for m in self.moods}
+        if not total and mood in self.shares:
+            self.shares[mood] = 1.0
+        color = self.colors.get(mood, "#808080")
+        self.canvas.itemconfig(self.title, text=mood.upper() if mood else "")
+        for item in self.spectrum:
+            self.canvas.itemconfig(item, fill=color)
+        self._draw_moods()
+
+    def clear(self):
+        self.stop()
+        self.load(None)
+        self.mood = None
+        self.shares = {mood: 0.0 for mood in self.moods}
+        self.canvas.itemconfig(self.title, text="")
+        self._draw_moods()
+
+    def shutdown(self):
+        self.stop()
+        self.load(None)
+
+    def _on_resize(self, event):
+        self.width, self.height = max(1, event.width), max(1, event.height)
+        self.band_heights = [-1] * BANDS  # Redraw every bar at the new size
+        self._draw_spectrum()
+        self._draw_moods()
+        self.canvas.coords(self.title, 6, 4)
+
+    def _frame(self):
+        self.job = None
+        position = self.position() if self.position else None
+        if position is None:
+            self.stop()
+            return
+        started = time.perf_counter()
+        self._analyze(position)
+        self._draw_spectrum()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.metrics.observe("visualizer_frame", elapsed_ms / 1000)
+        # Back off in proportion to any overrun so a slow machine stays responsive
+        delay = FRAME_MS + max(0, int((elapsed_ms - FRAME_BUDGET_MS) * 4))
+        self.job = self.root.after(delay, self._frame)
+
+    def _analyze(self, position):
+        """Move the band levels towards the spectrum at a playback position"""
+        audio = self.stream.frame(position, FFT_SIZE) if self.stream is not None else None
+        if audio is None:
+            new = [0.0] * BANDS
+        else:
+            np = mood_engine.np
+            rate, frame = audio
+            if rate != self.band_rate:
+                self._plan_bands(rate)
+            magnitude = np.abs(np.fft.rfft(frame * self.window)) / (FFT_SIZE / 4)
+            bands = np.maximum.reduceat(magnitude, self.band_edges)
+            db = 20 * np.log10(bands + 1e-9)
+            new = np.clip((db - FLOOR_DB) / -FLOOR_DB, 0.0, 1.0).tolist()
+        self.levels = [max(level, old * DECAY) for level, old in zip(new, self.levels)]
+
+    def _plan_bands(self, rate):
+        """FFT bin where each log-spaced band starts"""
+        np = mood_engine.np
+        self.band_rate = rate
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        top = min(MAX_FREQ, rate / 2)
+        freqs = np.geomspace(MIN_FREQ, top, BANDS + 1)[:-1]
+        edges = np.round(freqs * FFT_SIZE / rate).astype(int).tolist()
+        # At least one bin per band (low bands are narrower than a bin)
+        edges[0] = max(edges[0], 1)
+        for i in range(1, BANDS):
+            edges[i] = max(edges[i], edges[i - 1] + 1)
+        self.band_edges = np.array(edges)
+
+    def _draw_spectrum(self):
+        bottom = self.height * SPECTRUM_SHARE
+        width = self.width / BANDS
+        for i, level in enumerate(self.levels):
+            height = int(level * (bottom - 2))
+            if height == self.band_heights[i]:
+                continue
+            self.band_heights[i] = height
+            self.canvas.coords(self.spectrum[i], i * width + 1, bottom - height,
+                               (i + 1) * width - 1, bottom)
+
+    def _draw_moods(self):
+        top = self.height * SPECTRUM_SHARE + 2
+        label = 10
+        tallest = self.height - top - label
+        width = self.width / max(1, len(self.moods))
+        for i, mood in enumerate(self.moods):
+            height = self.shares[mood] * tallest
+            left = i * width
+            self.canvas.coords(self.mood_bars[i], left + 2, top + tallest - height,
+                               left + width - 2, top + tallest)
+            self.canvas.coords(self.mood_names[i], left + width / 2, self.height)
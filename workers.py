@@ -0,0 +1,64 @@
+"""
+WORKERS - Run slow work (network, analysis) off the Tk main thread
+Jobs run in a thread pool; their callbacks are handed back to the Tk
+thread through a queue that is drained with root.after.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# How often the Tk thread checks for finished jobs (ms)
+POLL_MS = 15
+
+
+class BackgroundWorker:
+    """Thread pool whose results are delivered on the Tk thread"""
+
+    def __init__(self, root, max_workers=4):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="moodify")
+        self.results = queue.Queue()
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run func(*args) in the pool, then on_done(result) on the Tk thread"""
+        self.pending += 1
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(
+            lambda f: self.results.put((f, on_done, on_error)))
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_MS, self._poll)
+        return future
+
+    def _poll(self):
+        """Deliver finished jobs; keep polling only while work is pending"""
+        while True:
+            try:
+                future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"Background job failed: {error}")
+            elif on_done:
+                on_done(future.result())
+
+        if self.pending > 0:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self.polling = False
+
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)